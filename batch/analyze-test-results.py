@@ -3,13 +3,25 @@
 AWS Batch 多重度テストの結果を分析するスクリプト
 """
 
+import argparse
 import json
 import os
 import sys
 import glob
+import time
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
 import statistics
 
+from columnar_results import HAS_NUMPY, read_columnar_result
+from job_timeline import summarize_timeline
+from result_writer import read_jsonl_results
+from scalability import fit_scalability, measure_throughput, predict_throughput
+from timing_stats import TAIL_PERCENTILES, JobColumns, empty_summary, percentile_key
+
 # オプショナルな依存関係
 try:
     import matplotlib.pyplot as plt
@@ -23,10 +35,281 @@ try:
 except ImportError:
     HAS_PANDAS = False
 
+# JSON の解析は orjson があれば使う（標準の json より数倍速い）
+try:
+    import orjson
+    json_loads = orjson.loads
+    HAS_ORJSON = True
+except ImportError:
+    json_loads = json.loads
+    HAS_ORJSON = False
+
+
+# ジョブライフサイクルのフェーズ（結果JSONのキー → 表示名）
+LIFECYCLE_PHASES = {
+    'queueWaitSeconds': 'キュー待ち',
+    'startLatencySeconds': '起動待ち',
+    'timeToStartSeconds': '作成→実行開始',
+    'runTimeSeconds': '実行時間',
+}
+
+# オープンループ送信（--load-profile）の計測項目
+OPEN_LOOP_COLUMNS = {
+    'sendLagSeconds': '送信遅延（予定→実際）',
+    'intendedResponseSeconds': '応答時間（予定時刻から）',
+}
+
+# 送信の所要時間の列（結果JSONのキー → 表示名）
+SUBMIT_COLUMNS = {
+    'submitDuration': '送信時間',
+    'submitWallSeconds': '送信時間（リトライ込み）',
+    'backoffSeconds': 'バックオフ時間',
+}
+
+# ミリ秒で表示する列（それ以外は秒）
+MILLISECOND_COLUMNS = {
+    'submitDuration', 'submitWallSeconds', 'backoffSeconds', 'sendLagSeconds', 'intendedResponseSeconds',
+}
+
+# ヒストグラムの表示に使う文字（度数の少ない順）
+HISTOGRAM_BLOCKS = '▁▂▃▄▅▆▇█'
+
+# スケーラビリティモデルに使うスループット（analysis の throughput のキー → 表示名、優先順）
+THROUGHPUT_METRICS = {
+    'completion': 'ジョブ完了スループット（最初の送信〜最後の終了）',
+    'submit': '送信スループット（最初の送信〜最後の送信完了）',
+}
+
+
+def summarize_lifecycle(jobs, columns=LIFECYCLE_PHASES):
+    """
+    ジョブのライフサイクルの各フェーズについてパーセンタイルを集計
+    
+    Args:
+        jobs (list): ジョブのレコード（monitor時に記録されたライフサイクル情報を含む）
+        columns (dict): 集計するキー（デフォルトはライフサイクルの各フェーズ）
+        
+    Returns:
+        dict: フェーズ → {count, mean, p50, p90, p95, p99, p99.9, iqr, max, ...}（値が無いフェーズは含まない）
+    """
+    return JobColumns(jobs).summarize(columns)
+
+
+def format_duration(column, value):
+    """列の単位（ミリ秒 / 秒）で所要時間を表示"""
+    if column in MILLISECOND_COLUMNS:
+        return f"{value * 1000:.1f}ms"
+    return f"{value:.1f}s"
+
+
+def format_histogram(histogram):
+    """ヒストグラムをブロック文字の列で表示（度数0のビンは空白）"""
+    peak = max(histogram['counts']) or 1
+    return ''.join(
+        HISTOGRAM_BLOCKS[min(len(HISTOGRAM_BLOCKS) - 1, count * len(HISTOGRAM_BLOCKS) // peak)] if count else ' '
+        for count in histogram['counts']
+    )
+
+
+def summarize_targets(jobs):
+    """
+    複数の送信先に振り分けた実行（--target）の送信先ごとの集計
+    
+    Args:
+        jobs (list): ジョブのレコード（送信先の名前 'target' を含む）
+        
+    Returns:
+        dict: 送信先 → {total_jobs, successful_jobs, avg_submit_time, time_to_start}（送信先の記録が無い場合は空）
+    """
+    by_target = {}
+    for job in jobs:
+        if job.get('target'):
+            by_target.setdefault(job['target'], []).append(job)
+    
+    summary = {}
+    for target, target_jobs in sorted(by_target.items()):
+        successful = [j for j in target_jobs if j['status'] == 'SUBMITTED']
+        # 送信時間が無いジョブ（配列ジョブの2番目以降の子ジョブ、台帳から復元したジョブ）は平均に含めない
+        durations = [j['submitDuration'] for j in successful if j.get('submitDuration') is not None]
+        summary[target] = {
+            'total_jobs': len(target_jobs),
+            'successful_jobs': len(successful),
+            'avg_submit_time': statistics.mean(durations) if durations else None,
+            'time_to_start': summarize_lifecycle(successful, ['timeToStartSeconds']).get('timeToStartSeconds')
+        }
+    return summary
+
+
+def _pearson(xs, ys):
+    """相関係数（値が2件未満、またはどちらかの値が一定の場合はNone）"""
+    if len(xs) < 2:
+        return None
+    mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    if not var_x or not var_y:
+        return None
+    return cov / (var_x * var_y) ** 0.5
+
+
+def _scale_out_lags(samples):
+    """
+    desired vCPU が増えてから、登録済み vCPU（ECS に登録されたインスタンス）がその値に達するまでの時間
+    
+    Returns:
+        list: desired vCPU が増えるたびのスケールアウト遅延（秒）。期間内に達しなかったものは含まない
+    """
+    lags = []
+    for i in range(1, len(samples)):
+        desired = samples[i]['desiredVcpus']
+        if desired <= samples[i - 1]['desiredVcpus']:
+            continue
+        for later in samples[i:]:
+            if later['registeredVcpus'] is not None and later['registeredVcpus'] >= desired:
+                lags.append((later['time'] - samples[i]['time']).total_seconds())
+                break
+    return lags
+
+
+def summarize_capacity(result):
+    """
+    キャパシティの時系列（--capacity-interval）とジョブの実行開始の遅延の関係を集計
+    
+    各ジョブの作成時刻の直前のサンプルを作成時のキャパシティとし、空き vCPU（remainingVcpus）と
+    作成→実行開始の時間の相関係数、空きの有無ごとの作成→実行開始の中央値を求める。
+    空きがあっても実行開始が遅い場合は Batch のスケジューリング、空きが無い場合はスケールアウトの待ちが原因と考えられる。
+    
+    Args:
+        result (dict): テスト結果（capacityTimeline を含む）
+        
+    Returns:
+        dict: 時系列の名前（ジョブキューまたは送信先）→ 集計（時系列が無い場合は空）
+    """
+    timelines = result.get('capacityTimeline') or {}
+    summary = {}
+    for name, timeline in timelines.items():
+        samples = [dict(s, time=datetime.fromisoformat(s['timestamp'])) for s in timeline.get('samples', [])]
+        if not samples:
+            continue
+        times = [s['time'] for s in samples]
+        # 複数の送信先の場合は送信先ごとの時系列とジョブを対応させる
+        jobs = [j for j in result['jobs'] if len(timelines) == 1 or j.get('target') == name]
+        
+        free, starts = [], []
+        with_free, without_free = [], []
+        for job in jobs:
+            if not job.get('createdAt') or job.get('timeToStartSeconds') is None:
+                continue
+            index = bisect_right(times, datetime.fromisoformat(job['createdAt'])) - 1
+            if index < 0 or samples[index]['remainingVcpus'] is None:
+                continue
+            remaining = samples[index]['remainingVcpus']
+            free.append(remaining)
+            starts.append(job['timeToStartSeconds'])
+            (with_free if remaining > 0 else without_free).append(job['timeToStartSeconds'])
+        
+        registered = [s['registeredVcpus'] for s in samples if s['registeredVcpus'] is not None]
+        lags = _scale_out_lags(samples)
+        summary[name] = {
+            'samples': len(samples),
+            'max_desired_vcpus': max(s['desiredVcpus'] for s in samples),
+            'max_registered_vcpus': max(registered) if registered else None,
+            'max_container_instances': max((s['containerInstances'] for s in samples
+                                            if s['containerInstances'] is not None), default=None),
+            'scale_out_lags': lags,
+            'correlation': _pearson(free, starts),
+            'jobs': len(starts),
+            'with_free_capacity': {'count': len(with_free),
+                                   'median': statistics.median(with_free) if with_free else None},
+            'without_free_capacity': {'count': len(without_free),
+                                      'median': statistics.median(without_free) if without_free else None},
+        }
+    return summary
+
+
+def summarize_scalability(analysis):
+    """
+    テストケースの多重度（ジョブ数）とスループットに Amdahl / USL のモデルを当てはめる
+    
+    全テストケースで計測できたスループット（ジョブ完了、無い場合は送信）を使う。
+    
+    Args:
+        analysis (dict): 分析結果（analyze_submission_performance の戻り値）
+        
+    Returns:
+        dict: metric（使ったスループット）, points（(多重度, スループット, テストケース名) のリスト）,
+              usl, amdahl（fit_scalability の戻り値）（計測できたテストケースが2件未満の場合はNone）
+    """
+    for metric in THROUGHPUT_METRICS:
+        points = [
+            (data['total_jobs'], data['throughput'][metric], test_name)
+            for test_name, data in analysis.items() if data.get('throughput', {}).get(metric)
+        ]
+        if len(points) == len(analysis):
+            break
+    if len({n for n, _, _ in points}) < 2:
+        return None
+    points.sort()
+    pairs = [(n, x) for n, x, _ in points]
+    return {
+        'metric': metric,
+        'points': points,
+        'usl': fit_scalability(pairs, 'usl'),
+        'amdahl': fit_scalability(pairs, 'amdahl'),
+    }
+
+
+def result_files(results_dir):
+    """
+    分析するテスト結果ファイル（JSON / JSON Lines / 列指向形式 .npz）
+    
+    同じ名前の .npz がある JSON / JSON Lines は含めない（convert-results.py で変換済みのもの）。
+    
+    Args:
+        results_dir (str): 結果ディレクトリのパス
+        
+    Returns:
+        list: ファイルパス（名前順）
+    """
+    columnar_files = glob.glob(os.path.join(results_dir, "*.npz"))
+    if columnar_files and not HAS_NUMPY:
+        print(f"⚠️  numpy がインストールされていないため、列指向形式の結果ファイル{len(columnar_files)}個をスキップします")
+        columnar_files = []
+    converted = {os.path.splitext(path)[0] for path in columnar_files}
+    json_files = [
+        path for path in glob.glob(os.path.join(results_dir, "*.json")) + glob.glob(os.path.join(results_dir, "*.jsonl"))
+        if os.path.splitext(path)[0] not in converted
+    ]
+    return sorted(json_files + columnar_files)
+
+
+def read_result_file(file_path):
+    """
+    テスト結果ファイルを1つ読み込む（orjson がインストールされている場合は JSON の解析に使う）
+    
+    .npz のジョブは分析で参照した列のみを読み込む。
+    
+    Args:
+        file_path (str): 結果ファイルのパス
+        
+    Returns:
+        dict: テスト結果（'filename' にファイル名）
+    """
+    if file_path.endswith('.npz'):
+        data = read_columnar_result(file_path)
+    elif file_path.endswith('.jsonl'):
+        data = read_jsonl_results(file_path, loads=json_loads)
+    else:
+        with open(file_path, 'rb') as f:
+            data = json_loads(f.read())
+    data['filename'] = os.path.basename(file_path)
+    return data
+
 
 def load_test_results(results_dir):
     """
-    テスト結果JSONファイルを読み込み
+    テスト結果ファイル（JSON / JSON Lines / 列指向形式 .npz）を読み込み
     
     Args:
         results_dir (str): 結果ディレクトリのパス
@@ -35,26 +318,91 @@ def load_test_results(results_dir):
         list: テスト結果のリスト
     """
     results = []
-    json_files = glob.glob(os.path.join(results_dir, "*.json"))
-    
-    for file_path in sorted(json_files):
+    for file_path in result_files(results_dir):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                data['filename'] = os.path.basename(file_path)
-                results.append(data)
+            data = read_result_file(file_path)
+            if data.get('incomplete'):
+                print(f"⚠️  途中で停止した結果ファイルです（{len(data['jobs'])}件を読み込み）: {file_path}")
+            results.append(data)
         except Exception as e:
             print(f"⚠️  ファイル読み込みエラー {file_path}: {e}")
     
     return results
 
 
-def analyze_submission_performance(results):
+def analyze_result_file(file_path, rate_window=None):
+    """
+    テスト結果ファイルを1つ読み込んで分析（analyze_result_files のワーカープロセスで実行）
+    
+    ジョブのレコードはワーカープロセス内で集計し、親プロセスには集計結果のみを返す。
+    
+    Args:
+        file_path (str): 結果ファイルのパス
+        rate_window (float): スループットの時系列のウィンドウ（秒、Noneの場合はテストの所要時間の1/30）
+        
+    Returns:
+        dict: file（ファイルパス）, analysis（テストケース名 → 分析結果）, incompleteJobs（途中で停止した結果の件数）,
+              error（読み込み・分析できなかった場合のエラー）
+    """
+    try:
+        data = read_result_file(file_path)
+        return {
+            'file': file_path,
+            'analysis': analyze_submission_performance([data], rate_window),
+            'incompleteJobs': len(data['jobs']) if data.get('incomplete') else None,
+            'error': None,
+        }
+    except Exception as e:
+        return {'file': file_path, 'analysis': {}, 'incompleteJobs': None, 'error': f"{type(e).__name__}: {e}"}
+
+
+def analyze_result_files(files, workers=None, rate_window=None):
+    """
+    テスト結果ファイルをプロセスプールで並列に読み込んで分析し、ファイルごとの集計結果をまとめる
+    
+    Args:
+        files (list): 結果ファイルのパス
+        workers (int): ワーカープロセス数（Noneの場合はCPU数、1の場合はこのプロセスで順番に処理）
+        rate_window (float): スループットの時系列のウィンドウ（秒、Noneの場合はテストの所要時間の1/30）
+        
+    Returns:
+        tuple: (テストケース名 → 分析結果（ファイル名順）, 読み込み・分析できなかったファイルのリスト)
+               テストケース名は拡張子を除いたファイル名で、拡張子だけが異なるファイルがある場合は拡張子を含むファイル名
+    """
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    analyze = partial(analyze_result_file, rate_window=rate_window)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(analyze, files, chunksize=max(1, len(files) // (workers * 4))))
+    else:
+        partials = [analyze(file_path) for file_path in files]
+    
+    stems = Counter(os.path.splitext(os.path.basename(file_path))[0] for file_path in files)
+    analysis = {}
+    invalid_files = []
+    for result in partials:
+        if result['error']:
+            print(f"⚠️  ファイル読み込みエラー {result['file']}: {result['error']}")
+            invalid_files.append({'file': result['file'], 'error': result['error']})
+            continue
+        if result['incompleteJobs'] is not None:
+            print(f"⚠️  途中で停止した結果ファイルです（{result['incompleteJobs']}件を読み込み）: {result['file']}")
+        for test_name, data in result['analysis'].items():
+            # foo.json と foo.jsonl のように拡張子だけが異なる場合は、上書きせずにファイル名で区別する
+            if stems[test_name] > 1:
+                test_name = os.path.basename(result['file'])
+                print(f"⚠️  拡張子だけが異なる結果ファイルがあるため、ファイル名で区別します: {test_name}")
+            analysis[test_name] = data
+    return analysis, invalid_files
+
+
+def analyze_submission_performance(results, rate_window=None):
     """
     ジョブ送信パフォーマンスを分析
     
     Args:
         results (list): テスト結果のリスト
+        rate_window (float): スループットの時系列のウィンドウ（秒、Noneの場合はテストの所要時間の1/30）
         
     Returns:
         dict: 分析結果
@@ -62,34 +410,53 @@ def analyze_submission_performance(results):
     analysis = {}
     
     for result in results:
-        test_name = result['filename'].replace('.json', '')
+        test_name = os.path.splitext(result['filename'])[0]
         
-        successful_jobs = [j for j in result['jobs'] if j['status'] == 'SUBMITTED']
-        submit_durations = [j.get('submitDuration', 0) for j in successful_jobs]
+        # 所要時間の列は送信に成功したジョブについて1回でまとめて集計する
+        columns = JobColumns(result['jobs'])
+        successful = columns.equals('status', 'SUBMITTED')
+        successful_count = columns.count(successful)
         
-        if submit_durations:
+        if successful_count:
+            timing = columns.summarize(list(SUBMIT_COLUMNS) + list(LIFECYCLE_PHASES), mask=successful)
+            counters = columns.summarize(['retryCount', 'throttleCount', 'backoffSeconds'])
+            # 全ジョブを台帳から復元した再開などで送信時間が無い場合は0とする
+            submit = timing.get('submitDuration') or empty_summary()
             analysis[test_name] = {
                 'total_jobs': result['totalJobs'],
-                'successful_jobs': len(successful_jobs),
+                'successful_jobs': successful_count,
                 'failed_jobs': result['failedJobs'],
-                'success_rate': len(successful_jobs) / result['totalJobs'] * 100,
-                'avg_submit_time': statistics.mean(submit_durations),
-                'median_submit_time': statistics.median(submit_durations),
-                'max_submit_time': max(submit_durations),
-                'min_submit_time': min(submit_durations),
-                'std_submit_time': statistics.stdev(submit_durations) if len(submit_durations) > 1 else 0
+                'success_rate': successful_count / result['totalJobs'] * 100,
+                'avg_submit_time': submit['mean'],
+                'median_submit_time': submit['p50'],
+                'max_submit_time': submit['max'],
+                'min_submit_time': submit['min'],
+                'std_submit_time': submit['std'],
+                'submit_timing': submit,
+                'total_retries': int(counters.get('retryCount', {}).get('sum', 0)),
+                'throttled_jobs': counters.get('throttleCount', {}).get('nonzero', 0),
+                'total_backoff_time': counters.get('backoffSeconds', {}).get('sum', 0),
+                'timing': timing,
+                'lifecycle': {phase: timing[phase] for phase in LIFECYCLE_PHASES if phase in timing},
+                'open_loop': columns.summarize(OPEN_LOOP_COLUMNS),
+                'timeline': summarize_timeline(columns, rate_window),
+                'throughput': measure_throughput(columns, successful),
+                'targets': summarize_targets(result['jobs']),
+                'pipeline': result.get('pipeline', {}).get('analysis'),
+                'capacity': summarize_capacity(result)
             }
     
     return analysis
 
 
-def generate_performance_report(analysis, output_file):
+def generate_performance_report(analysis, output_file, invalid_files=None):
     """
     パフォーマンスレポートを生成
     
     Args:
         analysis (dict): 分析結果
         output_file (str): 出力ファイルパス
+        invalid_files (list): 読み込めなかったファイル（analyze_result_files の戻り値）
     """
     report_lines = [
         "# AWS Batch 多重度テスト結果レポート",
@@ -101,8 +468,8 @@ def generate_performance_report(analysis, output_file):
     
     # テーブルヘッダー
     report_lines.extend([
-        "| テストケース | ジョブ数 | 成功率 | 平均送信時間 | 中央値送信時間 | 最大送信時間 | 標準偏差 |",
-        "|-------------|----------|--------|-------------|---------------|-------------|----------|"
+        "| テストケース | ジョブ数 | 成功率 | 平均送信時間 | 中央値送信時間 | p99送信時間 | 最大送信時間 | 標準偏差 |",
+        "|-------------|----------|--------|-------------|---------------|------------|-------------|----------|"
     ])
     
     # テスト結果をテーブル形式で追加
@@ -112,6 +479,7 @@ def generate_performance_report(analysis, output_file):
             f"{data['success_rate']:.1f}% | "
             f"{data['avg_submit_time']:.3f}s | "
             f"{data['median_submit_time']:.3f}s | "
+            f"{data['submit_timing']['p99']:.3f}s | "
             f"{data['max_submit_time']:.3f}s | "
             f"{data['std_submit_time']:.3f}s |"
         )
@@ -133,12 +501,188 @@ def generate_performance_report(analysis, output_file):
             f"- **成功率**: {data['success_rate']:.1f}%",
             f"- **平均送信時間**: {data['avg_submit_time']:.3f}秒",
             f"- **送信時間中央値**: {data['median_submit_time']:.3f}秒",
+            f"- **送信時間 p90 / p95 / p99 / p99.9**: " + ' / '.join(
+                f"{data['submit_timing'][percentile_key(p)]:.3f}秒" for p in TAIL_PERCENTILES[1:]),
             f"- **最大送信時間**: {data['max_submit_time']:.3f}秒",
             f"- **最小送信時間**: {data['min_submit_time']:.3f}秒",
             f"- **標準偏差**: {data['std_submit_time']:.3f}秒",
+            f"- **リトライ回数**: {data['total_retries']}回",
+            f"- **スロットリングを受けたジョブ数**: {data['throttled_jobs']}",
+            f"- **バックオフ待機時間合計**: {data['total_backoff_time']:.3f}秒",
             ""
         ])
     
+    # 所要時間のパーセンタイル（ライフサイクルは --monitor 実行時のみ記録される）
+    percentile_header = ' | '.join(percentile_key(p) for p in TAIL_PERCENTILES)
+    percentile_rule = '|'.join('-----' for _ in TAIL_PERCENTILES)
+    
+    def percentile_rows(test_name, summary, labels):
+        return [
+            f"| {test_name} | {labels[column]} | {stats['count']} | {format_duration(column, stats['mean'])} | "
+            + ' | '.join(format_duration(column, stats[percentile_key(p)]) for p in TAIL_PERCENTILES)
+            + f" | {format_duration(column, stats['iqr'])} | {format_duration(column, stats['max'])} | "
+            f"`{format_histogram(stats['histogram'])}` |"
+            for column, stats in summary.items() if column in labels
+        ]
+    
+    timing_labels = dict(SUBMIT_COLUMNS, **LIFECYCLE_PHASES)
+    timing_rows = []
+    for test_name, data in analysis.items():
+        timing_rows.extend(percentile_rows(test_name, data.get('timing', {}), timing_labels))
+    
+    if timing_rows:
+        report_lines.extend([
+            "## 所要時間のパーセンタイル",
+            "",
+            "送信に成功したジョブの所要時間。IQR は p75 - p25、分布は最小値〜最大値を20区間に分けたヒストグラム。",
+            "",
+            f"| テストケース | 項目 | 件数 | 平均 | {percentile_header} | IQR | 最大 | 分布 |",
+            f"|-------------|------|------|------|{percentile_rule}|-----|------|------|"
+        ])
+        report_lines.extend(timing_rows)
+        report_lines.append("")
+    
+    # オープンループ送信（--load-profile 実行時のみ記録される）
+    open_loop_rows = []
+    for test_name, data in analysis.items():
+        open_loop_rows.extend(percentile_rows(test_name, data.get('open_loop', {}), OPEN_LOOP_COLUMNS))
+    
+    if open_loop_rows:
+        report_lines.extend([
+            "## オープンループ送信",
+            "",
+            f"| テストケース | 項目 | 件数 | 平均 | {percentile_header} | IQR | 最大 | 分布 |",
+            f"|-------------|------|------|------|{percentile_rule}|-----|------|------|"
+        ])
+        report_lines.extend(open_loop_rows)
+        report_lines.append("")
+    
+    # 送信先別の内訳（--target で複数の送信先に振り分けた場合のみ）
+    target_rows = []
+    for test_name, data in analysis.items():
+        for target, stats in data.get('targets', {}).items():
+            success_rate = stats['successful_jobs'] / stats['total_jobs'] * 100
+            avg_submit = f"{stats['avg_submit_time']:.3f}s" if stats['avg_submit_time'] is not None else '-'
+            start = stats['time_to_start']
+            start_cells = f"{start['p50']:.1f}s | {start['p90']:.1f}s" if start else '- | -'
+            target_rows.append(
+                f"| {test_name} | {target} | {stats['total_jobs']} | {success_rate:.1f}% | "
+                f"{avg_submit} | {start_cells} |"
+            )
+    
+    if target_rows:
+        report_lines.extend([
+            "## 送信先別の内訳",
+            "",
+            "| テストケース | 送信先 | ジョブ数 | 成功率 | 平均送信時間 | 作成→実行開始 p50 | 作成→実行開始 p90 |",
+            "|-------------|--------|----------|--------|-------------|------------------|------------------|"
+        ])
+        report_lines.extend(target_rows)
+        report_lines.append("")
+    
+    # パイプライン（--pipeline で依存関係のあるステージを送信した場合のみ）
+    for test_name, data in analysis.items():
+        pipeline = data.get('pipeline')
+        if not pipeline:
+            continue
+        report_lines.extend([
+            f"## パイプライン: {test_name}",
+            "",
+            "| ステージ | 完了ジョブ | 所要時間 | 依存解除→実行開始 p50 | p90 | 最大 |",
+            "|---------|-----------|---------|---------------------|-----|------|"
+        ])
+        for name, stage in pipeline['stages'].items():
+            latency = stage.get('queueLatency')
+            if latency:
+                report_lines.append(
+                    f"| {name} | {stage['completedJobs']}/{stage['jobs']} | {stage['durationSeconds']:.1f}s | "
+                    f"{latency['p50']:.1f}s | {latency['p90']:.1f}s | {latency['max']:.1f}s |"
+                )
+            else:
+                report_lines.append(f"| {name} | 0/{stage['jobs']} | - | - | - | - |")
+        report_lines.append("")
+        if pipeline['criticalPath']:
+            steps = ' → '.join(
+                step['stage'] + (f"[{step['arrayIndex']}]" if step['arrayIndex'] is not None else '')
+                for step in pipeline['criticalPath']
+            )
+            report_lines.extend([
+                f"- クリティカルパス: {steps}",
+                f"- クリティカルパス所要時間: {pipeline['criticalPathSeconds']:.1f}秒"
+                f"（実行 {pipeline['criticalPathRunSeconds']:.1f}秒 + 待ち {pipeline['criticalPathQueueSeconds']:.1f}秒）",
+                f"- 全体の所要時間: {pipeline['makespanSeconds']:.1f}秒",
+                ""
+            ])
+    
+    # 秒の表示（値が無い場合は -。推移とキャパシティの表で使う）
+    def seconds(value):
+        return f"{value:.1f}s" if value is not None else '-'
+    
+    # 実行中ジョブ数とスループットの推移（実行開始・終了は --monitor 実行時のみ記録される）
+    def rate(value):
+        return f"{value:.2f}" if value is not None else '-'
+    
+    timeline_rows = []
+    for test_name, data in analysis.items():
+        timeline = data.get('timeline')
+        if not timeline:
+            continue
+        mean_rates, peak_rates = timeline['meanRates'], timeline['peakRates']
+        mean_concurrency = timeline['meanConcurrency']
+        timeline_rows.append(
+            f"| {test_name} | {timeline['durationSeconds']:.1f}s | {timeline['windowSeconds']:.1f}s | "
+            + ' | '.join(f"{rate(mean_rates[event])} / {rate(peak_rates[event])}"
+                         for event in ('submitted', 'started', 'completed'))
+            + f" | {timeline['peakConcurrency']} ({seconds(timeline['peakConcurrencyAt'])}) | "
+            f"{f'{mean_concurrency:.1f}' if mean_concurrency is not None else '-'} |"
+        )
+    
+    if timeline_rows:
+        report_lines.extend([
+            "## 実行中ジョブ数とスループットの推移",
+            "",
+            "レートはジョブ/秒（平均 / ピーク）。平均は最初〜最後のイベントの期間（ウィンドウより短い場合はウィンドウ）あたり、"
+            "ピークは直前のウィンドウ内の件数から求めた最大値。"
+            "最大同時実行数の括弧内はテスト開始から到達するまでの時間、"
+            "平均同時実行数は最初の実行開始〜最後の終了の期間の時間平均。",
+            "",
+            "| テストケース | 所要時間 | ウィンドウ | 送信 | 実行開始 | 完了 | 最大同時実行数 | 平均同時実行数 |",
+            "|-------------|---------|-----------|------|---------|------|---------------|---------------|"
+        ])
+        report_lines.extend(timeline_rows)
+        report_lines.append("")
+    
+    # キャパシティと実行開始の遅延（--capacity-interval で記録した場合のみ）
+    capacity_rows = []
+    for test_name, data in analysis.items():
+        for name, stats in data.get('capacity', {}).items():
+            lags = stats['scale_out_lags']
+            correlation = f"{stats['correlation']:.2f}" if stats['correlation'] is not None else '-'
+            with_free, without_free = stats['with_free_capacity'], stats['without_free_capacity']
+            capacity_rows.append(
+                f"| {test_name} | {name} | {stats['samples']} | {stats['max_desired_vcpus']:g} | "
+                f"{format(stats['max_registered_vcpus'], 'g') if stats['max_registered_vcpus'] is not None else '-'} | "
+                f"{stats['max_container_instances'] if stats['max_container_instances'] is not None else '-'} | "
+                f"{seconds(lags[0] if lags else None)} / {seconds(max(lags) if lags else None)} | {correlation} | "
+                f"{seconds(with_free['median'])} ({with_free['count']}) | "
+                f"{seconds(without_free['median'])} ({without_free['count']}) |"
+            )
+    
+    if capacity_rows:
+        report_lines.extend([
+            "## キャパシティと実行開始の遅延",
+            "",
+            "スケールアウト遅延は desired vCPU が増えてから登録済み vCPU がその値に達するまでの時間（最初 / 最大）。"
+            "相関係数は作成時の空き vCPU と作成→実行開始の時間の相関（負の値が大きいほど空きの不足が遅延の原因）。",
+            "",
+            "| テストケース | キュー | サンプル数 | 最大 desired vCPU | 最大 登録 vCPU | 最大インスタンス数 | "
+            "スケールアウト遅延 | 相関係数 | 空きあり 作成→実行開始 p50 (件数) | 空きなし 作成→実行開始 p50 (件数) |",
+            "|-------------|--------|-----------|------------------|---------------|-------------------|"
+            "-------------------|---------|----------------------------------|----------------------------------|"
+        ])
+        report_lines.extend(capacity_rows)
+        report_lines.append("")
+    
     # パフォーマンス傾向の分析
     job_counts = [data['total_jobs'] for data in analysis.values()]
     avg_times = [data['avg_submit_time'] for data in analysis.values()]
@@ -158,21 +702,100 @@ def generate_performance_report(analysis, output_file):
         min_jobs_data = list(analysis.values())[min_jobs_idx]
         max_jobs_data = list(analysis.values())[max_jobs_idx]
         
-        performance_ratio = max_jobs_data['avg_submit_time'] / min_jobs_data['avg_submit_time']
+        performance_ratio = (max_jobs_data['avg_submit_time'] / min_jobs_data['avg_submit_time']
+                             if min_jobs_data['avg_submit_time'] else None)
         
         report_lines.extend([
             f"- **最小多重度** ({min_jobs_data['total_jobs']}ジョブ): {min_jobs_data['avg_submit_time']:.3f}秒",
             f"- **最大多重度** ({max_jobs_data['total_jobs']}ジョブ): {max_jobs_data['avg_submit_time']:.3f}秒",
-            f"- **パフォーマンス比**: {performance_ratio:.2f}x",
+            f"- **パフォーマンス比**: " + (f"{performance_ratio:.2f}x" if performance_ratio is not None else '-'),
             ""
         ])
         
-        if performance_ratio > 1.5:
+        if performance_ratio is None:
+            report_lines.append("ℹ️ 最小多重度のテストケースに送信時間が記録されていないため、比較できません。")
+        elif performance_ratio > 1.5:
             report_lines.append("⚠️ **警告**: 高い多重度により送信時間が50%以上増加しています。")
         elif performance_ratio > 1.2:
             report_lines.append("⚡ **注意**: 多重度により送信時間が増加していますが、許容範囲内です。")
         else:
             report_lines.append("✅ **良好**: 多重度による大きなパフォーマンス劣化は見られません。")
+        
+        # スループットのスケーラビリティモデル（飽和する多重度の予測）
+        scalability = summarize_scalability(analysis)
+        if scalability:
+            report_lines.extend([
+                "",
+                "### スケーラビリティモデル:",
+                "",
+                f"{THROUGHPUT_METRICS[scalability['metric']]}と多重度（ジョブ数）に Amdahl の法則と "
+                "Universal Scalability Law（USL）を当てはめた結果。"
+                "λ は多重度1のスループット（ジョブ/秒）、σ は競合、κ は整合性（多重度の2乗で増えるコスト）の係数。"
+                "計測した多重度の範囲外の予測は外挿のため、範囲が広いほど信頼できる。",
+                "",
+                "| モデル | λ | σ | κ | R² | 予測ピーク多重度 | 予測最大スループット |",
+                "|--------|---|---|---|----|-----------------|--------------------|"
+            ])
+            for name, label in (('amdahl', 'Amdahl'), ('usl', 'USL')):
+                fit = scalability[name]
+                if fit is None:
+                    report_lines.append(f"| {label} | - | - | - | - | - | -（多重度の異なるテストケースが不足） |")
+                    continue
+                r2 = f"{fit['r2']:.3f}" if fit['r2'] is not None else '-'
+                if fit['peakConcurrency'] is not None:
+                    peak = f"{fit['peakConcurrency']:.1f} | {fit['peakThroughput']:.3f}"
+                elif fit['ceilingThroughput'] is not None:
+                    peak = f"- | {fit['ceilingThroughput']:.3f}（上限）"
+                else:
+                    peak = "- | -（飽和しない）"
+                report_lines.append(
+                    f"| {label} | {fit['lambda']:.3f} | {fit['sigma']:.3g} | {fit['kappa']:.3g} | {r2} | {peak} |")
+            
+            report_lines.extend([
+                "",
+                "| テストケース | 多重度 | 実測 (ジョブ/秒) | Amdahl | USL |",
+                "|-------------|--------|-----------------|--------|-----|"
+            ])
+            for n, throughput, test_name in scalability['points']:
+                predicted = [
+                    f"{predict_throughput(scalability[name], n):.3f}" if scalability[name] else '-'
+                    for name in ('amdahl', 'usl')
+                ]
+                report_lines.append(f"| {test_name} | {n} | {throughput:.3f} | {' | '.join(predicted)} |")
+            report_lines.append("")
+            
+            usl = scalability['usl']
+            fit = usl or scalability['amdahl']
+            max_concurrency = max(n for n, _, _ in scalability['points'])
+            if fit and fit['r2'] is not None and fit['r2'] < 0.8:
+                report_lines.append(f"ℹ️ モデルの当てはまりが良くないため（R² = {fit['r2']:.2f}）、予測は参考値です。")
+            if usl and usl['peakConcurrency'] is not None and usl['peakConcurrency'] <= max_concurrency:
+                report_lines.append(
+                    f"⚠️ **警告**: 計測した範囲内の多重度 {usl['peakConcurrency']:.0f} 付近でスループットが最大"
+                    f"（{usl['peakThroughput']:.3f} ジョブ/秒）になり、それ以上では低下しています。")
+            elif usl and usl['peakConcurrency'] is not None:
+                report_lines.append(
+                    f"⚡ **予測**: 多重度 {usl['peakConcurrency']:.0f} 付近でスループットが最大"
+                    f"（{usl['peakThroughput']:.3f} ジョブ/秒）になり、それ以上では低下する見込みです。")
+            elif fit and fit['ceilingThroughput'] is not None:
+                report_lines.append(
+                    f"✅ **予測**: 多重度を上げてもスループットは低下しませんが、"
+                    f"{fit['ceilingThroughput']:.3f} ジョブ/秒で頭打ちになる見込みです。")
+            elif fit:
+                report_lines.append("✅ **良好**: 計測した範囲ではスループットが多重度に比例して増えています。")
+    
+    # 読み込めなかったファイル（分析から除外したもの）
+    if invalid_files:
+        report_lines.extend([
+            "",
+            "## 読み込めなかったファイル",
+            "",
+            "| ファイル | エラー |",
+            "|---------|--------|"
+        ])
+        report_lines.extend(
+            f"| {os.path.basename(entry['file'])} | {entry['error'].replace('|', '/')} |" for entry in invalid_files
+        )
     
     # レポートをファイルに書き込み
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -202,9 +825,9 @@ def create_performance_charts(analysis, output_dir):
         success_rates = [analysis[name]['success_rate'] for name in test_names]
         
         # 図1: ジョブ数 vs 平均送信時間
-        plt.figure(figsize=(12, 8))
+        plt.figure(figsize=(18, 8))
         
-        plt.subplot(2, 2, 1)
+        plt.subplot(2, 3, 1)
         plt.plot(job_counts, avg_times, 'bo-', linewidth=2, markersize=8)
         plt.xlabel('ジョブ数')
         plt.ylabel('平均送信時間 (秒)')
@@ -212,7 +835,7 @@ def create_performance_charts(analysis, output_dir):
         plt.grid(True, alpha=0.3)
         
         # 図2: ジョブ数 vs 成功率
-        plt.subplot(2, 2, 2)
+        plt.subplot(2, 3, 2)
         plt.plot(job_counts, success_rates, 'go-', linewidth=2, markersize=8)
         plt.xlabel('ジョブ数')
         plt.ylabel('成功率 (%)')
@@ -221,7 +844,7 @@ def create_performance_charts(analysis, output_dir):
         plt.grid(True, alpha=0.3)
         
         # 図3: 送信時間の分布
-        plt.subplot(2, 2, 3)
+        plt.subplot(2, 3, 3)
         plt.bar(range(len(test_names)), avg_times, color='skyblue', alpha=0.7)
         plt.xlabel('テストケース')
         plt.ylabel('平均送信時間 (秒)')
@@ -230,14 +853,38 @@ def create_performance_charts(analysis, output_dir):
         plt.grid(True, alpha=0.3)
         
         # 図4: パフォーマンス効率
-        plt.subplot(2, 2, 4)
-        efficiency = [job_counts[i] / avg_times[i] for i in range(len(job_counts))]
+        plt.subplot(2, 3, 4)
+        efficiency = [job_counts[i] / avg_times[i] if avg_times[i] else 0 for i in range(len(job_counts))]
         plt.plot(job_counts, efficiency, 'ro-', linewidth=2, markersize=8)
         plt.xlabel('ジョブ数')
         plt.ylabel('効率 (ジョブ/秒)')
         plt.title('スループット効率')
         plt.grid(True, alpha=0.3)
         
+        # 図5・図6: 実行中ジョブ数と実行開始レートの推移（実行開始・終了を記録したテストのみ）
+        timelines = {name: analysis[name].get('timeline') for name in test_names}
+        timelines = {name: timeline for name, timeline in timelines.items() if timeline}
+        
+        plt.subplot(2, 3, 5)
+        for name, timeline in timelines.items():
+            plt.plot(timeline['series']['t'], timeline['series']['running'], linewidth=1.5, label=name)
+        plt.xlabel('経過時間 (秒)')
+        plt.ylabel('実行中ジョブ数')
+        plt.title('実行中ジョブ数の推移')
+        if timelines:
+            plt.legend(fontsize='small')
+        plt.grid(True, alpha=0.3)
+        
+        plt.subplot(2, 3, 6)
+        for name, timeline in timelines.items():
+            plt.plot(timeline['series']['t'], timeline['series']['started'], linewidth=1.5, label=name)
+        plt.xlabel('経過時間 (秒)')
+        plt.ylabel('実行開始レート (ジョブ/秒)')
+        plt.title('実行開始スループットの推移')
+        if timelines:
+            plt.legend(fontsize='small')
+        plt.grid(True, alpha=0.3)
+        
         plt.tight_layout()
         chart_file = os.path.join(output_dir, 'performance-charts.png')
         plt.savefig(chart_file, dpi=300, bbox_inches='tight')
@@ -250,11 +897,19 @@ def create_performance_charts(analysis, output_dir):
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("使用法: python3 analyze-test-results.py <results_directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='AWS Batch 多重度テストの結果を分析')
+    parser.add_argument('results_dir', help='結果ディレクトリ（JSON / JSON Lines / .npz）')
+    parser.add_argument('--workers', type=int,
+                        help='結果ファイルを並列に読み込むワーカープロセス数（デフォルト: CPU数、1で並列化しない）')
+    parser.add_argument('--rate-window', type=float,
+                        help='スループットの推移を求めるウィンドウ（秒、デフォルト: テストの所要時間の1/30）')
+    parser.add_argument('--strict', action='store_true',
+                        help='読み込めない結果ファイルがある場合はレポートを生成せずに終了する')
     
-    results_dir = sys.argv[1]
+    args = parser.parse_args()
+    results_dir = args.results_dir
+    if args.rate_window is not None and args.rate_window <= 0:
+        parser.error('--rate-window は正の値を指定してください')
     
     if not os.path.exists(results_dir):
         print(f"❌ 結果ディレクトリが見つかりません: {results_dir}")
@@ -262,21 +917,28 @@ def main():
     
     print(f"📊 テスト結果を分析中: {results_dir}")
     
-    # テスト結果を読み込み
-    results = load_test_results(results_dir)
-    
-    if not results:
+    files = result_files(results_dir)
+    if not files:
         print("❌ 分析対象のJSONファイルが見つかりません")
         sys.exit(1)
     
-    print(f"📄 {len(results)}個のテスト結果ファイルを読み込みました")
+    # テスト結果をワーカープロセスで並列に読み込み・分析する
+    started = time.perf_counter()
+    analysis, invalid_files = analyze_result_files(files, args.workers, args.rate_window)
+    print(f"📄 {len(files) - len(invalid_files)}個のテスト結果ファイルを読み込みました"
+          f"（{time.perf_counter() - started:.1f}秒、JSON: {'orjson' if HAS_ORJSON else 'json'}）")
     
-    # パフォーマンスを分析
-    analysis = analyze_submission_performance(results)
+    if invalid_files:
+        print(f"⚠️  読み込めなかったファイル: {len(invalid_files)}個")
+        if args.strict:
+            sys.exit(1)
+    if not analysis:
+        print("❌ 分析できるテスト結果がありません")
+        sys.exit(1)
     
     # レポートを生成
     report_file = os.path.join(results_dir, 'performance-report.md')
-    generate_performance_report(analysis, report_file)
+    generate_performance_report(analysis, report_file, invalid_files)
     
     # チャートを作成
     create_performance_charts(analysis, results_dir)
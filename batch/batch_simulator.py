@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+"""
+AWS Batch のプロセス内シミュレーター
+
+boto3 の Batch クライアントと同じメソッド（submit_job, describe_jobs, list_jobs など）を持ち、
+BatchJobLauncher のクライアントの代わりに使用できる。実際の計算資源を使わずに、
+ランチャー側の変更（送信・監視の方式）を短時間で再現性よく比較するためのもの。
+
+シミュレーションのモデル:
+    - ジョブキュー: RUNNABLE のジョブを FIFO で割り当てる
+    - コンピュート環境: vCPU 上限までインスタンスをスケールアウト（起動遅延あり）、
+      アイドル時間が続くと minvCpus までスケールイン
+    - ジョブ状態: SUBMITTED → PENDING → RUNNABLE → STARTING → RUNNING → SUCCEEDED/FAILED
+      （STARTING の時間はインスタンスで最初のジョブかどうか＝イメージ取得の有無で変わる）
+    - ジョブの依存関係（dependsOn）: 依存先がすべて SUCCEEDED になるまで PENDING のまま待機し、
+      依存先が FAILED になると「Dependent Job failed」で FAILED になる（N_TO_N / SEQUENTIAL に対応）
+    - API スロットリング: API ごとのトークンバケットを超えると TooManyRequestsException
+
+シミュレーション内の時間は実時間の time_scale 倍で進む（time_scale=100 なら 30秒のジョブが 0.3秒で終わる）。
+ランチャー側の計測と整合させるため、返す時刻（createdAt など）は実時間のエポックミリ秒であり、
+シミュレーション上の秒数に換算するには time_scale を掛ける。
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    class ClientError(Exception):
+        """botocore が無い環境用の ClientError 互換例外"""
+
+        def __init__(self, error_response, operation_name):
+            super().__init__(f"An error occurred ({error_response['Error']['Code']}) "
+                             f"when calling the {operation_name} operation")
+            self.response = error_response
+            self.operation_name = operation_name
+
+
+# シミュレーションのデフォルト設定（時間はシミュレーション上の秒）
+DEFAULT_SIMULATION_CONFIG = {
+    'time_scale': 100.0,
+    'seed': 0,
+    # コンピュート環境
+    'min_vcpus': 0,
+    'max_vcpus': 256,
+    'vcpus_per_instance': 4,
+    'memory_per_vcpu_mib': 4096,
+    'scale_out_delay': 180.0,
+    'scale_in_delay': 300.0,
+    # ジョブ
+    'job_vcpus': 1,
+    'pending_delay': 1.0,
+    'cold_start_delay': 120.0,
+    'warm_start_delay': 10.0,
+    'default_run_seconds': 30.0,
+    'run_time_jitter': 0.05,
+    'failure_rate': 0.0,
+    # ジョブ定義のコマンドで実行秒数を受け取るパラメータ（Ref::<名前>）
+    'countdown_parameter': 'countdownSeconds',
+    # API（実時間）
+    'api_latency': 0.0,
+    'submit_rate': 50.0,
+    'submit_burst': 50,
+    'describe_rate': 20.0,
+    'describe_burst': 20,
+}
+
+# describe_jobs 1回あたりに指定できるジョブIDの上限
+MAX_DESCRIBE_JOBS = 100
+
+# submit_job の dependsOn に指定できる依存先の上限
+MAX_DEPENDENCIES = 20
+
+
+class _RateLimiter:
+    """API ごとのトークンバケット（実時間、スレッドセーフ）"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        if self.rate is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class _Instance:
+    def __init__(self, instance_id, vcpus, ready_at):
+        self.instance_id = instance_id
+        self.vcpus = vcpus
+        self.free_vcpus = vcpus
+        self.ready_at = ready_at
+        self.warm = False
+        self.idle_since = ready_at
+
+
+class SimulatedBatchClient:
+    """
+    AWS Batch クライアントのシミュレーター
+
+    Args:
+        job_queue (str): シミュレートするジョブキュー名
+        compute_environment (str): シミュレートするコンピュート環境名
+        event_queue (queue.Queue): 指定した場合、状態遷移ごとに Batch Job State Change イベントを投入する
+        **config: DEFAULT_SIMULATION_CONFIG のキーで設定を上書き
+    """
+
+    def __init__(self, job_queue='simulated-queue', compute_environment='simulated-ce',
+                 event_queue=None, **config):
+        unknown = set(config) - set(DEFAULT_SIMULATION_CONFIG)
+        if unknown:
+            raise ValueError(f"未知のシミュレーション設定です: {', '.join(sorted(unknown))}")
+        self.config = dict(DEFAULT_SIMULATION_CONFIG, **config)
+        self.job_queue = job_queue
+        self.compute_environment = compute_environment
+        self.event_queue = event_queue
+
+        self.api_calls = {}
+        self.throttled_calls = {}
+
+        self._rng = random.Random(self.config['seed'])
+        self._lock = threading.RLock()
+        self._start_real = time.monotonic()
+        self._start_wall_ms = time.time() * 1000
+        self._sim_time = 0.0
+        self._events = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._runnable = deque()
+        self._instances = []
+        self._pending_vcpus = 0
+        self._instance_ids = itertools.count(1)
+        self._limiters = {
+            'submit_job': _RateLimiter(self.config['submit_rate'], self.config['submit_burst']),
+            'describe_jobs': _RateLimiter(self.config['describe_rate'], self.config['describe_burst']),
+        }
+
+        for _ in range(self.config['min_vcpus'] // self.config['vcpus_per_instance']):
+            self._instances.append(self._new_instance(0.0))
+
+    # ------------------------------------------------------------------
+    # 時間の管理
+
+    def _now(self):
+        """現在のシミュレーション時刻（開始からの秒）"""
+        return (time.monotonic() - self._start_real) * self.config['time_scale']
+
+    def _wall_ms(self, sim_time):
+        """シミュレーション時刻を実時間のエポックミリ秒に変換"""
+        return int(self._start_wall_ms + sim_time / self.config['time_scale'] * 1000)
+
+    def _schedule(self, at, kind, target):
+        heapq.heappush(self._events, (at, next(self._sequence), kind, target))
+
+    def _advance(self):
+        """現在時刻までのイベントを処理"""
+        now = self._now()
+        while self._events and self._events[0][0] <= now:
+            at, _, kind, target = heapq.heappop(self._events)
+            self._sim_time = at
+            getattr(self, f"_on_{kind}")(target)
+        self._sim_time = now
+
+    # ------------------------------------------------------------------
+    # スケジューリング
+
+    def _new_instance(self, ready_at):
+        return _Instance(f"i-sim{next(self._instance_ids):08d}", self.config['vcpus_per_instance'], ready_at)
+
+    def _set_status(self, job, status, reason=None):
+        job['jobStatus'] = status
+        if reason:
+            job['statusReason'] = reason
+        if self.event_queue is not None:
+            detail = {k: v for k, v in job.items() if not k.startswith('_')}
+            detail['status'] = detail.pop('jobStatus')
+            self.event_queue.put({
+                'detail-type': 'Batch Job State Change',
+                'source': 'aws.batch',
+                'time': datetime.fromtimestamp(self._wall_ms(self._sim_time) / 1000, timezone.utc)
+                                .strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                'detail': detail,
+            })
+
+    def _on_runnable(self, job):
+        if job['jobStatus'] != 'PENDING':
+            return
+        self._set_status(job, 'RUNNABLE')
+        self._runnable.append(job)
+        self._dispatch()
+
+    def _on_capacity(self, instance):
+        self._pending_vcpus -= instance.vcpus
+        self._instances.append(instance)
+        self._dispatch()
+
+    def _on_started(self, job):
+        if job['jobStatus'] != 'STARTING':
+            return
+        job['startedAt'] = self._wall_ms(self._sim_time)
+        self._set_status(job, 'RUNNING')
+        jitter = self.config['run_time_jitter']
+        run_seconds = job['_runSeconds'] * (1 + self._rng.uniform(-jitter, jitter))
+        self._schedule(self._sim_time + run_seconds, 'stopped', job)
+
+    def _on_stopped(self, job):
+        if job['jobStatus'] != 'RUNNING':
+            return
+        job['stoppedAt'] = self._wall_ms(self._sim_time)
+        failed = self._rng.random() < self.config['failure_rate']
+        exit_code = 1 if failed else 0
+        job['attempts'] = [{
+            'container': {'exitCode': exit_code, 'containerInstanceArn': job['_instance'].instance_id},
+            'startedAt': job['startedAt'],
+            'stoppedAt': job['stoppedAt'],
+            'statusReason': 'Essential container in task exited',
+        }]
+        self._release(job)
+        self._set_status(job, 'FAILED' if failed else 'SUCCEEDED',
+                         'Essential container in task exited' if failed else None)
+        self._resolve_dependents(job)
+        self._dispatch()
+
+    def _on_scale_in(self, instance):
+        if (instance in self._instances and instance.free_vcpus == instance.vcpus
+                and self._sim_time - instance.idle_since >= self.config['scale_in_delay']
+                and self._total_vcpus() - instance.vcpus >= self.config['min_vcpus']):
+            self._instances.remove(instance)
+
+    def _release(self, job):
+        instance = job.pop('_instance', None)
+        if instance is None:
+            return
+        instance.free_vcpus += job['_vcpus']
+        if instance.free_vcpus == instance.vcpus:
+            instance.idle_since = self._sim_time
+            self._schedule(self._sim_time + self.config['scale_in_delay'], 'scale_in', instance)
+
+    def _wait_for(self, job, dependencies):
+        """依存先が終わるまでジョブを PENDING で待機させる（依存先が無ければ RUNNABLE への遷移を予約）"""
+        if any(d['jobStatus'] == 'FAILED' for d in dependencies):
+            job['stoppedAt'] = self._wall_ms(self._sim_time)
+            self._set_status(job, 'FAILED', 'Dependent Job failed')
+            return
+        waiting = [d for d in dependencies if d['jobStatus'] != 'SUCCEEDED']
+        job['_waitingOn'] = len(waiting)
+        for dependency in waiting:
+            dependency.setdefault('_dependents', []).append(job)
+        if not waiting:
+            self._schedule(self._sim_time + self.config['pending_delay'], 'runnable', job)
+
+    def _resolve_dependents(self, job):
+        """終了したジョブに依存するジョブを解放（失敗した場合は依存するジョブを連鎖的に失敗させる）"""
+        finished = [job]
+        while finished:
+            dependency = finished.pop()
+            for dependent in dependency.pop('_dependents', []):
+                if dependent['jobStatus'] != 'PENDING':
+                    continue
+                if dependency['jobStatus'] == 'FAILED':
+                    dependent['stoppedAt'] = self._wall_ms(self._sim_time)
+                    self._set_status(dependent, 'FAILED', 'Dependent Job failed')
+                    finished.append(dependent)
+                    continue
+                dependent['_waitingOn'] -= 1
+                if dependent['_waitingOn'] == 0:
+                    self._schedule(self._sim_time + self.config['pending_delay'], 'runnable', dependent)
+
+    def _dependencies(self, depends_on, array_job_id=None, index=None):
+        """
+        dependsOn の指定を待機対象のジョブに展開
+
+        Args:
+            depends_on (list): submit_job の dependsOn
+            array_job_id (str): 配列ジョブの親ジョブID（配列ジョブでない場合はNone）
+            index (int): 配列ジョブの子ジョブのインデックス
+
+        Returns:
+            list: 待機対象のジョブ（配列ジョブへの依存は全子ジョブ、N_TO_N は同じインデックスの子ジョブ）
+        """
+        dependencies = []
+        for entry in depends_on:
+            if entry.get('type') == 'SEQUENTIAL':
+                if index:
+                    dependencies.append(self._jobs[f"{array_job_id}:{index - 1}"])
+                continue
+            target = self._jobs[entry['jobId']]
+            if entry.get('type') == 'N_TO_N':
+                dependencies.append(target['_children'][index])
+            else:
+                dependencies.extend(target.get('_children', [target]))
+        return dependencies
+
+    def _validate_dependencies(self, depends_on, size):
+        if len(depends_on) > MAX_DEPENDENCIES:
+            raise self._client_error('submit_job', f"dependsOn must contain at most {MAX_DEPENDENCIES} items")
+        for entry in depends_on:
+            kind = entry.get('type')
+            if kind == 'SEQUENTIAL':
+                if not size:
+                    raise self._client_error('submit_job', "SEQUENTIAL dependency requires an array job")
+                continue
+            target = self._jobs.get(entry.get('jobId'))
+            if target is None:
+                raise self._client_error('submit_job', f"Dependent job {entry.get('jobId')} not found")
+            if kind == 'N_TO_N' and (not size or len(target.get('_children', [])) != size):
+                raise self._client_error(
+                    'submit_job', "N_TO_N dependency requires array jobs of the same size")
+
+    def _total_vcpus(self):
+        return sum(i.vcpus for i in self._instances)
+
+    def _dispatch(self):
+        """RUNNABLE のジョブを空きのあるインスタンスに割り当て、不足分をスケールアウト"""
+        while self._runnable:
+            job = self._runnable[0]
+            if job['jobStatus'] != 'RUNNABLE':
+                self._runnable.popleft()
+                continue
+            instance = next((i for i in self._instances if i.free_vcpus >= job['_vcpus']), None)
+            if instance is None:
+                break
+            self._runnable.popleft()
+            instance.free_vcpus -= job['_vcpus']
+            job['_instance'] = instance
+            delay = self.config['warm_start_delay'] if instance.warm else self.config['cold_start_delay']
+            instance.warm = True
+            self._set_status(job, 'STARTING')
+            self._schedule(self._sim_time + delay, 'started', job)
+
+        demand = sum(j['_vcpus'] for j in self._runnable if j['jobStatus'] == 'RUNNABLE')
+        shortage = demand - self._pending_vcpus
+        while shortage > 0 and self._total_vcpus() + self._pending_vcpus < self.config['max_vcpus']:
+            instance = self._new_instance(self._sim_time + self.config['scale_out_delay'])
+            self._pending_vcpus += instance.vcpus
+            shortage -= instance.vcpus
+            self._schedule(instance.ready_at, 'capacity', instance)
+
+    # ------------------------------------------------------------------
+    # API
+
+    def _api_call(self, operation):
+        with self._lock:
+            self.api_calls[operation] = self.api_calls.get(operation, 0) + 1
+        if self.config['api_latency']:
+            time.sleep(self.config['api_latency'])
+        limiter = self._limiters.get(operation)
+        if limiter is not None and not limiter.try_acquire():
+            with self._lock:
+                self.throttled_calls[operation] = self.throttled_calls.get(operation, 0) + 1
+            raise ClientError({
+                'Error': {'Code': 'TooManyRequestsException', 'Message': 'Too Many Requests'},
+                'ResponseMetadata': {'HTTPStatusCode': 429},
+            }, operation)
+
+    def _client_error(self, operation, message):
+        return ClientError({
+            'Error': {'Code': 'ClientException', 'Message': message},
+            'ResponseMetadata': {'HTTPStatusCode': 400},
+        }, operation)
+
+    def _new_job(self, job_id, job_name, job_definition, run_seconds, vcpus, dependencies=()):
+        job = {
+            'jobId': job_id,
+            'jobName': job_name,
+            'jobArn': f"arn:aws:batch:simulated:000000000000:job/{job_id}",
+            'jobQueue': self.job_queue,
+            'jobDefinition': job_definition,
+            'jobStatus': 'SUBMITTED',
+            'createdAt': self._wall_ms(self._sim_time),
+            '_runSeconds': run_seconds,
+            '_vcpus': vcpus,
+        }
+        self._jobs[job_id] = job
+        self._set_status(job, 'SUBMITTED')
+        self._set_status(job, 'PENDING')
+        self._wait_for(job, dependencies)
+        return job
+
+    def submit_job(self, jobName, jobQueue, jobDefinition, parameters=None,
+                   arrayProperties=None, dependsOn=None, **kwargs):
+        self._api_call('submit_job')
+        depends_on = dependsOn or []
+        with self._lock:
+            self._advance()
+            self._validate_dependencies(depends_on, (arrayProperties or {}).get('size'))
+            try:
+                run_seconds = float((parameters or {}).get(self.config['countdown_parameter'],
+                                                           self.config['default_run_seconds']))
+            except ValueError:
+                run_seconds = self.config['default_run_seconds']
+            vcpus = self.config['job_vcpus']
+
+            job_id = str(uuid.uuid4())
+            size = (arrayProperties or {}).get('size')
+            if size:
+                parent = {
+                    'jobId': job_id,
+                    'jobName': jobName,
+                    'jobQueue': self.job_queue,
+                    'jobDefinition': jobDefinition,
+                    'jobStatus': 'PENDING',
+                    'createdAt': self._wall_ms(self._sim_time),
+                    'arrayProperties': {'size': size},
+                    'dependsOn': depends_on,
+                    '_children': [],
+                }
+                self._jobs[job_id] = parent
+                for index in range(size):
+                    child = self._new_job(f"{job_id}:{index}", jobName, jobDefinition, run_seconds, vcpus,
+                                          self._dependencies(depends_on, job_id, index))
+                    child['arrayProperties'] = {'index': index}
+                    parent['_children'].append(child)
+            else:
+                job = self._new_job(job_id, jobName, jobDefinition, run_seconds, vcpus,
+                                    self._dependencies(depends_on))
+                job['dependsOn'] = depends_on
+
+            return {'jobId': job_id, 'jobName': jobName,
+                    'jobArn': f"arn:aws:batch:simulated:000000000000:job/{job_id}"}
+
+    def _public_view(self, job):
+        view = {k: v for k, v in job.items() if not k.startswith('_')}
+        children = job.get('_children')
+        if children is not None:
+            summary = {}
+            for child in children:
+                summary[child['jobStatus']] = summary.get(child['jobStatus'], 0) + 1
+            view['arrayProperties'] = dict(view['arrayProperties'], statusSummary=summary)
+            if all(c['jobStatus'] in ('SUCCEEDED', 'FAILED') for c in children):
+                view['jobStatus'] = 'FAILED' if summary.get('FAILED') else 'SUCCEEDED'
+        return view
+
+    def describe_jobs(self, jobs):
+        self._api_call('describe_jobs')
+        if len(jobs) > MAX_DESCRIBE_JOBS:
+            raise self._client_error('describe_jobs', f"jobs must contain at most {MAX_DESCRIBE_JOBS} items")
+        with self._lock:
+            self._advance()
+            return {'jobs': [self._public_view(self._jobs[j]) for j in jobs if j in self._jobs]}
+
+    def list_jobs(self, jobQueue=None, jobStatus='RUNNING', maxResults=100, nextToken=None,
+                  filters=None, **kwargs):
+        self._api_call('list_jobs')
+        with self._lock:
+            self._advance()
+            if filters:
+                # JOB_NAME フィルター（末尾の * は前方一致）。フィルター指定時は jobStatus を無視する
+                names = [v for f in filters if f['name'] == 'JOB_NAME' for v in f['values']]
+                views = [
+                    self._public_view(j) for j in self._jobs.values()
+                    if ':' not in j['jobId'] and any(
+                        j['jobName'].startswith(n[:-1]) if n.endswith('*') else j['jobName'] == n
+                        for n in names)
+                ]
+            else:
+                views = [
+                    j for j in self._jobs.values()
+                    if '_children' not in j and j['jobStatus'] == jobStatus
+                ]
+            matched = [
+                {'jobId': j['jobId'], 'jobName': j['jobName'], 'status': j['jobStatus'],
+                 'createdAt': j['createdAt']}
+                for j in views
+            ]
+            start = int(nextToken or 0)
+            page = matched[start:start + maxResults]
+            response = {'jobSummaryList': page}
+            if start + maxResults < len(matched):
+                response['nextToken'] = str(start + maxResults)
+            return response
+
+    def _stop_job(self, operation, jobId, reason, allowed):
+        self._api_call(operation)
+        with self._lock:
+            self._advance()
+            job = self._jobs.get(jobId)
+            if job is None:
+                raise self._client_error(operation, f"Job {jobId} not found")
+            targets = job.get('_children', [job])
+            for target in targets:
+                if target['jobStatus'] not in allowed:
+                    continue
+                if target['jobStatus'] in ('STARTING', 'RUNNING'):
+                    self._release(target)
+                target['stoppedAt'] = self._wall_ms(self._sim_time)
+                self._set_status(target, 'FAILED', reason)
+                self._resolve_dependents(target)
+            self._dispatch()
+            return {}
+
+    def cancel_job(self, jobId, reason):
+        return self._stop_job('cancel_job', jobId, reason, ('SUBMITTED', 'PENDING', 'RUNNABLE'))
+
+    def terminate_job(self, jobId, reason):
+        return self._stop_job('terminate_job', jobId, reason,
+                              ('SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING'))
+
+    def describe_job_queues(self, jobQueues=None, **kwargs):
+        self._api_call('describe_job_queues')
+        return {'jobQueues': [{
+            'jobQueueName': self.job_queue,
+            'jobQueueArn': f"arn:aws:batch:simulated:000000000000:job-queue/{self.job_queue}",
+            'state': 'ENABLED',
+            'status': 'VALID',
+            'computeEnvironmentOrder': [{'order': 1, 'computeEnvironment': self.compute_environment}],
+        }]}
+
+    def describe_job_definitions(self, jobDefinitions=None, jobDefinitionName=None, **kwargs):
+        """指定された名前のジョブ定義（リビジョン1、コマンドは Ref::<countdown_parameter>）を返す"""
+        self._api_call('describe_job_definitions')
+        names = [jobDefinitionName] if jobDefinitionName else list(jobDefinitions or [])
+        definitions = []
+        for name in names:
+            name = name.split('/')[-1].split(':')[0]
+            definitions.append({
+                'jobDefinitionName': name,
+                'jobDefinitionArn': f"arn:aws:batch:simulated:000000000000:job-definition/{name}:1",
+                'revision': 1,
+                'status': 'ACTIVE',
+                'type': 'container',
+                'containerProperties': {
+                    'image': 'simulated',
+                    'command': ['countdown', f"Ref::{self.config['countdown_parameter']}"],
+                },
+            })
+        return {'jobDefinitions': definitions}
+
+    def describe_compute_environments(self, computeEnvironments=None, **kwargs):
+        self._api_call('describe_compute_environments')
+        with self._lock:
+            self._advance()
+            return {'computeEnvironments': [{
+                'computeEnvironmentName': self.compute_environment,
+                'type': 'MANAGED',
+                'state': 'ENABLED',
+                'status': 'VALID',
+                'ecsClusterArn': self._cluster_arn,
+                'computeResources': {
+                    'minvCpus': self.config['min_vcpus'],
+                    'maxvCpus': self.config['max_vcpus'],
+                    'desiredvCpus': self._total_vcpus() + self._pending_vcpus,
+                },
+            }]}
+
+    @property
+    def _cluster_arn(self):
+        return f"arn:aws:ecs:simulated:000000000000:cluster/{self.compute_environment}"
+
+    def ecs_client(self):
+        """コンピュート環境の ECS クラスター（シミュレーターのインスタンス）を参照する ECS クライアント"""
+        return SimulatedEcsClient(self)
+
+    # ------------------------------------------------------------------
+    # 統計
+
+    def stats(self):
+        """
+        シミュレーターの統計情報
+
+        Returns:
+            dict: API呼び出し回数・スロットリング回数・現在のキャパシティ・状態別ジョブ数
+        """
+        with self._lock:
+            self._advance()
+            status_count = {}
+            for job in self._jobs.values():
+                if '_children' in job:
+                    continue
+                status_count[job['jobStatus']] = status_count.get(job['jobStatus'], 0) + 1
+            return {
+                'simulatedSeconds': self._sim_time,
+                'timeScale': self.config['time_scale'],
+                'apiCalls': dict(self.api_calls),
+                'throttledCalls': dict(self.throttled_calls),
+                'instances': len(self._instances),
+                'runningVcpus': sum(i.vcpus - i.free_vcpus for i in self._instances),
+                'desiredVcpus': self._total_vcpus() + self._pending_vcpus,
+                'jobStatus': status_count,
+            }
+
+
+class SimulatedEcsClient:
+    """
+    SimulatedBatchClient のインスタンスをコンテナインスタンスとして返す ECS クライアント
+
+    list_container_instances と describe_container_instances のみ。CPU は ECS と同じく 1 vCPU = 1024 ユニット。
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+
+    def _arn(self, instance):
+        return f"arn:aws:ecs:simulated:000000000000:container-instance/{instance.instance_id}"
+
+    def list_container_instances(self, cluster=None, nextToken=None, maxResults=100, **kwargs):
+        sim = self.simulator
+        sim._api_call('list_container_instances')
+        with sim._lock:
+            sim._advance()
+            arns = [self._arn(i) for i in sim._instances]
+        start = int(nextToken or 0)
+        response = {'containerInstanceArns': arns[start:start + maxResults]}
+        if start + maxResults < len(arns):
+            response['nextToken'] = str(start + maxResults)
+        return response
+
+    def describe_container_instances(self, containerInstances, cluster=None, **kwargs):
+        sim = self.simulator
+        sim._api_call('describe_container_instances')
+        memory = sim.config['memory_per_vcpu_mib']
+        with sim._lock:
+            sim._advance()
+            tasks = {}
+            for job in sim._jobs.values():
+                if job.get('_instance') is not None:
+                    tasks[job['_instance']] = tasks.get(job['_instance'], 0) + 1
+            instances = {self._arn(i): i for i in sim._instances}
+            found = [instances[arn] for arn in containerInstances if arn in instances]
+            return {'containerInstances': [{
+                'containerInstanceArn': self._arn(i),
+                'ec2InstanceId': i.instance_id,
+                'status': 'ACTIVE',
+                'agentConnected': True,
+                'registeredResources': [
+                    {'name': 'CPU', 'type': 'INTEGER', 'integerValue': i.vcpus * 1024},
+                    {'name': 'MEMORY', 'type': 'INTEGER', 'integerValue': i.vcpus * memory},
+                ],
+                'remainingResources': [
+                    {'name': 'CPU', 'type': 'INTEGER', 'integerValue': i.free_vcpus * 1024},
+                    {'name': 'MEMORY', 'type': 'INTEGER', 'integerValue': i.free_vcpus * memory},
+                ],
+                'runningTasksCount': tasks.get(i, 0),
+                'pendingTasksCount': 0,
+            } for i in found]}
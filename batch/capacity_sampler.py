@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+コンピュート環境と ECS クラスターのキャパシティの定期サンプリング
+
+ジョブキューのコンピュート環境の desiredvCpus と、コンピュート環境の ECS クラスターに登録された
+コンテナインスタンス数・登録済み/残りの CPU とメモリを一定間隔で記録する。
+キュー待ちの増加が Batch のスケジューリングによるものか、EC2 のスケールアウトの遅れによるものかを
+ジョブの実行開始の遅延と突き合わせて判断するためのもの（analyze-test-results.py で相関を分析する）。
+
+サンプル（CPU は vCPU、メモリは MiB。ECS の情報を取得できない場合は None）:
+    timestamp, desiredVcpus, minVcpus, maxVcpus, containerInstances, registeredVcpus, remainingVcpus,
+    runningVcpus（登録済み - 残り）, registeredMemoryMiB, remainingMemoryMiB, runningTasks, pendingTasks
+"""
+
+import threading
+from datetime import datetime
+
+
+# describe_container_instances 1回あたりに指定できるコンテナインスタンスの上限
+DESCRIBE_CONTAINER_INSTANCES_MAX = 100
+
+# ECS の CPU ユニット（1 vCPU = 1024）
+CPU_UNITS_PER_VCPU = 1024
+
+
+def _resource(resources, name):
+    for resource in resources or []:
+        if resource.get('name') == name:
+            return resource.get('integerValue', 0)
+    return 0
+
+
+class CapacitySampler:
+    """
+    ジョブキューのキャパシティをバックグラウンドで記録する
+
+    Args:
+        batch_client: Batchクライアント
+        ecs_client: ECSクライアント（Noneの場合はコンピュート環境の vCPU のみ記録）
+        job_queue (str): ジョブキュー名
+        interval (float): サンプリング間隔（秒）
+    """
+
+    def __init__(self, batch_client, ecs_client, job_queue, interval=10.0):
+        self.batch_client = batch_client
+        self.ecs_client = ecs_client
+        self.job_queue = job_queue
+        self.interval = interval
+        self.compute_environments = None
+        self.samples = []
+        self._errors = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _warn(self, source, error):
+        # 同じ取得元のエラーは1回だけ表示する（権限不足などで毎回失敗する場合）
+        if source not in self._errors:
+            self._errors.add(source)
+            print(f"⚠️  キャパシティの取得エラー（{source}）: {error}")
+
+    def _resolve_compute_environments(self):
+        response = self.batch_client.describe_job_queues(jobQueues=[self.job_queue])
+        queues = response.get('jobQueues', [])
+        if not queues:
+            raise ValueError(f"ジョブキューが見つかりません: {self.job_queue}")
+        order = sorted(queues[0].get('computeEnvironmentOrder', []), key=lambda c: c.get('order', 0))
+        return [c['computeEnvironment'] for c in order]
+
+    def _cluster_capacity(self, cluster):
+        """ECS クラスターのコンテナインスタンスのリソースの合計"""
+        arns = []
+        params = {'cluster': cluster, 'maxResults': 100}
+        while True:
+            response = self.ecs_client.list_container_instances(**params)
+            arns.extend(response.get('containerInstanceArns', []))
+            if not response.get('nextToken'):
+                break
+            params['nextToken'] = response['nextToken']
+
+        totals = {
+            'containerInstances': len(arns),
+            'registeredCpu': 0, 'remainingCpu': 0,
+            'registeredMemoryMiB': 0, 'remainingMemoryMiB': 0,
+            'runningTasks': 0, 'pendingTasks': 0,
+        }
+        for i in range(0, len(arns), DESCRIBE_CONTAINER_INSTANCES_MAX):
+            response = self.ecs_client.describe_container_instances(
+                cluster=cluster, containerInstances=arns[i:i + DESCRIBE_CONTAINER_INSTANCES_MAX])
+            for instance in response.get('containerInstances', []):
+                totals['registeredCpu'] += _resource(instance.get('registeredResources'), 'CPU')
+                totals['remainingCpu'] += _resource(instance.get('remainingResources'), 'CPU')
+                totals['registeredMemoryMiB'] += _resource(instance.get('registeredResources'), 'MEMORY')
+                totals['remainingMemoryMiB'] += _resource(instance.get('remainingResources'), 'MEMORY')
+                totals['runningTasks'] += instance.get('runningTasksCount', 0)
+                totals['pendingTasks'] += instance.get('pendingTasksCount', 0)
+        return totals
+
+    def sample(self):
+        """
+        キャパシティを1回取得して記録
+
+        Returns:
+            dict: 記録したサンプル（取得に失敗した場合はNone）
+        """
+        timestamp = datetime.now().isoformat()
+        try:
+            if self.compute_environments is None:
+                self.compute_environments = self._resolve_compute_environments()
+            response = self.batch_client.describe_compute_environments(
+                computeEnvironments=self.compute_environments)
+        except Exception as e:
+            self._warn('batch', e)
+            return None
+
+        sample = {'timestamp': timestamp, 'desiredVcpus': 0, 'minVcpus': 0, 'maxVcpus': 0}
+        clusters = []
+        for environment in response.get('computeEnvironments', []):
+            resources = environment.get('computeResources', {})
+            sample['desiredVcpus'] += resources.get('desiredvCpus', 0)
+            sample['minVcpus'] += resources.get('minvCpus', 0)
+            sample['maxVcpus'] += resources.get('maxvCpus', 0)
+            if environment.get('ecsClusterArn'):
+                clusters.append(environment['ecsClusterArn'])
+
+        ecs = None
+        if self.ecs_client is not None and clusters:
+            try:
+                ecs = [self._cluster_capacity(cluster) for cluster in clusters]
+            except Exception as e:
+                self._warn('ecs', e)
+        if ecs is None:
+            sample.update(containerInstances=None, registeredVcpus=None, remainingVcpus=None, runningVcpus=None,
+                          registeredMemoryMiB=None, remainingMemoryMiB=None, runningTasks=None, pendingTasks=None)
+        else:
+            registered = sum(c['registeredCpu'] for c in ecs) / CPU_UNITS_PER_VCPU
+            remaining = sum(c['remainingCpu'] for c in ecs) / CPU_UNITS_PER_VCPU
+            sample.update(
+                containerInstances=sum(c['containerInstances'] for c in ecs),
+                registeredVcpus=registered,
+                remainingVcpus=remaining,
+                runningVcpus=registered - remaining,
+                registeredMemoryMiB=sum(c['registeredMemoryMiB'] for c in ecs),
+                remainingMemoryMiB=sum(c['remainingMemoryMiB'] for c in ecs),
+                runningTasks=sum(c['runningTasks'] for c in ecs),
+                pendingTasks=sum(c['pendingTasks'] for c in ecs)
+            )
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """サンプリングを停止し、最後のサンプルを記録（停止済みの場合は何もしない）"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def timeline(self):
+        """
+        結果ファイルに保存するキャパシティの時系列
+
+        Returns:
+            dict: jobQueue, computeEnvironments, intervalSeconds, samples
+        """
+        return {
+            'jobQueue': self.job_queue,
+            'computeEnvironments': self.compute_environments or [],
+            'intervalSeconds': self.interval,
+            'samples': list(self.samples),
+        }
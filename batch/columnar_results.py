@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+テスト結果の列指向形式（NumPy .npz）での保存と遅延読み込み
+
+ジョブのレコードをキーごとの配列（列）として1つの .npz に保存する。読み込み時は必要な列のみを
+最初に参照したときに展開するため、数百万ジョブの結果でも分析に使う列の分のメモリで済む。
+ジョブ以外の情報（集計・metadata）は JSON として __meta__ に保存する。
+
+列の種類（値の型から自動で決める。値が無いジョブは欠損として記録する）:
+    float     数値（float64、欠損は NaN）
+    int       整数（float64 で保存し、読み込み時に int に戻す）
+    bool      真偽値（int8、欠損は -1）
+    time      タイムゾーンなしの ISO 形式の時刻（1970-01-01 からのマイクロ秒、int64）
+    category  種類の少ない文字列（状態など。コード int32 と値の一覧、欠損は -1）
+    string    文字列（ジョブIDなど。UTF-8 のバイト列）
+    json      リスト・辞書などのその他の値（JSON 文字列を UTF-8 のバイト列で保存）
+
+値が None のキーは欠損として扱うため、読み込んだジョブには含まれない（dict.get の結果は変わらない）。
+
+numpy はオプショナルな依存関係で、インストールされていない場合は列指向形式を読み書きできない。
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+FORMAT_VERSION = 1
+
+META_KEY = '__meta__'
+
+# 種類がこの数以下（かつジョブ数の半分以下）の文字列の列は category として保存する
+MAX_CATEGORIES = 1024
+
+_EPOCH = datetime(1970, 1, 1)
+_MISSING_TIME = -2 ** 63
+_MISSING = object()
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise RuntimeError("列指向形式（.npz）の読み書きには numpy が必要です（pip install numpy）")
+
+
+def _parse_time(value):
+    if 'T' not in value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is None else None
+
+
+def _column_kind(values):
+    """列の値（欠損を除く）から列の種類を決める"""
+    if all(isinstance(v, bool) for v in values):
+        return 'bool'
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return 'int'
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return 'float'
+    if all(isinstance(v, str) for v in values):
+        if all(_parse_time(v) is not None for v in values):
+            return 'time'
+        distinct = len(set(values))
+        if distinct <= MAX_CATEGORIES and distinct <= max(1, len(values) // 2):
+            return 'category'
+        return 'string'
+    return 'json'
+
+
+def _encode_column(name, kind, values):
+    """
+    列を .npz に保存する配列に変換
+
+    Returns:
+        dict: .npz のキー → 配列
+    """
+    if kind in ('float', 'int'):
+        return {f"c__{name}": np.array([np.nan if v is None else v for v in values], dtype=np.float64)}
+    if kind == 'bool':
+        return {f"c__{name}": np.array([-1 if v is None else int(v) for v in values], dtype=np.int8)}
+    if kind == 'time':
+        return {f"c__{name}": np.array([
+            _MISSING_TIME if v is None else (_parse_time(v) - _EPOCH) // timedelta(microseconds=1)
+            for v in values
+        ], dtype=np.int64)}
+    if kind == 'category':
+        categories = sorted({v for v in values if v is not None})
+        codes = {v: i for i, v in enumerate(categories)}
+        return {
+            f"c__{name}": np.array([-1 if v is None else codes[v] for v in values], dtype=np.int32),
+            f"k__{name}": np.array(categories, dtype=str),
+        }
+    if kind == 'json':
+        values = [None if v is None else json.dumps(v, ensure_ascii=False) for v in values]
+    arrays = {f"c__{name}": np.array([b'' if v is None else v.encode('utf-8') for v in values], dtype=bytes)}
+    if any(v is None for v in values):
+        arrays[f"m__{name}"] = np.array([v is None for v in values], dtype=bool)
+    return arrays
+
+
+def write_columnar_result(data, output_file, compress=False):
+    """
+    結果（load_test_results と同じ構造の辞書）を列指向形式で保存
+
+    Args:
+        data (dict): 結果（'jobs' にジョブのレコードのリスト）
+        output_file (str): 出力ファイルパス（.npz）
+        compress (bool): 圧縮するか（ファイルは小さくなるが読み込みは遅くなる）
+
+    Returns:
+        dict: 列名 → 列の種類
+    """
+    _require_numpy()
+    jobs = data.get('jobs', [])
+    names = list(dict.fromkeys(key for job in jobs for key in job))
+
+    arrays = {}
+    kinds = {}
+    for name in names:
+        values = [job.get(name) for job in jobs]
+        present = [v for v in values if v is not None]
+        if not present:
+            continue
+        kinds[name] = _column_kind(present)
+        arrays.update(_encode_column(name, kinds[name], values))
+
+    meta = {
+        'formatVersion': FORMAT_VERSION,
+        'numJobs': len(jobs),
+        'columns': kinds,
+        'result': {k: v for k, v in data.items() if k not in ('jobs', 'filename')},
+    }
+    arrays[META_KEY] = np.array(json.dumps(meta, ensure_ascii=False))
+    (np.savez_compressed if compress else np.savez)(output_file, **arrays)
+    return kinds
+
+
+class ColumnarJobs(Sequence):
+    """
+    列指向形式の結果ファイルのジョブ（遅延読み込み）
+
+    各列は最初に参照したときにファイルから読み込んでキャッシュする。要素は JobRow（辞書と同じように参照できる）。
+    column() で列全体を NumPy 配列として参照できる。
+
+    Args:
+        path (str): 結果ファイルのパス（.npz）
+        meta (dict): __meta__ の内容
+    """
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.kinds = meta['columns']
+        self._length = meta['numJobs']
+        self._arrays = {}
+        self._values = {}
+
+    def _load(self, key):
+        if key not in self._arrays:
+            with np.load(self.path, allow_pickle=False) as npz:
+                self._arrays[key] = npz[key] if key in npz.files else None
+        return self._arrays[key]
+
+    def column(self, name):
+        """
+        列全体を NumPy 配列として返す
+
+        数値（float / int）は float64（欠損は NaN）、time はエポック秒の float64（欠損は NaN）、
+        bool は int8（欠損は -1）、category / string / json は文字列の配列（欠損は ''）。
+        time のエポック秒はタイムゾーンなしの時刻をそのまま UTC とみなした値で、差を取る用途に使う。
+
+        Returns:
+            numpy.ndarray: 列の値（列が無い場合はNone）
+        """
+        kind = self.kinds.get(name)
+        if kind is None:
+            return None
+        values = self._load(f"c__{name}")
+        if kind == 'time':
+            seconds = values / 1e6
+            seconds[values == _MISSING_TIME] = np.nan
+            return seconds
+        if kind == 'category':
+            categories = self._load(f"k__{name}")
+            return np.where(values >= 0, categories[np.maximum(values, 0)] if len(categories) else '', '')
+        if kind in ('string', 'json'):
+            return np.char.decode(values, 'utf-8')
+        return values
+
+    def missing(self, name):
+        """
+        列の欠損（値が無いジョブ）を表す真偽値の配列
+
+        Returns:
+            numpy.ndarray: 欠損の場合に True（列が無い場合は全て True）
+        """
+        kind = self.kinds.get(name)
+        if kind is None:
+            return np.ones(self._length, dtype=bool)
+        values = self._load(f"c__{name}")
+        if kind in ('float', 'int'):
+            return np.isnan(values)
+        if kind in ('bool', 'category'):
+            return values < 0
+        if kind == 'time':
+            return values == _MISSING_TIME
+        mask = self._load(f"m__{name}")
+        return mask if mask is not None else np.zeros(self._length, dtype=bool)
+
+    def _python_values(self, name):
+        """
+        1ジョブずつ参照する列の値（数値・真偽値・category は Python のリストに展開し、欠損は None）
+
+        Returns:
+            tuple: (列の種類, 値)
+        """
+        kind = self.kinds.get(name)
+        values = self._load(f"c__{name}")
+        missing = self.missing(name)
+        if kind in ('float', 'int', 'bool'):
+            cast = {'float': float, 'int': int, 'bool': bool}[kind]
+            values = [None if m else cast(v) for v, m in zip(values.tolist(), missing.tolist())]
+        elif kind == 'category':
+            categories = self._load(f"k__{name}").tolist()
+            values = [categories[c] if c >= 0 else None for c in values.tolist()]
+        else:
+            values = [None if m else v for v, m in zip(values.tolist(), missing.tolist())]
+        return kind, values
+
+    def value(self, name, index, default=_MISSING):
+        """
+        1ジョブの値を JSON と同じ Python の値で返す
+
+        Args:
+            name (str): 列名
+            index (int): ジョブのインデックス
+            default: 列が無い、または値が欠損している場合に返す値（省略時は KeyError）
+
+        Raises:
+            KeyError: 列が無い、または値が欠損していて default を省略した場合
+        """
+        entry = self._values.get(name)
+        if entry is None:
+            entry = self._values[name] = self._python_values(name) if name in self.kinds else (None, None)
+        kind, values = entry
+        value = values[index] if values is not None else None
+        if value is None:
+            if default is _MISSING:
+                raise KeyError(name)
+            return default
+        if kind == 'time':
+            return (_EPOCH + timedelta(microseconds=value)).isoformat()
+        if kind == 'json':
+            return json.loads(value.decode('utf-8'))
+        if kind == 'string':
+            return value.decode('utf-8')
+        return value
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return map(JobRow, [self] * self._length, range(self._length))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [JobRow(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return JobRow(self, index)
+
+
+class JobRow(Mapping):
+    """列指向形式の結果の1ジョブ（参照した列のみ読み込む、読み取り専用の辞書）"""
+
+    __slots__ = ('_jobs', '_index')
+
+    def __init__(self, jobs, index):
+        self._jobs = jobs
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._jobs.value(name, self._index)
+
+    def get(self, name, default=None):
+        return self._jobs.value(name, self._index, default)
+
+    def __iter__(self):
+        return (name for name in self._jobs.kinds if name in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"JobRow({dict(self)!r})"
+
+
+def read_columnar_result(path):
+    """
+    列指向形式の結果ファイルを読み込む（ジョブの列は参照したときに読み込む）
+
+    Args:
+        path (str): 結果ファイルのパス（.npz）
+
+    Returns:
+        dict: JSON 形式の結果と同じ構造の辞書（'jobs' は ColumnarJobs）
+
+    Raises:
+        ValueError: 列指向形式の結果ファイルではない、または未対応のバージョンの場合
+    """
+    _require_numpy()
+    with np.load(path, allow_pickle=False) as npz:
+        if META_KEY not in npz.files:
+            raise ValueError(f"列指向形式の結果ファイルではありません: {path}")
+        meta = json.loads(str(npz[META_KEY]))
+    if meta.get('formatVersion') != FORMAT_VERSION:
+        raise ValueError(f"未対応の形式のバージョンです: {meta.get('formatVersion')}")
+    data = dict(meta['result'])
+    data['jobs'] = ColumnarJobs(path, meta)
+    return data
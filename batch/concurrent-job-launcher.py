@@ -3,29 +3,230 @@
 AWS Batchで複数のジョブを同時起動して多重度の影響を検証するスクリプト
 """
 
-import boto3
 import json
+import os
+import sys
 import time
 import argparse
+import signal
 import threading
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import uuid
 
+# AWSクライアントの作成処理は Lambda 関数と共有する（lambda/functions/aws_clients.py）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda', 'functions'))
+from aws_clients import DEFAULT_MAX_POOL_CONNECTIONS, create_client
+
+from batch_simulator import SimulatedBatchClient
+from capacity_sampler import CapacitySampler
+from job_router import LeastBacklogRouter, WeightedRouter, load_targets, parse_target, targets_from_dicts
+from job_definitions import JobDefinitionCache, JobDefinitionMismatchError
+from job_drain import JobDrainer
+from job_pipeline import analyze_pipeline, load_pipeline, topological_waves
+from job_ledger import LEDGER_INTENDED, LEDGER_SUBMITTED_STATES, JobLedger, job_name_prefix, new_run_id
+from launcher_metrics import LauncherMetrics, MetricsFileWriter, MetricsHttpServer
+from progress import NdjsonProgressRenderer, TextProgressRenderer
+from load_profiles import OpenLoopScheduler, parse_load_profile
+from result_writer import JsonlResultWriter
+from retry_policy import RetryBudget, RetryExhaustedError, RetryPolicy, error_code
+from status_sources import FileEventStatusSource, SqsEventStatusSource
+from submit_engine import AimdController, AsyncSubmitEngine
+
+
+# AWS Batch 配列ジョブのサイズ上限（arrayProperties.size は 2〜10000）
+ARRAY_JOB_MIN_SIZE = 2
+ARRAY_JOB_MAX_SIZE = 10000
+
+# 配列ジョブの子ジョブに展開するときに最初の子ジョブのみに残す送信の計測値（1回の送信を重複して数えない）
+SUBMIT_ATTEMPT_KEYS = ('submitDuration', 'submitWallSeconds', 'retryCount', 'throttleCount', 'backoffSeconds')
+
+# describe_jobs 1回あたりに指定できるジョブIDの上限
+DESCRIBE_JOBS_MAX_IDS = 100
+
+# これ以上状態が変化しないジョブ状態
+TERMINAL_STATUSES = ('SUCCEEDED', 'FAILED')
+
+# ジョブ状態の進行順（イベントの順序が前後した場合の判定に使用）
+STATUS_ORDER = {
+    'SUBMITTED': 0,
+    'PENDING': 1,
+    'RUNNABLE': 2,
+    'STARTING': 3,
+    'RUNNING': 4,
+    'SUCCEEDED': 5,
+    'FAILED': 5,
+}
+
+# RUNNABLE を抜けて（スケジュールされて）以降のジョブ状態
+SCHEDULED_STATUSES = ('STARTING', 'RUNNING', 'SUCCEEDED', 'FAILED')
+
+# ランチャーがジョブに渡すパラメータ（ジョブ定義のプレースホルダー名に対応付けて送信する）
+LAUNCHER_PARAMETERS = ('countdownSeconds',)
+
+# 滞留数（RUNNABLE のジョブ数）を数える list_jobs のページ数の上限（1ページ100件）
+BACKLOG_MAX_PAGES = 10
+
+
+def _epoch_ms_to_iso(value):
+    """エポックミリ秒をISO 8601文字列に変換"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000).isoformat()
+
+
+def _elapsed_seconds(start_ms, end_ms):
+    """2つのエポックミリ秒の差を秒で返す（どちらかが無い場合はNone）"""
+    if start_ms is None or end_ms is None:
+        return None
+    return (end_ms - start_ms) / 1000
+
+
+def job_lifecycle(job):
+    """
+    describe_jobsのジョブ情報からライフサイクルの各フェーズの時間を算出
+    
+    - queueWaitSeconds: 作成(createdAt) → RUNNABLEを抜けた時刻（STARTING以降を最初に観測した時刻）
+    - startLatencySeconds: RUNNABLEを抜けた時刻 → 実行開始(startedAt)
+    - timeToStartSeconds: 作成(createdAt) → 実行開始(startedAt)
+    - runTimeSeconds: 実行開始(startedAt) → 終了(stoppedAt)
+    
+    RUNNABLEを抜けた時刻は監視間隔の精度でしか観測できないため、
+    観測できなかった場合は queueWaitSeconds / startLatencySeconds を None とする。
+    
+    Args:
+        job (dict): describe_jobsのジョブ情報（monitor_jobsの戻り値の要素）
+        
+    Returns:
+        dict: 結果JSONに保存するライフサイクル情報
+    """
+    created = job.get('createdAt')
+    started = job.get('startedAt')
+    stopped = job.get('stoppedAt')
+    
+    observed = job.get('observedStatusTimes', {})
+    scheduled_candidates = [observed[s] for s in SCHEDULED_STATUSES if s in observed]
+    scheduled = min(scheduled_candidates) if scheduled_candidates else None
+    if scheduled is not None and created is not None:
+        scheduled = max(scheduled, created)
+    if scheduled is not None and started is not None:
+        scheduled = min(scheduled, started)
+    
+    attempts = []
+    for attempt in job.get('attempts', []):
+        container = attempt.get('container', {})
+        attempts.append({
+            'startedAt': _epoch_ms_to_iso(attempt.get('startedAt')),
+            'stoppedAt': _epoch_ms_to_iso(attempt.get('stoppedAt')),
+            'runTimeSeconds': _elapsed_seconds(attempt.get('startedAt'), attempt.get('stoppedAt')),
+            'exitCode': container.get('exitCode'),
+            'statusReason': attempt.get('statusReason')
+        })
+    
+    return {
+        'finalStatus': job.get('jobStatus'),
+        'statusReason': job.get('statusReason'),
+        'createdAt': _epoch_ms_to_iso(created),
+        'startedAt': _epoch_ms_to_iso(started),
+        'stoppedAt': _epoch_ms_to_iso(stopped),
+        'queueWaitSeconds': _elapsed_seconds(created, scheduled),
+        'startLatencySeconds': _elapsed_seconds(scheduled, started),
+        'timeToStartSeconds': _elapsed_seconds(created, started),
+        'runTimeSeconds': _elapsed_seconds(started, stopped),
+        'attempts': attempts
+    }
+
 
 class BatchJobLauncher:
-    def __init__(self, job_queue, job_definition, region='us-west-2'):
+    def __init__(self, job_queue, job_definition, region='us-west-2', retry_policy=None,
+                 max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS, batch_client=None, metrics=None,
+                 run_id=None, ledger=None):
         """
         Args:
             job_queue (str): AWS Batch ジョブキュー名
             job_definition (str): AWS Batch ジョブ定義名
             region (str): AWSリージョン
+            retry_policy (RetryPolicy): ジョブ送信のリトライポリシー
+            max_pool_connections (int): HTTP接続プールのサイズ（同時にAPIを呼び出すワーカー数以上にする）
+            batch_client: 使用するBatchクライアント（SimulatedBatchClient など。Noneの場合は boto3 で作成）
+            metrics (LauncherMetrics): 送信・監視の計測値の記録先
+            run_id (str): 実行ID（ジョブ名に含まれる。Noneの場合は生成）
+            ledger (JobLedger): 送信・終了状態を記録するジョブ台帳
         """
-        self.batch_client = boto3.client('batch', region_name=region)
+        if batch_client is None:
+            # リトライは RetryPolicy で行い、回数を記録できるよう boto3 側の再試行は行わない
+            # （adaptive モードのクライアント側レート制限のみ利用する）
+            batch_client = create_client(
+                'batch', region_name=region,
+                max_pool_connections=max_pool_connections,
+                retry_mode='adaptive',
+                max_attempts=1
+            )
+        self.batch_client = batch_client
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = metrics or LauncherMetrics()
         self.job_queue = job_queue
         self.job_definition = job_definition
         self.region = region
+        self.last_submit_stats = None
+        self.last_pipeline_stats = None
+        self.run_id = run_id or new_run_id()
+        self.ledger = ledger
+        # MultiTargetLauncher の送信先のランチャーの場合は送信先の名前（結果とジョブ台帳に記録する）
+        self.target_name = None
+        # 停止を要求された（Ctrl-C）後は送信しない。送信済みのジョブは drain で停止する
+        self.stop_requested = threading.Event()
+        self.submitted_job_ids = []
+        # validate_job_definition で検証したジョブ定義と、パラメータ名の対応
+        self.job_definition_info = None
+        self.parameter_map = {}
         
+    def validate_job_definition(self, cache):
+        """
+        ジョブ定義を取得し、送信するパラメータ名をプレースホルダーと突き合わせる
+        
+        検証後は検証したリビジョン（name:revision）を指定し、対応付けたパラメータ名で送信する。
+        
+        Args:
+            cache (JobDefinitionCache): ジョブ定義のキャッシュ
+            
+        Returns:
+            JobDefinitionInfo: 検証したジョブ定義
+            
+        Raises:
+            JobDefinitionMismatchError: パラメータ名がジョブ定義と一致しない場合
+        """
+        info = cache.get(self.batch_client, self.job_definition, self.region)
+        self.parameter_map = info.parameter_map(LAUNCHER_PARAMETERS)
+        self.job_definition_info = info
+        placeholders = ', '.join(f"Ref::{p}" for p in info.placeholders) or 'なし'
+        print(f"📋 ジョブ定義: {info.pinned_name}（プレースホルダー: {placeholders}）")
+        for name, mapped in self.parameter_map.items():
+            if name != mapped:
+                print(f"   パラメータ {name} を {mapped} として送信します")
+        return info
+    
+    def job_definition_summary(self):
+        """結果に記録する検証済みのジョブ定義（検証していない場合はNone）"""
+        return self.job_definition_info.to_dict() if self.job_definition_info else None
+    
+    def capacity_samplers(self, interval, ecs_client_factory):
+        """
+        ジョブキューのキャパシティを記録するサンプラー（開始はしない）
+        
+        Args:
+            interval (float): サンプリング間隔（秒）
+            ecs_client_factory (callable): ランチャーを受け取りECSクライアントを返す関数
+            
+        Returns:
+            dict: 名前（ジョブキュー名）→ CapacitySampler
+        """
+        return {self.job_queue: CapacitySampler(self.batch_client, ecs_client_factory(self), self.job_queue, interval)}
+    
+    def job_name(self, job_suffix):
+        """実行ID とサフィックスから決まるジョブ名（実行ごとに一意で、再開時も同じ名前になる）"""
+        return f"{job_name_prefix(self.run_id)}{job_suffix}"
+    
     def submit_single_job(self, job_suffix, countdown_seconds=30, job_params=None):
         """
         単一のBatchジョブを送信
@@ -38,15 +239,24 @@ class BatchJobLauncher:
         Returns:
             dict: ジョブ送信結果
         """
-        job_name = f"concurrent-test-{job_suffix}-{int(time.time())}"
+        job_name = self.job_name(job_suffix)
+        if self.stop_requested.is_set():
+            return {
+                'jobName': job_name,
+                'error': '停止が要求されたため送信しませんでした',
+                'errorCode': 'StopRequested',
+                'submissionTime': datetime.now().isoformat(),
+                'status': 'FAILED_TO_SUBMIT'
+            }
         
         # デフォルトのジョブパラメータ
         default_params = {
             'jobName': job_name,
             'jobQueue': self.job_queue,
-            'jobDefinition': self.job_definition,
+            'jobDefinition': (self.job_definition_info.pinned_name if self.job_definition_info
+                              else self.job_definition),
             'parameters': {
-                'countdownSeconds': str(countdown_seconds)
+                self.parameter_map.get('countdownSeconds', 'countdownSeconds'): str(countdown_seconds)
             }
         }
         
@@ -54,34 +264,85 @@ class BatchJobLauncher:
         if job_params:
             default_params.update(job_params)
             
+        if self.ledger:
+            self.ledger.record_intended(job_name)
+        
+        start_time = datetime.now()
+        # 所要時間はシステム時刻の変更の影響を受けない単調時計で計測する
+        # submitDuration は成功した submit_job 1回の所要時間（API のレイテンシ）、
+        # submitWallSeconds はリトライとバックオフの待機を含む送信全体の所要時間
+        started = time.perf_counter()
+        self.metrics.in_flight.inc()
         try:
-            start_time = datetime.now()
-            response = self.batch_client.submit_job(**default_params)
-            end_time = datetime.now()
+            response, retry_info = self.retry_policy.call_non_idempotent(
+                self.batch_client.submit_job, lambda: self._find_ambiguous_submit(job_name), **default_params)
+            submit_wall_seconds = time.perf_counter() - started
+            submit_duration = retry_info.pop('attemptSeconds')
+            self.metrics.record_submit(submit_duration, True,
+                                       retry_info['retryCount'], retry_info['throttleCount'])
             
             job_info = {
                 'jobId': response['jobId'],
                 'jobName': response['jobName'],
                 'submissionTime': start_time.isoformat(),
-                'submitDuration': (end_time - start_time).total_seconds(),
+                'submitDuration': submit_duration,
+                'submitWallSeconds': submit_wall_seconds,
                 'countdownSeconds': countdown_seconds,
                 'status': 'SUBMITTED'
             }
+            job_info.update(retry_info)
+            if self.target_name:
+                job_info['target'] = self.target_name
+            self.submitted_job_ids.append(response['jobId'])
             
             print(f"✓ ジョブ送信完了: {job_name} (ID: {response['jobId']})")
+            if self.ledger:
+                self.ledger.record_submitted(job_info)
             return job_info
             
-        except Exception as e:
+        except RetryExhaustedError as e:
+            self.metrics.record_submit(e.attempt_seconds, False, e.retries, e.throttle_count)
             error_info = {
                 'jobName': job_name,
-                'error': str(e),
-                'submissionTime': datetime.now().isoformat(),
+                'error': str(e.last_error),
+                'errorCode': error_code(e.last_error),
+                'errorClass': e.error_class,
+                'retryCount': e.retries,
+                'throttleCount': e.throttle_count,
+                'backoffSeconds': e.backoff_seconds,
+                'submitWallSeconds': time.perf_counter() - started,
+                'submissionTime': start_time.isoformat(),
                 'status': 'FAILED_TO_SUBMIT'
             }
-            print(f"✗ ジョブ送信失敗: {job_name} - {str(e)}")
+            if self.target_name:
+                error_info['target'] = self.target_name
+            print(f"✗ ジョブ送信失敗: {job_name} - {str(e)} (リトライ{e.retries}回)")
+            if self.ledger:
+                self.ledger.record_submitted(error_info)
             return error_info
+        finally:
+            self.metrics.in_flight.dec()
     
-    def submit_concurrent_jobs(self, num_jobs, countdown_seconds=30, max_workers=10):
+    def _find_ambiguous_submit(self, job_name):
+        """
+        接続エラー・タイムアウト・5xx で結果が分からない submit_job が受け付けられていたかをジョブ名で確認
+        
+        Returns:
+            dict: 受け付けられていた場合は submit_job の応答に相当する辞書（jobId, jobName）、それ以外はNone
+        """
+        try:
+            job_id = self.find_submitted_jobs([job_name]).get(job_name)
+        except Exception as e:
+            # 確認できない場合はリトライする（重複して送信する可能性がある）
+            print(f"⚠️  送信済みかの確認エラー: {job_name} - {e}")
+            return None
+        if job_id is None:
+            return None
+        print(f"🔎 結果が不明な送信が受け付けられていました: {job_name} (ID: {job_id})")
+        return {'jobId': job_id, 'jobName': job_name}
+    
+    def submit_concurrent_jobs(self, num_jobs, countdown_seconds=30, max_workers=10,
+                               on_result=None, collect_results=True, job_indices=None):
         """
         複数のジョブを同時送信
         
@@ -89,10 +350,16 @@ class BatchJobLauncher:
             num_jobs (int): 送信するジョブ数
             countdown_seconds (int): 各ジョブのカウントダウン秒数
             max_workers (int): 同時実行するワーカー数
+            on_result (callable): ジョブの送信結果が得られるたびに呼び出されるコールバック
+            collect_results (bool): Falseの場合は結果をメモリに保持しない（on_resultで逐次保存する場合）
+            job_indices (list): 送信するジョブ番号（Noneの場合は 1〜num_jobs。再開時に残りのジョブのみ送信する場合に指定）
             
         Returns:
-            list: ジョブ送信結果のリスト
+            list: ジョブ送信結果のリスト（collect_results=Falseの場合は空）
         """
+        if job_indices is None:
+            job_indices = range(1, num_jobs + 1)
+        num_jobs = len(job_indices)
         print(f"🚀 {num_jobs}個のジョブを同時送信開始...")
         print(f"   ジョブキュー: {self.job_queue}")
         print(f"   ジョブ定義: {self.job_definition}")
@@ -102,115 +369,651 @@ class BatchJobLauncher:
         
         start_time = datetime.now()
         job_results = []
+        status_count = {}
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 全ジョブを同時送信
             future_to_job = {
                 executor.submit(self.submit_single_job, f"job{i:03d}", countdown_seconds): i 
-                for i in range(1, num_jobs + 1)
+                for i in job_indices
             }
             
             # 結果を収集
             for future in as_completed(future_to_job):
                 job_result = future.result()
-                job_results.append(job_result)
+                status_count[job_result['status']] = status_count.get(job_result['status'], 0) + 1
+                if on_result:
+                    on_result(job_result)
+                if collect_results:
+                    job_results.append(job_result)
+                del future_to_job[future]
         
         end_time = datetime.now()
         total_duration = (end_time - start_time).total_seconds()
+        total = sum(status_count.values())
         
         print("-" * 50)
-        print(f"📊 送信完了: {len(job_results)}個のジョブ")
+        print(f"📊 送信完了: {total}個のジョブ")
         print(f"   総送信時間: {total_duration:.2f}秒")
-        print(f"   平均送信時間: {total_duration/len(job_results):.2f}秒/ジョブ")
+        print(f"   平均送信時間: {total_duration/max(total, 1):.2f}秒/ジョブ")
+        latency = self.metrics.submit_latency.hdr.summary()
+        if latency['count']:
+            print(f"   送信時間: p50 {latency['p50']:.3f}秒 / p90 {latency['p90']:.3f}秒 / "
+                  f"p99 {latency['p99']:.3f}秒 / 最大 {latency['max']:.3f}秒")
         
         # 送信成功・失敗の統計
-        successful = [j for j in job_results if j['status'] == 'SUBMITTED']
-        failed = [j for j in job_results if j['status'] == 'FAILED_TO_SUBMIT']
+        print(f"   成功: {status_count.get('SUBMITTED', 0)}個")
+        print(f"   失敗: {status_count.get('FAILED_TO_SUBMIT', 0)}個")
+        
+        return job_results
+    
+    def submit_concurrent_jobs_adaptive(self, num_jobs, countdown_seconds=30, max_workers=64,
+                                        initial_workers=4, initial_rate=10.0, max_rate=500.0,
+                                        latency_target=None, on_result=None, collect_results=True):
+        """
+        トークンバケットとAIMD制御で同時実行数・送信レートを自動調整しながらジョブを送信
+        
+        Args:
+            num_jobs (int): 送信するジョブ数
+            countdown_seconds (int): 各ジョブのカウントダウン秒数
+            max_workers (int): 同時実行数の上限
+            initial_workers (int): 同時実行数の初期値
+            initial_rate (float): 送信レートの初期値（件/秒）
+            max_rate (float): 送信レートの上限（件/秒）
+            latency_target (float): これを超える送信時間を混雑とみなす（秒、Noneで無効）
+            on_result (callable): ジョブの送信結果が得られるたびに呼び出されるコールバック
+            collect_results (bool): Falseの場合は結果をメモリに保持しない（on_resultで逐次保存する場合）
+            
+        Returns:
+            list: ジョブ送信結果のリスト（collect_results=Falseの場合は空）
+        """
+        print(f"🚀 {num_jobs}個のジョブを適応制御で送信開始...")
+        print(f"   ジョブキュー: {self.job_queue}")
+        print(f"   ジョブ定義: {self.job_definition}")
+        print(f"   カウントダウン: {countdown_seconds}秒")
+        print(f"   同時実行数: {initial_workers}〜{max_workers}")
+        print(f"   初期送信レート: {initial_rate}件/秒 (上限: {max_rate}件/秒)")
+        print("-" * 50)
+        
+        controller = AimdController(
+            initial_concurrency=initial_workers,
+            max_concurrency=max_workers,
+            initial_rate=initial_rate,
+            max_rate=max_rate,
+            latency_target=latency_target
+        )
+        engine = AsyncSubmitEngine(
+            lambda i: self.submit_single_job(f"job{i:03d}", countdown_seconds),
+            controller=controller,
+            on_result=on_result,
+            collect_results=collect_results
+        )
+        job_results = engine.run(range(1, num_jobs + 1))
+        self.last_submit_stats = engine.stats()
+        stats = self.last_submit_stats
+        
+        print("-" * 50)
+        print(f"📊 送信完了: {stats['totalResults']}個のジョブ")
+        print(f"   総送信時間: {stats['elapsedSeconds']:.2f}秒")
+        print(f"   到達送信レート: {stats['settledSubmitRate']:.2f}件/秒")
+        print(f"   最終同時実行数: {stats['finalConcurrency']} (ピーク: {stats['peakInFlight']})")
+        print(f"   最終レート上限: {stats['finalRateLimit']:.2f}件/秒")
+        print(f"   スロットリング: {stats['throttleEvents']}回")
+        print(f"   成功: {stats['successfulResults']}個")
+        print(f"   失敗: {stats['totalResults'] - stats['successfulResults']}個")
+        
+        return job_results
+    
+    def submit_with_load_profile(self, offsets, countdown_seconds=30, max_workers=32,
+                                 on_result=None, collect_results=True):
+        """
+        負荷プロファイルの送信予定時刻どおりにジョブを送信（オープンループ）
+        
+        各ジョブのレコードには予定送信時刻（intendedSendTime）、実際の送信時刻（actualSendTime）、
+        送信遅延（sendLagSeconds）、予定時刻からの応答時間（intendedResponseSeconds）を記録する。
+        
+        Args:
+            offsets (list): 開始からの送信予定時刻（秒）。load_profiles.parse_load_profileの戻り値
+            countdown_seconds (int): 各ジョブのカウントダウン秒数
+            max_workers (int): 送信を実行するワーカー数
+            on_result (callable): ジョブの送信結果が得られるたびに呼び出されるコールバック
+            collect_results (bool): Falseの場合は結果をメモリに保持しない（on_resultで逐次保存する場合）
+            
+        Returns:
+            list: ジョブ送信結果のリスト（collect_results=Falseの場合は空）
+        """
+        duration = offsets[-1] if offsets else 0
+        print(f"🚀 {len(offsets)}個のジョブを負荷プロファイルに従って送信開始...")
+        print(f"   ジョブキュー: {self.job_queue}")
+        print(f"   ジョブ定義: {self.job_definition}")
+        print(f"   カウントダウン: {countdown_seconds}秒")
+        print(f"   予定送信期間: {duration:.2f}秒 (平均 {len(offsets) / max(duration, 1e-9):.2f}件/秒)")
+        print(f"   最大ワーカー数: {max_workers}")
+        print("-" * 50)
+        
+        lags = []
+        status_count = {}
+        
+        def record(job_result):
+            lags.append(job_result['sendLagSeconds'])
+            status_count[job_result['status']] = status_count.get(job_result['status'], 0) + 1
+            if on_result:
+                on_result(job_result)
+        
+        scheduler = OpenLoopScheduler(
+            lambda i: self.submit_single_job(f"job{i:03d}", countdown_seconds),
+            offsets,
+            max_workers=max_workers,
+            on_result=record,
+            collect_results=collect_results
+        )
+        start_time = datetime.now()
+        job_results = scheduler.run()
+        total_duration = (datetime.now() - start_time).total_seconds()
+        
+        lags.sort()
+        print("-" * 50)
+        print(f"📊 送信完了: {len(lags)}個のジョブ")
+        print(f"   総送信時間: {total_duration:.2f}秒")
+        if lags:
+            print(f"   送信遅延: 中央値 {lags[len(lags) // 2] * 1000:.1f}ms / "
+                  f"p99 {lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000:.1f}ms / "
+                  f"最大 {lags[-1] * 1000:.1f}ms")
+        print(f"   成功: {status_count.get('SUBMITTED', 0)}個")
+        print(f"   失敗: {status_count.get('FAILED_TO_SUBMIT', 0)}個")
+        
+        return job_results
+    
+    def submit_array_job(self, num_jobs, countdown_seconds=30, job_params=None, on_result=None):
+        """
+        配列ジョブ（arrayProperties.size=N）として1回のAPI呼び出しでジョブを送信
+        
+        子ジョブは「<親ジョブID>:<インデックス>」のIDで展開され、
+        submit_concurrent_jobs と同じ形式の結果リストとして返される。
+        
+        Args:
+            num_jobs (int): 子ジョブ数（2〜10000）
+            countdown_seconds (int): 各子ジョブのカウントダウン秒数
+            job_params (dict): 追加のジョブパラメータ
+            on_result (callable): 子ジョブごとの送信結果に対して呼び出されるコールバック
+            
+        Returns:
+            list: 子ジョブごとの送信結果のリスト
+        """
+        if not ARRAY_JOB_MIN_SIZE <= num_jobs <= ARRAY_JOB_MAX_SIZE:
+            raise ValueError(
+                f"配列ジョブのサイズは{ARRAY_JOB_MIN_SIZE}〜{ARRAY_JOB_MAX_SIZE}の範囲で指定してください: {num_jobs}"
+            )
+        
+        print(f"🚀 配列ジョブとして{num_jobs}個の子ジョブを送信開始...")
+        print(f"   ジョブキュー: {self.job_queue}")
+        print(f"   ジョブ定義: {self.job_definition}")
+        print(f"   カウントダウン: {countdown_seconds}秒")
+        print("-" * 50)
+        
+        params = {'arrayProperties': {'size': num_jobs}}
+        if job_params:
+            params.update(job_params)
+        
+        parent = self.submit_single_job("array", countdown_seconds, params)
+        job_results = self.expand_array_job(parent, num_jobs)
+        if on_result:
+            for child in job_results:
+                on_result(child)
+        
+        print("-" * 50)
+        print(f"📊 送信完了: {len(job_results)}個の子ジョブ（API呼び出し1回）")
+        if parent['status'] == 'SUBMITTED':
+            print(f"   親ジョブID: {parent['jobId']}")
+            print(f"   送信時間: {parent['submitDuration']:.2f}秒")
+        
+        return job_results
+    
+    @staticmethod
+    def expand_array_job(parent, num_jobs):
+        """
+        配列ジョブの送信結果を子ジョブごとのレコードに展開
+        
+        送信は1回のAPI呼び出しのため、送信時間・リトライ回数などの送信の計測値（SUBMIT_ATTEMPT_KEYS）は
+        最初の子ジョブ（arrayIndex=0）のみに残し、集計で子ジョブの数だけ重複して数えないようにする。
+        
+        Args:
+            parent (dict): submit_single_jobの戻り値（親ジョブ）
+            num_jobs (int): 子ジョブ数
+            
+        Returns:
+            list: 子ジョブごとの送信結果のリスト
+        """
+        children = []
+        for index in range(num_jobs):
+            child = dict(parent)
+            child['arrayIndex'] = index
+            child['jobName'] = f"{parent['jobName']}:{index}"
+            if index:
+                for key in SUBMIT_ATTEMPT_KEYS:
+                    child.pop(key, None)
+            if parent['status'] == 'SUBMITTED':
+                child['arrayJobId'] = parent['jobId']
+                child['jobId'] = f"{parent['jobId']}:{index}"
+            children.append(child)
+        return children
+    
+    def submit_pipeline(self, stages, countdown_seconds=30, max_workers=10, on_result=None):
+        """
+        依存関係（dependsOn）のあるステージをトポロジカル順のウェーブ単位で送信
+        
+        同じウェーブのステージは並列に送信し、次のウェーブは依存先のジョブIDが揃ってから送信する。
+        配列ジョブのステージは子ジョブに展開し、各レコードにステージ名（'stage'）を追加する。
+        依存先のステージの送信に失敗した場合、そのステージは送信せずに FAILED_TO_SUBMIT とする。
+        
+        Args:
+            stages (list): job_pipeline.PipelineStage のリスト
+            countdown_seconds (int): カウントダウン秒数（ステージで指定が無い場合）
+            max_workers (int): 同じウェーブのステージを同時に送信するワーカー数
+            on_result (callable): ジョブごとの送信結果に対して呼び出されるコールバック
+            
+        Returns:
+            list: ジョブごとの送信結果のリスト
+        """
+        waves = topological_waves(stages)
+        print(f"🚀 {len(stages)}ステージ（{sum(s.jobs for s in stages)}ジョブ）のパイプラインを"
+              f"{len(waves)}ウェーブで送信開始...")
+        print(f"   ジョブキュー: {self.job_queue}")
+        print(f"   ジョブ定義: {self.job_definition}")
+        print("-" * 50)
+        
+        parents = {}
+        job_results = []
+        wave_stats = []
+        start_time = time.perf_counter()
+        for number, wave in enumerate(waves, 1):
+            print(f"🌊 ウェーブ{number}: {', '.join(stage.name for stage in wave)}")
+            wave_started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(wave)))) as executor:
+                future_to_stage = {
+                    executor.submit(self._submit_stage, stage, parents, countdown_seconds): stage
+                    for stage in wave
+                }
+                for future in as_completed(future_to_stage):
+                    stage = future_to_stage[future]
+                    parents[stage.name] = future.result()
+            wave_stats.append({
+                'wave': number,
+                'stages': [stage.name for stage in wave],
+                'submitSeconds': time.perf_counter() - wave_started
+            })
+            
+            for stage in wave:
+                parent = parents[stage.name]
+                children = self.expand_array_job(parent, stage.jobs) if stage.is_array else [dict(parent)]
+                for child in children:
+                    child['stage'] = stage.name
+                    if on_result:
+                        on_result(child)
+                job_results.extend(children)
+        
+        total_duration = time.perf_counter() - start_time
+        self.last_pipeline_stats = {'waves': wave_stats, 'submitSeconds': total_duration}
+        failed = [name for name, parent in parents.items() if parent['status'] != 'SUBMITTED']
+        print("-" * 50)
+        print(f"📊 送信完了: {len(stages)}ステージ / {len(job_results)}ジョブ")
+        print(f"   総送信時間: {total_duration:.2f}秒")
+        if failed:
+            print(f"   送信失敗: {', '.join(failed)}")
+        return job_results
+    
+    def _submit_stage(self, stage, parents, countdown_seconds):
+        """パイプラインの1ステージを dependsOn 付きで送信（submit_single_job の戻り値を返す）"""
+        depends_on = []
+        for dependency, kind in stage.depends_on:
+            parent = parents[dependency]
+            if parent['status'] != 'SUBMITTED':
+                print(f"✗ ステージ送信中止: {stage.name} - 依存先 {dependency} が送信されていません")
+                return {
+                    'jobName': self.job_name(f"stage-{stage.name}"),
+                    'error': f"依存先のステージ {dependency} が送信されていません",
+                    'errorCode': 'DependencyNotSubmitted',
+                    'submissionTime': datetime.now().isoformat(),
+                    'status': 'FAILED_TO_SUBMIT'
+                }
+            entry = {'jobId': parent['jobId']}
+            if kind:
+                entry['type'] = kind
+            depends_on.append(entry)
+        if stage.sequential:
+            depends_on.append({'type': 'SEQUENTIAL'})
+        
+        params = {}
+        if depends_on:
+            params['dependsOn'] = depends_on
+        if stage.is_array:
+            params['arrayProperties'] = {'size': stage.jobs}
+        countdown = stage.countdown if stage.countdown is not None else countdown_seconds
+        return self.submit_single_job(f"stage-{stage.name}", countdown, params)
+    
+    def find_submitted_jobs(self, job_names):
+        """
+        ジョブ名から送信済みのジョブを検索（送信結果を記録する前に停止したジョブの確認用）
+        
+        この実行のジョブ名の接頭辞（1件の場合はジョブ名）で list_jobs を1回（ページ単位）検索する。
+        
+        Args:
+            job_names (list): 確認するジョブ名
+            
+        Returns:
+            dict: ジョブ名→ジョブID（送信済みのジョブのみ）
+        """
+        wanted = set(job_names)
+        found = {}
+        pattern = next(iter(wanted)) if len(wanted) == 1 else f"{job_name_prefix(self.run_id)}*"
+        params = {
+            'jobQueue': self.job_queue,
+            'filters': [{'name': 'JOB_NAME', 'values': [pattern]}]
+        }
+        while True:
+            response = self.batch_client.list_jobs(**params)
+            for summary in response.get('jobSummaryList', []):
+                if summary['jobName'] in wanted:
+                    found[summary['jobName']] = summary['jobId']
+            if not response.get('nextToken'):
+                return found
+            params['nextToken'] = response['nextToken']
+    
+    def resume_submission(self, num_jobs, countdown_seconds=30, max_workers=10, array_job=False,
+                          on_result=None, collect_results=True):
+        """
+        ジョブ台帳をもとに中断した実行を再開（送信済みのジョブは再送信しない）
+        
+        送信結果が記録されていないジョブ（INTENDED）は find_submitted_jobs で送信済みかを確認し、
+        未送信のジョブと送信に失敗したジョブのみを submit_concurrent_jobs で送信する。
+        
+        Args:
+            num_jobs (int): 実行全体のジョブ数
+            countdown_seconds (int): 各ジョブのカウントダウン秒数
+            max_workers (int): 同時実行するワーカー数
+            array_job (bool): 配列ジョブとして送信した実行か
+            on_result (callable): ジョブの送信結果（送信済みのジョブを含む）に対して呼び出されるコールバック
+            collect_results (bool): Falseの場合は結果をメモリに保持しない
+            
+        Returns:
+            list: 送信済みのジョブと今回送信したジョブの送信結果のリスト
+        """
+        records = self.ledger.jobs()
+        in_doubt = [name for name, (state, _) in records.items() if state == LEDGER_INTENDED]
+        if in_doubt:
+            print(f"🔎 送信結果が記録されていない{len(in_doubt)}個のジョブを確認中...")
+            found = self.find_submitted_jobs(in_doubt)
+            for name, job_id in found.items():
+                record = {
+                    'jobId': job_id,
+                    'jobName': name,
+                    'countdownSeconds': countdown_seconds,
+                    'status': 'SUBMITTED',
+                    'recovered': True
+                }
+                self.ledger.record_submitted(record)
+                records[name] = ('SUBMITTED', record)
+            print(f"   送信済み: {len(found)}個 / 未送信: {len(in_doubt) - len(found)}個")
         
-        print(f"   成功: {len(successful)}個")
-        print(f"   失敗: {len(failed)}個")
+        if array_job:
+            state, parent = records.get(self.job_name('array'), (None, None))
+            if state not in LEDGER_SUBMITTED_STATES:
+                return self.submit_array_job(num_jobs, countdown_seconds, on_result=on_result)
+            print(f"♻️  実行 {self.run_id} を再開: 配列ジョブは送信済みです (親ジョブID: {parent['jobId']})")
+            self._restore_submitted(parent)
+            job_results = self.expand_array_job(parent, num_jobs)
+            for child in job_results:
+                stored = records.get(child['jobName'], (None, None))[1]
+                if stored:
+                    child.update(stored)
+                if on_result:
+                    on_result(child)
+            return job_results
         
+        submitted = {}
+        for index in range(1, num_jobs + 1):
+            state, record = records.get(self.job_name(f"job{index:03d}"), (None, None))
+            if state in LEDGER_SUBMITTED_STATES:
+                submitted[index] = record
+                self._restore_submitted(record)
+        remaining = [i for i in range(1, num_jobs + 1) if i not in submitted]
+        print(f"♻️  実行 {self.run_id} を再開: 送信済み {len(submitted)}個 / 残り {len(remaining)}個")
+        
+        job_results = []
+        for record in submitted.values():
+            if on_result:
+                on_result(record)
+            if collect_results:
+                job_results.append(record)
+        if remaining:
+            job_results.extend(self.submit_concurrent_jobs(
+                num_jobs, countdown_seconds, max_workers,
+                on_result=on_result, collect_results=collect_results, job_indices=remaining
+            ))
         return job_results
     
-    def monitor_jobs(self, job_results, check_interval=10):
+    def _restore_submitted(self, record):
+        """台帳から復元した送信済みのジョブを停止（drain）の対象に加える"""
+        self.submitted_job_ids.append(record['jobId'])
+    
+    def describe_jobs_chunked(self, job_ids, max_workers=4):
+        """
+        describe_jobs を100件ずつのチャンクに分割して並列に呼び出す
+        
+        Args:
+            job_ids (list): 状態を取得するジョブIDのリスト
+            max_workers (int): チャンクを並列にポーリングするワーカー数
+            
+        Returns:
+            tuple: (ジョブID→describe_jobsのジョブ情報の辞書, 取得に失敗したジョブIDのリスト)
+        """
+        chunks = [
+            job_ids[i:i + DESCRIBE_JOBS_MAX_IDS]
+            for i in range(0, len(job_ids), DESCRIBE_JOBS_MAX_IDS)
+        ]
+        jobs = {}
+        failed_ids = []
+        
+        if not chunks:
+            return jobs, failed_ids
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            future_to_chunk = {
+                executor.submit(self.batch_client.describe_jobs, jobs=chunk): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(future_to_chunk):
+                try:
+                    for job in future.result()['jobs']:
+                        jobs[job['jobId']] = job
+                except Exception as e:
+                    print(f"監視エラー: {str(e)}")
+                    failed_ids.extend(future_to_chunk[future])
+        
+        return jobs, failed_ids
+    
+    def _poll_updates(self, job_ids, max_workers):
+        """describe_jobsで取得したジョブ情報を monitor_jobs の更新形式で返す"""
+        jobs, _ = self.describe_jobs_chunked(job_ids, max_workers)
+        return [(job, None) for job in jobs.values()]
+    
+    def monitor_jobs(self, job_results, check_interval=10, max_workers=4,
+                     status_source=None, reconcile_interval=60, progress=None):
         """
         送信されたジョブの状態を監視
         
+        終了状態（SUCCEEDED/FAILED）になったジョブは監視対象から外すため、
+        1回のポーリングにかかるAPI呼び出し数は「未完了ジョブ数/100」に比例する。
+        
+        status_source を指定した場合はジョブ状態変化イベントで状態を更新し、
+        describe_jobs のポーリングは reconcile_interval ごとの取りこぼし補正にのみ使う。
+        
         Args:
             job_results (list): submit_concurrent_jobsの戻り値
-            check_interval (int): チェック間隔（秒）
+            check_interval (int): チェック間隔（秒）。イベント利用時は1回の受信で待機する最大時間
+            max_workers (int): describe_jobsを並列に呼び出すワーカー数
+            status_source (EventStatusSource): ジョブ状態変化イベントの取得元（Noneでポーリングのみ）
+            reconcile_interval (float): イベント利用時に describe_jobs で補正する間隔（秒）
+            progress (ProgressRenderer): 進捗表示（Noneの場合は TextProgressRenderer）
+            
+        Returns:
+            dict: ジョブID→最後に取得したdescribe_jobsのジョブ情報
+                  （各状態を最初に観測した時刻を 'observedStatusTimes' に追加）
         """
         successful_jobs = [j for j in job_results if j['status'] == 'SUBMITTED']
         if not successful_jobs:
             print("監視対象のジョブがありません")
-            return
+            return {}
         
         job_ids = [j['jobId'] for j in successful_jobs]
-        print(f"📈 {len(job_ids)}個のジョブを監視開始...")
+        progress = progress or TextProgressRenderer()
         
-        completed_jobs = set()
+        active = dict.fromkeys(job_ids)
+        total = len(active)
+        # 共有のイベントキューでは、この実行のジョブ（配列ジョブは親ジョブを含む）のイベントのみを消費する
+        monitored = set(job_ids) | {job_id.split(':')[0] for job_id in job_ids}
+        progress.start(total)
+        final_jobs = {}
+        status_count = {}
+        # ジョブID→{状態: 最初に観測した時刻(エポックミリ秒)}
+        observed = {}
+        last_reconcile = None
         
-        while len(completed_jobs) < len(job_ids):
-            try:
-                # ジョブ状態を取得
-                response = self.batch_client.describe_jobs(jobs=job_ids)
-                
-                current_time = datetime.now().strftime("%H:%M:%S")
-                print(f"\n[{current_time}] ジョブ状態:")
-                
-                status_count = {}
+        while active:
+            if status_source is None:
+                updates = self._poll_updates(list(active), max_workers)
+            else:
+                updates = status_source.receive(check_interval, monitored)
+                if last_reconcile is None or time.monotonic() - last_reconcile >= reconcile_interval:
+                    updates.extend(self._poll_updates(list(active), max_workers))
+                    last_reconcile = time.monotonic()
+                if not updates:
+                    continue
+            polled_at = int(time.time() * 1000)
+            
+            for job, event_time in updates:
+                job_id = job['jobId']
+                if job_id not in active:
+                    continue
                 
-                for job in response['jobs']:
-                    job_id = job['jobId']
-                    job_name = job['jobName']
-                    status = job['jobStatus']
-                    
-                    # 状態をカウント
-                    status_count[status] = status_count.get(status, 0) + 1
-                    
-                    # 完了したジョブを記録
-                    if status in ['SUCCEEDED', 'FAILED'] and job_id not in completed_jobs:
-                        completed_jobs.add(job_id)
-                        
-                        if status == 'SUCCEEDED':
-                            print(f"  ✓ {job_name}: {status}")
-                        else:
-                            print(f"  ✗ {job_name}: {status}")
-                            if 'statusReason' in job:
-                                print(f"    理由: {job['statusReason']}")
-                    elif status in ['SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING']:
-                        print(f"  ⏳ {job_name}: {status}")
+                previous = final_jobs.get(job_id, {}).get('jobStatus')
+                status = job['jobStatus']
+                # 順不同で届いたイベントや、イベントより古い describe_jobs の結果で状態を巻き戻さない
+                if previous and STATUS_ORDER.get(status, 0) < STATUS_ORDER.get(previous, 0):
+                    continue
                 
-                # 状態サマリーを表示
-                print(f"  状態サマリー: {dict(status_count)}")
-                print(f"  完了: {len(completed_jobs)}/{len(job_ids)}")
+                job = dict(final_jobs.get(job_id, {}), **job)
+                observed.setdefault(job_id, {}).setdefault(status, event_time or polled_at)
+                job['observedStatusTimes'] = observed[job_id]
+                final_jobs[job_id] = job
+                if previous:
+                    status_count[previous] -= 1
+                status_count[status] = status_count.get(status, 0) + 1
+                if status != previous:
+                    progress.transition(job, previous, status)
                 
-                if len(completed_jobs) < len(job_ids):
-                    time.sleep(check_interval)
-                    
-            except Exception as e:
-                print(f"監視エラー: {str(e)}")
+                # 完了したジョブを監視対象から外す
+                if status in TERMINAL_STATUSES:
+                    del active[job_id]
+                    if self.ledger:
+                        self.ledger.record_terminal(job_id, status)
+            
+            # 変化した分だけを表示
+            self.metrics.set_job_states(status_count)
+            progress.update(status_count, total - len(active))
+            
+            if active and status_source is None:
                 time.sleep(check_interval)
         
-        print("\n🎉 全ジョブが完了しました！")
+        progress.finish(status_count, total)
+        return final_jobs
     
-    def save_results(self, job_results, output_file):
+    def drain(self, timeout=300, max_workers=16, rate=20.0):
+        """
+        この実行で送信済みのジョブを停止（待機中は取り消し、実行中は停止）して終了を確認
+        
+        Args:
+            timeout (float): 終了を確認するまで待つ最大時間（秒）
+            max_workers (int): 同時に API を呼び出すワーカー数
+            rate (float): 1秒あたりの API 呼び出し数の上限
+            
+        Returns:
+            dict: job_drain.JobDrainer.drain の結果
+        """
+        # 送信中のジョブの送信結果を待ってから停止するジョブを決める
+        deadline = time.monotonic() + 30
+        while self.metrics.in_flight.value() > 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        drainer = JobDrainer(self.batch_client, max_workers=max_workers, rate=rate)
+        return drainer.drain(list(self.submitted_job_ids), job_queue=self.job_queue, timeout=timeout)
+    
+    def client_pool_stats(self):
+        """
+        Batchクライアントの接続プールの利用状況
+        
+        Returns:
+            dict: aws_clients.ConnectionPoolMetrics.snapshot() の値（計測できない場合はNone）
+        """
+        metrics = getattr(self.batch_client, 'pool_metrics', None)
+        return metrics.snapshot() if metrics else None
+    
+    @staticmethod
+    def apply_lifecycle(job_results, final_jobs):
+        """
+        monitor_jobsの戻り値から各ジョブのライフサイクル情報を送信結果に追加
+        
+        Args:
+            job_results (list): ジョブ送信結果（レコードを直接更新する）
+            final_jobs (dict): monitor_jobsの戻り値
+            
+        Returns:
+            list: ライフサイクル情報を追加したレコードのリスト
+        """
+        updated = []
+        for job_result in job_results:
+            job = final_jobs.get(job_result.get('jobId'))
+            if job is None:
+                continue
+            job_result.update(job_lifecycle(job))
+            updated.append(job_result)
+        return updated
+    
+    def result_header(self):
+        """
+        結果ファイルに記録する実行条件
+        
+        Returns:
+            dict: ジョブキュー・ジョブ定義・リージョン
+        """
+        return {
+            'runId': self.run_id,
+            'jobQueue': self.job_queue,
+            'jobDefinition': self.job_definition,
+            'region': self.region
+        }
+    
+    def save_results(self, job_results, output_file, metadata=None):
         """
         結果をJSONファイルに保存
         
         Args:
             job_results (list): ジョブ送信結果
             output_file (str): 出力ファイルパス
+            metadata (dict): 結果に追加する実行時の情報
         """
         result_data = {
             'timestamp': datetime.now().isoformat(),
+            'runId': self.run_id,
             'jobQueue': self.job_queue,
             'jobDefinition': self.job_definition,
             'totalJobs': len(job_results),
             'successfulJobs': len([j for j in job_results if j['status'] == 'SUBMITTED']),
             'failedJobs': len([j for j in job_results if j['status'] == 'FAILED_TO_SUBMIT']),
+            'submissionMode': 'array' if any('arrayIndex' in j for j in job_results) else 'individual',
             'jobs': job_results
         }
+        if metadata:
+            result_data.update(metadata)
         
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(result_data, f, ensure_ascii=False, indent=2)
@@ -218,41 +1021,707 @@ class BatchJobLauncher:
         print(f"💾 結果を保存しました: {output_file}")
 
 
-def main():
+class MultiTargetLauncher(BatchJobLauncher):
+    """
+    複数の送信先（ジョブキュー・ジョブ定義・リージョン）にジョブを振り分けて送信するランチャー
+    
+    submit_single_job を送信先ごとのランチャーに振り分けるため、通常・適応制御・負荷プロファイル・
+    配列ジョブの各送信方式と monitor_jobs をそのまま使用できる。各ジョブの結果には送信先の名前（target）が記録される。
+    """
+    
+    def __init__(self, targets, routing='weighted', retry_policy=None,
+                 max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS, client_factory=None,
+                 metrics=None, run_id=None, ledger=None, backlog_refresh=5.0):
+        """
+        Args:
+            targets (list): job_router.JobTarget のリスト
+            routing (str): 振り分け方式（'weighted' / 'least-backlog'）
+            retry_policy (RetryPolicy): ジョブ送信のリトライポリシー（全送信先で共有）
+            max_pool_connections (int): 送信先ごとのHTTP接続プールのサイズ
+            client_factory (callable): 送信先を受け取りBatchクライアントを返す関数（Noneの場合は boto3 で作成）
+            metrics (LauncherMetrics): 送信・監視の計測値の記録先（全送信先で共有）
+            run_id (str): 実行ID
+            ledger (JobLedger): ジョブ台帳
+            backlog_refresh (float): least-backlog の場合に滞留数を取得し直す間隔（秒）
+        """
+        self.targets = targets
+        # ジョブ名と台帳の記録を送信先によらず揃えるため、全送信先で同じ実行IDを使う
+        run_id = run_id or new_run_id()
+        for target in targets:
+            target.launcher = BatchJobLauncher(
+                target.job_queue, target.job_definition, target.region,
+                retry_policy=retry_policy,
+                max_pool_connections=max_pool_connections,
+                batch_client=client_factory(target) if client_factory else None,
+                metrics=metrics,
+                run_id=run_id,
+                ledger=ledger
+            )
+            target.launcher.target_name = target.name
+        first = targets[0].launcher
+        super().__init__(
+            ','.join(dict.fromkeys(t.job_queue for t in targets)),
+            ','.join(dict.fromkeys(t.job_definition for t in targets)),
+            ','.join(dict.fromkeys(t.region for t in targets)),
+            retry_policy=first.retry_policy,
+            batch_client=first.batch_client,
+            metrics=first.metrics,
+            run_id=first.run_id,
+            ledger=ledger
+        )
+        for target in targets:
+            target.launcher.stop_requested = self.stop_requested
+        
+        self.routing = routing
+        if routing == 'least-backlog':
+            self.router = LeastBacklogRouter(targets, self.runnable_count, backlog_refresh)
+        else:
+            self.router = WeightedRouter(targets)
+        # ジョブID（配列ジョブは親ジョブID）→送信先
+        self._job_targets = {}
+        self._target_stats = {
+            t.name: {'totalJobs': 0, 'successfulJobs': 0, 'submitDuration': 0.0, 'throttleCount': 0}
+            for t in targets
+        }
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def runnable_count(target):
+        """送信先のジョブキューで RUNNABLE のジョブ数（BACKLOG_MAX_PAGES ページ分まで）"""
+        count = 0
+        params = {'jobQueue': target.job_queue, 'jobStatus': 'RUNNABLE', 'maxResults': 100}
+        for _ in range(BACKLOG_MAX_PAGES):
+            response = target.launcher.batch_client.list_jobs(**params)
+            count += len(response.get('jobSummaryList', []))
+            if not response.get('nextToken'):
+                break
+            params['nextToken'] = response['nextToken']
+        return count
+    
+    def submit_single_job(self, job_suffix, countdown_seconds=30, job_params=None):
+        """振り分け先のランチャーで単一のジョブを送信（結果に送信先の名前を追加）"""
+        target = self.router.choose()
+        job_info = target.launcher.submit_single_job(job_suffix, countdown_seconds, job_params)
+        job_info['target'] = target.name
+        with self._lock:
+            stats = self._target_stats[target.name]
+            stats['totalJobs'] += 1
+            stats['throttleCount'] += job_info.get('throttleCount', 0)
+            if job_info['status'] == 'SUBMITTED':
+                stats['successfulJobs'] += 1
+                stats['submitDuration'] += job_info['submitDuration']
+                self._job_targets[job_info['jobId']] = target
+        return job_info
+    
+    def _register_target(self, job_id, target):
+        with self._lock:
+            self._job_targets.setdefault(job_id.split(':')[0], target)
+    
+    def describe_jobs_chunked(self, job_ids, max_workers=4):
+        """
+        送信先ごとに describe_jobs を呼び出して結果をまとめる
+        
+        このランチャーで送信していないジョブ（再開時に台帳から復元したジョブなど）は各送信先で順に探し、
+        見つかった送信先に対応付ける。どの送信先でも見つからないジョブは取得に失敗したジョブとして返す。
+        """
+        by_target = {}
+        unknown = []
+        for job_id in job_ids:
+            target = self._job_targets.get(job_id.split(':')[0])
+            if target is None:
+                unknown.append(job_id)
+            else:
+                by_target.setdefault(target.name, (target, []))[1].append(job_id)
+        
+        jobs = {}
+        failed_ids = []
+        for target, target_job_ids in by_target.values():
+            target_jobs, target_failed = target.launcher.describe_jobs_chunked(target_job_ids, max_workers)
+            jobs.update(target_jobs)
+            failed_ids.extend(target_failed)
+        
+        for target in self.targets:
+            if not unknown:
+                break
+            target_jobs, _ = target.launcher.describe_jobs_chunked(unknown, max_workers)
+            for job_id in target_jobs:
+                self._register_target(job_id, target)
+            jobs.update(target_jobs)
+            unknown = [job_id for job_id in unknown if job_id not in target_jobs]
+        failed_ids.extend(unknown)
+        return jobs, failed_ids
+    
+    def find_submitted_jobs(self, job_names):
+        """送信先ごとのジョブキューから送信済みのジョブを探す（見つかったジョブは送信先に対応付ける）"""
+        found = {}
+        for target in self.targets:
+            remaining = [name for name in job_names if name not in found]
+            if not remaining:
+                break
+            for name, job_id in target.launcher.find_submitted_jobs(remaining).items():
+                found[name] = job_id
+                self._register_target(job_id, target)
+        return found
+    
+    def _restore_submitted(self, record):
+        """
+        台帳から復元した送信済みのジョブを送信先に対応付け、送信先のランチャーの停止（drain）の対象に加える
+        
+        送信先は台帳に記録された送信先、記録が無い場合は find_submitted_jobs で見つかった送信先とする。
+        """
+        target = next((t for t in self.targets if t.name == record.get('target')), None)
+        if target is None:
+            target = self._job_targets.get(record['jobId'].split(':')[0])
+        if target is None:
+            print(f"⚠️  送信先が不明なため停止の対象に含めません: {record['jobName']} (ID: {record['jobId']})")
+            return
+        self._register_target(record['jobId'], target)
+        target.launcher.submitted_job_ids.append(record['jobId'])
+    
+    def validate_job_definition(self, cache):
+        """送信先ごとのジョブ定義を検証（送信先の名前 → JobDefinitionInfo）"""
+        return {target.name: target.launcher.validate_job_definition(cache) for target in self.targets}
+    
+    def job_definition_summary(self):
+        summaries = {target.name: target.launcher.job_definition_summary() for target in self.targets}
+        return summaries if any(summaries.values()) else None
+    
+    def capacity_samplers(self, interval, ecs_client_factory):
+        """送信先ごとのキャパシティのサンプラー（送信先の名前 → CapacitySampler）"""
+        return {
+            target.name: CapacitySampler(
+                target.launcher.batch_client, ecs_client_factory(target.launcher), target.job_queue, interval)
+            for target in self.targets
+        }
+    
+    def drain(self, timeout=300, max_workers=16, rate=20.0):
+        """送信先ごとに送信済みのジョブを並列に停止（送信先の名前 → JobDrainer.drain の結果）"""
+        targets = [t for t in self.targets if t.launcher.submitted_job_ids]
+        if not targets:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = {t.name: executor.submit(t.launcher.drain, timeout, max_workers, rate) for t in targets}
+            return {name: future.result() for name, future in futures.items()}
+    
+    def client_pool_stats(self):
+        """全送信先のBatchクライアントの接続プールの利用状況の合計"""
+        total = None
+        for target in self.targets:
+            stats = target.launcher.client_pool_stats()
+            if not stats:
+                continue
+            if total is None:
+                total = dict(stats)
+            else:
+                for key, value in stats.items():
+                    total[key] += value
+        return total
+    
+    def result_header(self):
+        header = super().result_header()
+        header['routing'] = self.routing
+        header['targets'] = [t.to_dict() for t in self.targets]
+        return header
+    
+    def target_breakdown(self):
+        """
+        送信先ごとの送信結果の内訳
+        
+        Returns:
+            dict: 送信先の名前 → {jobQueue, jobDefinition, region, weight, totalJobs, successfulJobs,
+                  failedJobs, avgSubmitDuration, throttleCount}
+        """
+        breakdown = {}
+        with self._lock:
+            for target in self.targets:
+                stats = self._target_stats[target.name]
+                entry = target.to_dict()
+                entry.pop('name')
+                entry.update(
+                    totalJobs=stats['totalJobs'],
+                    successfulJobs=stats['successfulJobs'],
+                    failedJobs=stats['totalJobs'] - stats['successfulJobs'],
+                    avgSubmitDuration=(stats['submitDuration'] / stats['successfulJobs']
+                                       if stats['successfulJobs'] else None),
+                    throttleCount=stats['throttleCount']
+                )
+                breakdown[target.name] = entry
+        return breakdown
+
+
+def print_pipeline_analysis(analysis):
+    """analyze_pipeline の結果（ステージごとの待ち時間とクリティカルパス）を表示"""
+    print("\n🧭 パイプラインの分析:")
+    for name, stage in analysis['stages'].items():
+        if not stage['completedJobs']:
+            print(f"   {name}: 完了したジョブがありません")
+            continue
+        latency = stage['queueLatency']
+        print(f"   {name}: {stage['completedJobs']}/{stage['jobs']}ジョブ / 所要 {stage['durationSeconds']:.1f}秒 / "
+              f"依存解除→実行開始 p50 {latency['p50']:.1f}秒, p90 {latency['p90']:.1f}秒")
+    if analysis['criticalPath']:
+        steps = ' → '.join(
+            step['stage'] + (f"[{step['arrayIndex']}]" if step['arrayIndex'] is not None else '')
+            for step in analysis['criticalPath']
+        )
+        print(f"   クリティカルパス: {steps}")
+        print(f"   クリティカルパス所要時間: {analysis['criticalPathSeconds']:.1f}秒 "
+              f"(実行 {analysis['criticalPathRunSeconds']:.1f}秒 + 待ち {analysis['criticalPathQueueSeconds']:.1f}秒)"
+              f" / 全体 {analysis['makespanSeconds']:.1f}秒")
+
+
+def main(argv=None):
+    """
+    コマンドラインのエントリーポイント
+    
+    Args:
+        argv (list): コマンドライン引数（Noneの場合はsys.argvを使用。run-scenarios.pyから呼び出す場合に指定）
+    """
     parser = argparse.ArgumentParser(description='AWS Batchジョブ同時起動テスト')
-    parser.add_argument('--job-queue', required=True, help='Batchジョブキュー名')
-    parser.add_argument('--job-definition', required=True, help='Batchジョブ定義名')
+    parser.add_argument('--job-queue', help='Batchジョブキュー名（--resume 以外では必須）')
+    parser.add_argument('--job-definition', help='Batchジョブ定義名（--resume 以外では必須）')
     parser.add_argument('--num-jobs', type=int, default=5, help='起動するジョブ数 (デフォルト: 5)')
     parser.add_argument('--countdown', type=int, default=30, help='カウントダウン秒数 (デフォルト: 30)')
     parser.add_argument('--max-workers', type=int, default=10, help='最大ワーカー数 (デフォルト: 10)')
     parser.add_argument('--region', default='us-west-2', help='AWSリージョン (デフォルト: us-west-2)')
-    parser.add_argument('--output', help='結果出力ファイル (JSON)')
+    parser.add_argument('--output', help='結果出力ファイル (JSON、拡張子 .jsonl の場合は逐次書き込み)')
     parser.add_argument('--monitor', action='store_true', help='ジョブ実行を監視する')
-    parser.add_argument('--monitor-interval', type=int, default=10, help='監視間隔（秒）')
+    parser.add_argument('--monitor-interval', type=float, default=10, help='監視間隔（秒）')
+    parser.add_argument('--monitor-workers', type=int, default=4,
+                        help='describe_jobsを並列に呼び出すワーカー数 (デフォルト: 4)')
+    parser.add_argument('--status-source', choices=['poll', 'sqs', 'file'], default='poll',
+                        help='監視時のジョブ状態の取得元 (デフォルト: poll)')
+    parser.add_argument('--event-queue-url',
+                        help='--status-source sqs 時の Batch Job State Change イベントを受信するSQSキューURL')
+    parser.add_argument('--event-file',
+                        help='--status-source file 時のイベントファイル (JSON Lines)')
+    parser.add_argument('--progress', choices=['text', 'ndjson'], default='text',
+                        help='監視中の進捗表示（text: 状態遷移とサマリー / ndjson: 1行1イベントのJSON）')
+    parser.add_argument('--progress-file',
+                        help='--progress ndjson の出力先ファイル（デフォルト: 標準出力）')
+    parser.add_argument('--progress-job-events', action='store_true',
+                        help='--progress ndjson でジョブごとの状態遷移（transition）イベントも出力')
+    parser.add_argument('--reconcile-interval', type=float, default=60,
+                        help='イベント利用時に describe_jobs で取りこぼしを補正する間隔（秒） (デフォルト: 60)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='トークンバケットとAIMD制御で同時実行数・送信レートを自動調整する')
+    parser.add_argument('--initial-workers', type=int, default=4,
+                        help='--adaptive時の同時実行数の初期値 (デフォルト: 4)')
+    parser.add_argument('--initial-rate', type=float, default=10.0,
+                        help='--adaptive時の送信レートの初期値（件/秒） (デフォルト: 10)')
+    parser.add_argument('--max-rate', type=float, default=500.0,
+                        help='--adaptive時の送信レートの上限（件/秒） (デフォルト: 500)')
+    parser.add_argument('--latency-target', type=float,
+                        help='--adaptive時、これを超える送信時間（秒）を混雑とみなす')
+    parser.add_argument('--max-attempts', type=int, default=5,
+                        help='ジョブ送信の最大試行回数（リトライを含む） (デフォルト: 5)')
+    parser.add_argument('--retry-budget', type=int,
+                        help='実行全体で許可するリトライ回数 (デフォルト: ジョブ数)')
+    parser.add_argument('--load-profile',
+                        help='オープンループの負荷プロファイル（例: constant:10, poisson:10, '
+                             'ramp:1:50:60, steps:5x30,10x30）。--num-jobs は送信数の上限')
+    parser.add_argument('--load-seed', type=int, help='poisson プロファイルの乱数シード')
+    parser.add_argument('--array-job', action='store_true',
+                        help='1つの配列ジョブ（arrayProperties.size=N）として送信する')
+    parser.add_argument('--pipeline',
+                        help='依存関係（dependsOn）のあるステージのパイプライン定義（JSON）。--num-jobs は無視')
+    parser.add_argument('--simulate', action='store_true',
+                        help='AWSの代わりにプロセス内の Batch シミュレーター（batch_simulator.py）を使用する')
+    parser.add_argument('--sim-time-scale', type=float, default=100.0,
+                        help='シミュレーターの時間倍率（デフォルト: 100、30秒のジョブが0.3秒で終わる）')
+    parser.add_argument('--sim-max-vcpus', type=int, default=256,
+                        help='シミュレーターのコンピュート環境の最大vCPU数 (デフォルト: 256)')
+    parser.add_argument('--sim-config',
+                        help='シミュレーターの設定を上書きするJSONファイル（キーは DEFAULT_SIMULATION_CONFIG）')
+    parser.add_argument('--metrics-port', type=int,
+                        help='実行中の計測値を OpenMetrics 形式で公開するHTTPポート（/metrics）')
+    parser.add_argument('--metrics-file',
+                        help='実行中の計測値を OpenMetrics 形式で定期的に書き出すファイル')
+    parser.add_argument('--metrics-interval', type=float, default=5.0,
+                        help='--metrics-file の書き出し間隔（秒） (デフォルト: 5)')
+    parser.add_argument('--capacity-interval', type=float,
+                        help='指定した間隔（秒）でコンピュート環境の vCPU と ECS のコンテナインスタンスのリソースを記録する')
+    
+    parser.add_argument('--skip-definition-check', action='store_true',
+                        help='送信前のジョブ定義の取得とパラメータ名の検証を行わない')
+    parser.add_argument('--no-drain', action='store_true',
+                        help='Ctrl-C で中断したときに送信済みのジョブを停止しない')
+    parser.add_argument('--drain-timeout', type=float, default=300.0,
+                        help='中断時にジョブの終了を確認するまで待つ最大時間（秒） (デフォルト: 300)')
+    parser.add_argument('--drain-rate', type=float, default=20.0,
+                        help='中断時の cancel_job / terminate_job の1秒あたりの呼び出し数の上限 (デフォルト: 20)')
+    
+    parser.add_argument('--ledger', metavar='PATH',
+                        help='送信・終了状態を記録するジョブ台帳（SQLite、指定した場合のみ記録）')
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='RUN_ID',
+                        help='ジョブ台帳から中断した実行を再開する（RUN_ID 省略時は最後の実行）')
+    parser.add_argument('--target', action='append', metavar='QUEUE,DEFINITION[,REGION[,WEIGHT]]',
+                        help='ジョブの送信先（複数指定で振り分け。--job-queue / --job-definition の代わりに使用）')
+    parser.add_argument('--targets-file', help='送信先の定義ファイル（JSON）')
+    parser.add_argument('--routing', choices=['weighted', 'least-backlog'], default='weighted',
+                        help='複数の送信先への振り分け方式 (デフォルト: weighted)')
+    parser.add_argument('--backlog-refresh', type=float, default=5.0,
+                        help='least-backlog で RUNNABLE のジョブ数を取得し直す間隔（秒） (デフォルト: 5)')
+    
+    args = parser.parse_args(argv)
+    
+    targets = []
+    try:
+        if args.targets_file:
+            targets.extend(load_targets(args.targets_file, args.region))
+        targets.extend(parse_target(spec, args.region) for spec in args.target or [])
+    except (ValueError, KeyError) as e:
+        parser.error(f"送信先の指定が不正です: {e}")
+    
+    if args.resume and not args.ledger:
+        parser.error('--resume には --ledger のジョブ台帳が必要です')
+    if args.resume and targets:
+        parser.error('--resume と --target は同時に指定できません')
+    if not args.resume and not targets and (not args.job_queue or not args.job_definition):
+        parser.error('--job-queue と --job-definition（または --target）は必須です')
+    
+    stages = None
+    if args.pipeline:
+        if args.resume or targets or args.array_job or args.load_profile or args.adaptive:
+            parser.error('--pipeline は --resume / --target / --array-job / --load-profile / --adaptive と'
+                         '同時に指定できません')
+        try:
+            stages = load_pipeline(args.pipeline)
+        except ValueError as e:
+            parser.error(f"パイプラインの定義が不正です: {e}")
+        args.num_jobs = sum(stage.jobs for stage in stages)
+    
+    # ジョブ台帳を開き、再開する場合は記録された実行パラメータを使う
+    ledger = None
+    run_id = None
+    if args.ledger:
+        ledger = JobLedger(args.ledger)
+    if args.resume:
+        try:
+            run = ledger.resume_run(None if args.resume == 'latest' else args.resume)
+        except ValueError as e:
+            parser.error(str(e))
+        run_id = ledger.run_id
+        # 複数の送信先に振り分けた実行は、記録された送信先に振り分けて再開する
+        targets = targets_from_dicts(run.get('targets') or [], args.region)
+        if run.get('pipeline'):
+            parser.error('パイプラインの送信は再開できません')
+        for key in ('job_queue', 'job_definition', 'region', 'num_jobs', 'countdown', 'array_job'):
+            setattr(args, key, run[key])
+        if args.load_profile or args.adaptive:
+            print("ℹ️  再開時の残りのジョブは通常の同時送信で送信します")
+            args.load_profile = None
+            args.adaptive = False
+    
+    offsets = None
+    if args.load_profile:
+        try:
+            offsets = parse_load_profile(args.load_profile, args.num_jobs, args.load_seed)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    if args.status_source == 'sqs' and not args.event_queue_url:
+        parser.error('--status-source sqs には --event-queue-url が必要です')
+    if args.status_source == 'file' and not args.event_file:
+        parser.error('--status-source file には --event-file が必要です')
+    
+    if args.simulate and args.status_source == 'sqs':
+        parser.error('--simulate では --status-source sqs は使用できません')
+    
+    # シミュレーターは送信先（ジョブキュー）ごとに作成する
+    simulators = []
+    sim_config = None
+    if args.simulate:
+        sim_config = {'time_scale': args.sim_time_scale, 'max_vcpus': args.sim_max_vcpus}
+        if args.sim_config:
+            with open(args.sim_config, 'r', encoding='utf-8') as f:
+                sim_config.update(json.load(f))
+        try:
+            SimulatedBatchClient(**sim_config)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"🧪 シミュレーターを使用します（時間倍率: {sim_config['time_scale']:g}倍, "
+              f"最大vCPU: {sim_config['max_vcpus']}）")
     
-    args = parser.parse_args()
+    def create_simulator(job_queue):
+        simulator = SimulatedBatchClient(job_queue=job_queue, **sim_config)
+        simulators.append(simulator)
+        return simulator
+    
+    def simulator_stats():
+        if len(simulators) == 1:
+            return simulators[0].stats()
+        return [dict(s.stats(), jobQueue=s.job_queue) for s in simulators]
     
     # Batch Job Launcherを初期化
-    launcher = BatchJobLauncher(
-        job_queue=args.job_queue,
-        job_definition=args.job_definition,
-        region=args.region
+    retry_budget = args.retry_budget if args.retry_budget is not None else args.num_jobs
+    retry_policy = RetryPolicy(
+        max_attempts=args.max_attempts,
+        budget=RetryBudget(retry_budget)
     )
+    max_pool_connections = max(DEFAULT_MAX_POOL_CONNECTIONS, args.max_workers, args.monitor_workers)
+    if targets:
+        launcher = MultiTargetLauncher(
+            targets,
+            routing=args.routing,
+            retry_policy=retry_policy,
+            max_pool_connections=max_pool_connections,
+            client_factory=(lambda target: create_simulator(target.job_queue)) if args.simulate else None,
+            run_id=run_id,
+            ledger=ledger,
+            backlog_refresh=args.backlog_refresh
+        )
+        print(f"🔀 {len(targets)}個の送信先に振り分けます（{args.routing}）: "
+              + ', '.join(f"{t.name} (重み {t.weight:g})" for t in targets))
+    else:
+        launcher = BatchJobLauncher(
+            job_queue=args.job_queue,
+            job_definition=args.job_definition,
+            region=args.region,
+            retry_policy=retry_policy,
+            max_pool_connections=max_pool_connections,
+            batch_client=create_simulator(args.job_queue) if args.simulate else None,
+            run_id=run_id,
+            ledger=ledger
+        )
+    # 送信前にジョブ定義のプレースホルダーとパラメータ名を突き合わせ、一致しない（ジョブ定義が無い）場合は送信しない。
+    # 権限不足などで取得できない場合は、検証せずに指定されたジョブ定義とパラメータ名で送信する
+    if not args.skip_definition_check:
+        cache = JobDefinitionCache()
+        for target_launcher in [t.launcher for t in launcher.targets] if targets else [launcher]:
+            try:
+                target_launcher.validate_job_definition(cache)
+            except JobDefinitionMismatchError as e:
+                parser.error(str(e))
+            except Exception as e:
+                print(f"⚠️  ジョブ定義 {target_launcher.job_definition} を取得できないため、検証せずに送信します: {e}")
     
-    # ジョブを同時送信
-    job_results = launcher.submit_concurrent_jobs(
-        num_jobs=args.num_jobs,
-        countdown_seconds=args.countdown,
-        max_workers=args.max_workers
-    )
+    if ledger and not args.resume:
+        ledger.start_run({
+            'job_queue': launcher.job_queue,
+            'job_definition': launcher.job_definition,
+            'region': launcher.region,
+            'num_jobs': args.num_jobs,
+            'countdown': args.countdown,
+            'array_job': args.array_job,
+            'targets': [t.to_dict() for t in targets],
+            'pipeline': [stage.to_dict() for stage in stages or []]
+        }, run_id=launcher.run_id)
+    if ledger:
+        print(f"📒 ジョブ台帳: {args.ledger} (実行ID: {launcher.run_id})")
+    
+    metrics_server = None
+    metrics_writer = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsHttpServer(launcher.metrics, args.metrics_port).start()
+        print(f"📡 計測値を公開しています: http://127.0.0.1:{metrics_server.port}/metrics")
+    if args.metrics_file:
+        metrics_writer = MetricsFileWriter(launcher.metrics, args.metrics_file, args.metrics_interval).start()
+        print(f"📡 計測値を書き出しています: {args.metrics_file}")
+    
+    # キャパシティの時系列（送信先ごと）。結果の capacityTimeline に保存する
+    capacity_samplers = {}
+    if args.capacity_interval:
+        if args.simulate:
+            ecs_client_factory = lambda l: l.batch_client.ecs_client()
+        else:
+            ecs_client_factory = lambda l: create_client('ecs', region_name=l.region)
+        capacity_samplers = launcher.capacity_samplers(args.capacity_interval, ecs_client_factory)
+        for sampler in capacity_samplers.values():
+            sampler.start()
+        print(f"📈 キャパシティを{args.capacity_interval:g}秒ごとに記録します: {', '.join(capacity_samplers)}")
+    
+    def capacity_timeline(stop=False):
+        if stop:
+            for sampler in capacity_samplers.values():
+                sampler.stop()
+        return {name: sampler.timeline() for name, sampler in capacity_samplers.items()}
+    
+    # 拡張子が .jsonl の場合は送信結果を逐次書き込む
+    writer = None
+    if args.output and args.output.endswith('.jsonl'):
+        header = launcher.result_header()
+        header['submissionMode'] = 'pipeline' if stages else 'array' if args.array_job else 'individual'
+        if args.load_profile:
+            header['loadProfile'] = args.load_profile
+        if simulators:
+            header['simulated'] = True
+        if launcher.job_definition_summary():
+            header['jobDefinitionInfo'] = launcher.job_definition_summary()
+        writer = JsonlResultWriter(args.output, header)
+        print(f"💾 結果を逐次保存します: {args.output}")
+    on_result = writer.write_job if writer else None
+    # 逐次保存して監視しない場合は結果をメモリに保持しない
+    collect_results = writer is None or args.monitor
+    
+    # Ctrl-C で中断した場合は以降の送信を止め、送信済みのジョブを停止する
+    def request_stop(signum, frame):
+        # 2回目以降は無視する（送信中のスレッドの終了を待たずに停止すると、送信済みのジョブを取りこぼす）
+        if launcher.stop_requested.is_set():
+            print("⏳ 停止処理中です")
+            return
+        launcher.stop_requested.set()
+        raise KeyboardInterrupt
+    previous_handler = signal.signal(signal.SIGINT, request_stop)
+    
+    job_results = None
+    metadata = {}
+    interrupted = False
+    try:
+        # ジョブを同時送信
+        if args.resume:
+            job_results = launcher.resume_submission(
+                num_jobs=args.num_jobs,
+                countdown_seconds=args.countdown,
+                max_workers=args.max_workers,
+                array_job=args.array_job,
+                on_result=on_result,
+                collect_results=collect_results
+            )
+        elif stages:
+            job_results = launcher.submit_pipeline(
+                stages,
+                countdown_seconds=args.countdown,
+                max_workers=args.max_workers,
+                on_result=on_result
+            )
+        elif args.array_job:
+            job_results = launcher.submit_array_job(
+                num_jobs=args.num_jobs,
+                countdown_seconds=args.countdown,
+                on_result=on_result
+            )
+        elif offsets is not None:
+            job_results = launcher.submit_with_load_profile(
+                offsets,
+                countdown_seconds=args.countdown,
+                max_workers=args.max_workers,
+                on_result=on_result,
+                collect_results=collect_results
+            )
+        elif args.adaptive:
+            job_results = launcher.submit_concurrent_jobs_adaptive(
+                num_jobs=args.num_jobs,
+                countdown_seconds=args.countdown,
+                max_workers=args.max_workers,
+                initial_workers=args.initial_workers,
+                initial_rate=args.initial_rate,
+                max_rate=args.max_rate,
+                latency_target=args.latency_target,
+                on_result=on_result,
+                collect_results=collect_results
+            )
+        else:
+            job_results = launcher.submit_concurrent_jobs(
+                num_jobs=args.num_jobs,
+                countdown_seconds=args.countdown,
+                max_workers=args.max_workers,
+                on_result=on_result,
+                collect_results=collect_results
+            )
+    
+        metadata['submitLatency'] = launcher.metrics.submit_latency.hdr.summary()
+        if launcher.job_definition_summary():
+            metadata['jobDefinitionInfo'] = launcher.job_definition_summary()
+        if args.load_profile:
+            metadata['loadProfile'] = args.load_profile
+        if launcher.last_submit_stats:
+            metadata['submitEngine'] = launcher.last_submit_stats
+        if stages:
+            metadata['submissionMode'] = 'pipeline'
+            metadata['pipeline'] = dict(launcher.last_pipeline_stats, stages=[stage.to_dict() for stage in stages])
+        pool_stats = launcher.client_pool_stats()
+        if pool_stats:
+            metadata['clientPool'] = pool_stats
+            print(f"🔌 接続プール: リクエスト {pool_stats['requests']}件 / 新規接続 {pool_stats['newConnections']}件 / "
+                  f"再利用 {pool_stats['reusedConnections']}件 / プール枯渇 {pool_stats['poolExhausted']}回")
+        if targets:
+            metadata['routing'] = args.routing
+            metadata['targets'] = launcher.target_breakdown()
+            for name, entry in metadata['targets'].items():
+                print(f"   {name}: 成功 {entry['successfulJobs']}個 / 失敗 {entry['failedJobs']}個")
+        if simulators:
+            metadata['simulator'] = simulator_stats()
+        if capacity_samplers:
+            metadata['capacityTimeline'] = capacity_timeline()
+    
+        # 送信結果を保存（監視中に停止しても送信結果は残す）
+        if args.output and not writer:
+            launcher.save_results(job_results, args.output, metadata)
+    
+        # 監視オプション
+        if args.monitor:
+            status_source = None
+            if args.status_source == 'sqs':
+                status_source = SqsEventStatusSource(
+                    args.event_queue_url, create_client('sqs', region_name=args.region)
+                )
+            elif args.status_source == 'file':
+                status_source = FileEventStatusSource(args.event_file)
+        
+            progress_file = None
+            progress = None
+            if args.progress == 'ndjson':
+                if args.progress_file:
+                    progress_file = open(args.progress_file, 'a', encoding='utf-8')
+                progress = NdjsonProgressRenderer(progress_file, job_events=args.progress_job_events)
+        
+            # 再開時に前回の監視で終了を確認済みのジョブは監視しない
+            monitor_targets = [j for j in job_results if not j.get('finalStatus')]
+            try:
+                final_jobs = launcher.monitor_jobs(
+                    monitor_targets, args.monitor_interval, args.monitor_workers,
+                    status_source=status_source, reconcile_interval=args.reconcile_interval,
+                    progress=progress
+                )
+            finally:
+                if progress_file:
+                    progress_file.close()
+            updated = launcher.apply_lifecycle(job_results, final_jobs)
+            if ledger:
+                ledger.record_results(updated)
+            if stages:
+                metadata['pipeline']['analysis'] = analyze_pipeline(stages, job_results)
+                print_pipeline_analysis(metadata['pipeline']['analysis'])
+            if simulators:
+                metadata['simulator'] = simulator_stats()
+            if capacity_samplers:
+                metadata['capacityTimeline'] = capacity_timeline(stop=True)
+            if writer:
+                for job_result in updated:
+                    writer.write_lifecycle(job_result)
+            elif args.output:
+                # ライフサイクル情報を追加して保存し直す
+                launcher.save_results(job_results, args.output, metadata)
+    
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n🛑 中断されました。以降のジョブは送信しません")
+        if args.no_drain:
+            print("ℹ️  送信済みのジョブは停止しません（drain-jobs.py で停止できます）")
+        else:
+            metadata['drain'] = launcher.drain(args.drain_timeout, rate=args.drain_rate)
+        if capacity_samplers:
+            metadata['capacityTimeline'] = capacity_timeline(stop=True)
+        if args.output and not writer and job_results is not None:
+            launcher.save_results(job_results, args.output, metadata)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
     
-    # 結果を保存
-    if args.output:
-        launcher.save_results(job_results, args.output)
+    if capacity_samplers:
+        metadata['capacityTimeline'] = capacity_timeline(stop=True)
+    if writer:
+        writer.close(metadata)
+        print(f"💾 結果を保存しました: {args.output}")
     
-    # 監視オプション
-    if args.monitor:
-        launcher.monitor_jobs(job_results, args.monitor_interval)
+    if ledger:
+        ledger.close()
+    if metrics_writer:
+        metrics_writer.stop()
+    if metrics_server:
+        metrics_server.stop()
+    if interrupted:
+        sys.exit(130)
 
 
 if __name__ == "__main__":
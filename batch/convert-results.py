@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+テスト結果ファイル（JSON / JSON Lines）を列指向形式（NumPy .npz）に変換するスクリプト
+
+変換した .npz は analyze-test-results.py でそのまま分析でき、分析に使う列のみを読み込むため、
+ジョブ数の多い結果でも読み込みが速く、メモリ使用量も少ない。
+同じディレクトリに同じ名前の .npz がある場合、analyze-test-results.py は元の JSON / JSON Lines を読み込まない。
+
+使用例:
+    python convert-results.py test-results/
+    python convert-results.py test-results/adaptive-500.jsonl --output-dir archive/ --compress
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from columnar_results import HAS_NUMPY, write_columnar_result
+from result_writer import read_jsonl_results
+
+
+def result_files(paths):
+    """引数のファイルとディレクトリ（直下の *.json / *.jsonl）から変換するファイルを列挙"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.json")) + glob.glob(os.path.join(path, "*.jsonl"))))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='テスト結果ファイルを列指向形式（.npz）に変換')
+    parser.add_argument('paths', nargs='+', help='結果ファイル（JSON / JSON Lines）または結果ディレクトリ')
+    parser.add_argument('--output-dir', help='出力ディレクトリ（デフォルト: 元のファイルと同じディレクトリ）')
+    parser.add_argument('--compress', action='store_true',
+                        help='圧縮して保存する（ファイルは小さくなるが読み込みは遅くなる）')
+
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        parser.error('列指向形式への変換には numpy が必要です（pip install numpy）')
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = 0
+    for file_path in result_files(args.paths):
+        output_dir = args.output_dir or os.path.dirname(file_path)
+        output_file = os.path.join(output_dir, os.path.splitext(os.path.basename(file_path))[0] + '.npz')
+        started = time.perf_counter()
+        try:
+            if file_path.endswith('.jsonl'):
+                data = read_jsonl_results(file_path)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            columns = write_columnar_result(data, output_file, compress=args.compress)
+        except Exception as e:
+            failed += 1
+            print(f"⚠️  変換エラー {file_path}: {e}")
+            continue
+        ratio = os.path.getsize(output_file) / max(1, os.path.getsize(file_path)) * 100
+        print(f"✅ {file_path} → {output_file}（{len(data.get('jobs', []))}ジョブ, {len(columns)}列, "
+              f"サイズ {ratio:.0f}%, {time.perf_counter() - started:.1f}秒）")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+送信済みのジョブを一斉に停止（ドレイン）するスクリプト
+
+多重度テストを途中でやめる場合に、キューに残ったジョブ（待機中は取り消し、実行中は停止）を
+レート制限以下で並列に停止し、全ジョブの終了とキューが空になったことを確認する。
+
+停止するジョブは次のいずれかから読み込む:
+    --results FILE      concurrent-job-launcher.py の結果ファイル（JSON / JSON Lines）
+    --ledger DB         ジョブ台帳（--run-id の実行、省略時は最後の実行）。実行中のランチャーの台帳も指定できる
+
+ジョブ台帳を指定した場合は、記録された送信先のキューでジョブを停止する。送信結果や送信先が記録されていないジョブが
+ある場合は、全送信先のキューを list_jobs のジョブ名（実行IDの接頭辞）でも検索する。
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# AWSクライアントの作成処理は Lambda 関数と共有する（lambda/functions/aws_clients.py）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda', 'functions'))
+from aws_clients import DEFAULT_MAX_POOL_CONNECTIONS, create_client
+
+from job_drain import JobDrainer
+from job_ledger import LEDGER_INTENDED, JobLedger, job_name_prefix
+from result_writer import read_jsonl_results
+
+
+def jobs_from_results(path, default_region):
+    """
+    結果ファイルから送信先ごとのジョブIDを読み込む
+
+    Returns:
+        dict: (ジョブキュー, リージョン) → ジョブIDのリスト
+    """
+    if path.endswith('.jsonl'):
+        data = read_jsonl_results(path)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    # 複数の送信先に振り分けた結果は各ジョブの target から送信先を決める
+    # （JSON Lines のヘッダーは送信先のリスト、metadata.targets は送信先の名前 → 内訳）
+    targets = data.get('targets') or {}
+    if isinstance(targets, list):
+        targets = {t['name']: t for t in targets}
+    targets = {name: (t['jobQueue'], t.get('region', default_region)) for name, t in targets.items()}
+    default = (data.get('jobQueue'), data.get('region', default_region))
+
+    groups = {}
+    for job in data.get('jobs', []):
+        if job.get('status') != 'SUBMITTED' or job.get('finalStatus') in ('SUCCEEDED', 'FAILED'):
+            continue
+        key = targets.get(job.get('target'), default)
+        groups.setdefault(key, []).append(job['jobId'])
+    return groups
+
+
+def jobs_from_ledger(path, run_id, default_region, client_for):
+    """
+    ジョブ台帳の実行から送信先ごとのジョブIDを読み込む（送信先が不明なジョブは list_jobs でジョブ名を検索する）
+
+    Returns:
+        tuple: (実行ID, (ジョブキュー, リージョン) → ジョブIDのリスト)
+    """
+    with JobLedger(path) as ledger:
+        params = ledger.resume_run(run_id)
+        records = ledger.jobs()
+        run_id = ledger.run_id
+
+    targets = {t['name']: (t['jobQueue'], t.get('region', default_region)) for t in params.get('targets') or []}
+    default = (params['job_queue'], params.get('region', default_region))
+
+    # 送信済みのジョブは記録された送信先（複数の送信先に振り分けた実行は各レコードの target）のキューで停止する
+    groups = {}
+    unresolved = False
+    for state, record in records.values():
+        if state in ('SUCCEEDED', 'FAILED'):
+            continue
+        if state == LEDGER_INTENDED:
+            unresolved = True
+            continue
+        if not record.get('jobId'):
+            continue
+        key = targets.get(record.get('target')) if targets else default
+        if key is None:
+            unresolved = True
+            continue
+        groups.setdefault(key, []).append(record['jobId'])
+
+    # 送信直後に停止して送信結果が記録されていないジョブや、送信先が記録されていないジョブがある場合のみ、
+    # 全送信先のキューをジョブ名の接頭辞で検索する
+    if unresolved:
+        for job_queue, region in set(targets.values()) or {default}:
+            params = {
+                'jobQueue': job_queue,
+                'filters': [{'name': 'JOB_NAME', 'values': [f"{job_name_prefix(run_id)}*"]}]
+            }
+            while True:
+                response = client_for(region).list_jobs(**params)
+                groups.setdefault((job_queue, region), []).extend(
+                    s['jobId'] for s in response.get('jobSummaryList', [])
+                    if s.get('status') not in ('SUCCEEDED', 'FAILED')
+                )
+                if not response.get('nextToken'):
+                    break
+                params['nextToken'] = response['nextToken']
+    return run_id, groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description='送信済みのAWS Batchジョブを一斉に停止')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--results', help='concurrent-job-launcher.py の結果ファイル（JSON / JSON Lines）')
+    source.add_argument('--ledger', help='ジョブ台帳（SQLite）')
+    parser.add_argument('--run-id', help='--ledger で停止する実行ID（デフォルト: 最後の実行）')
+    parser.add_argument('--region', default='us-west-2',
+                        help='結果に記録されていない場合のAWSリージョン (デフォルト: us-west-2)')
+    parser.add_argument('--max-workers', type=int, default=16,
+                        help='同時に cancel_job / terminate_job を呼び出すワーカー数 (デフォルト: 16)')
+    parser.add_argument('--rate', type=float, default=20.0,
+                        help='1秒あたりのAPI呼び出し数の上限 (デフォルト: 20)')
+    parser.add_argument('--timeout', type=float, default=300.0,
+                        help='全ジョブの終了を確認するまで待つ最大時間（秒） (デフォルト: 300)')
+    parser.add_argument('--output', help='停止結果の出力ファイル (JSON)')
+
+    args = parser.parse_args()
+
+    clients = {}
+
+    def client_for(region):
+        if region not in clients:
+            clients[region] = create_client(
+                'batch', region_name=region,
+                max_pool_connections=max(DEFAULT_MAX_POOL_CONNECTIONS, args.max_workers),
+                retry_mode='adaptive',
+                max_attempts=1
+            )
+        return clients[region]
+
+    if args.results:
+        groups = jobs_from_results(args.results, args.region)
+        print(f"📄 結果ファイル: {args.results}")
+    else:
+        try:
+            run_id, groups = jobs_from_ledger(args.ledger, args.run_id, args.region, client_for)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"📒 ジョブ台帳: {args.ledger} (実行ID: {run_id})")
+
+    reports = {}
+    for (job_queue, region), job_ids in groups.items():
+        print(f"\n🎯 ジョブキュー: {job_queue} ({region})")
+        drainer = JobDrainer(client_for(region), max_workers=args.max_workers, rate=args.rate)
+        reports[f"{job_queue}@{region}"] = drainer.drain(job_ids, job_queue=job_queue, timeout=args.timeout)
+
+    if not reports:
+        print("停止するジョブがありません")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"💾 停止結果を保存しました: {args.output}")
+
+    if any(report['remainingJobs'] or report['errors'] for report in reports.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ジョブ定義の取得と送信パラメータの検証
+
+送信前に describe_job_definitions でジョブ定義（リビジョン、コマンド中の Ref:: プレースホルダー、
+パラメータのデフォルト値）を取得し、ランチャーが送信するパラメータ名と突き合わせる。
+
+    - 名前が一致しないパラメータは、大文字小文字・区切り文字（_ と -）を無視して一致するプレースホルダーに対応付ける
+      （例: countdownSeconds → Ref::countdown_seconds）
+    - 対応付けられないパラメータや、値もデフォルト値も無いプレースホルダーがある場合は送信しない
+
+パラメータ名の不一致は送信自体は成功し、コンテナの起動後に誤ったコマンドで失敗（またはデフォルト値で実行）するため、
+計算資源を使う前に検出する。
+"""
+
+import re
+import threading
+
+
+# コマンド中のパラメータのプレースホルダー（Ref::name）
+PLACEHOLDER_PATTERN = re.compile(r'Ref::([A-Za-z0-9_\-]+)')
+
+
+class JobDefinitionMismatchError(ValueError):
+    """送信するパラメータがジョブ定義のプレースホルダーと一致しない"""
+
+
+def _normalize(name):
+    return re.sub(r'[_\-]', '', name).lower()
+
+
+def _commands(value):
+    """ジョブ定義の中のすべての command（コンテナ・マルチノード・ECS のタスク）を返す"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == 'command' and isinstance(item, list):
+                yield item
+            else:
+                yield from _commands(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _commands(item)
+
+
+class JobDefinitionInfo:
+    """
+    検証に使うジョブ定義の情報
+
+    Args:
+        definition (dict): describe_job_definitions のジョブ定義
+    """
+
+    def __init__(self, definition):
+        self.name = definition['jobDefinitionName']
+        self.revision = definition['revision']
+        self.arn = definition.get('jobDefinitionArn')
+        self.default_parameters = dict(definition.get('parameters') or {})
+        self.placeholders = sorted({
+            name for command in _commands(definition) for arg in command if isinstance(arg, str)
+            for name in PLACEHOLDER_PATTERN.findall(arg)
+        })
+
+    @property
+    def pinned_name(self):
+        """検証したリビジョンを指定するジョブ定義名（name:revision）"""
+        return f"{self.name}:{self.revision}"
+
+    def parameter_map(self, parameter_names):
+        """
+        送信するパラメータ名からジョブ定義のプレースホルダー名への対応
+
+        Args:
+            parameter_names (list): ランチャーが送信するパラメータ名
+
+        Returns:
+            dict: 送信するパラメータ名 → ジョブ定義のパラメータ名
+
+        Raises:
+            JobDefinitionMismatchError: 対応付けられないパラメータ、または値の無いプレースホルダーがある場合
+        """
+        known = set(self.placeholders) | set(self.default_parameters)
+        mapping = {}
+        errors = []
+        for name in parameter_names:
+            if name in known:
+                mapping[name] = name
+                continue
+            candidates = [p for p in sorted(known) if _normalize(p) == _normalize(name)]
+            if len(candidates) == 1:
+                mapping[name] = candidates[0]
+            elif candidates:
+                errors.append(f"パラメータ {name} に対応するプレースホルダーが複数あります: {', '.join(candidates)}")
+            else:
+                errors.append(f"パラメータ {name} はジョブ定義で使われていません")
+
+        missing = set(self.placeholders) - set(mapping.values()) - set(self.default_parameters)
+        for name in sorted(missing):
+            errors.append(f"プレースホルダー Ref::{name} に値がありません（デフォルト値もありません）")
+
+        if errors:
+            placeholders = ', '.join(f"Ref::{p}" for p in self.placeholders) or 'なし'
+            raise JobDefinitionMismatchError(
+                f"ジョブ定義 {self.pinned_name} と送信パラメータが一致しません（プレースホルダー: {placeholders}）\n  - "
+                + '\n  - '.join(errors)
+            )
+        return mapping
+
+    def to_dict(self):
+        return {
+            'jobDefinitionName': self.name,
+            'revision': self.revision,
+            'jobDefinitionArn': self.arn,
+            'placeholders': self.placeholders,
+            'defaultParameters': self.default_parameters,
+        }
+
+
+class JobDefinitionCache:
+    """
+    describe_job_definitions の結果のキャッシュ（スレッドセーフ）
+
+    同じジョブ定義（リージョンごと）は実行中に1回だけ取得する。
+    """
+
+    def __init__(self):
+        self._definitions = {}
+        self._lock = threading.Lock()
+
+    def get(self, batch_client, job_definition, region=None):
+        """
+        ジョブ定義を取得
+
+        Args:
+            batch_client: Batchクライアント
+            job_definition (str): ジョブ定義名（name、name:revision、ARN）。名前のみの場合は ACTIVE な最新リビジョン
+            region (str): キャッシュのキーに使うリージョン
+
+        Returns:
+            JobDefinitionInfo: ジョブ定義の情報
+
+        Raises:
+            JobDefinitionMismatchError: ジョブ定義が見つからない場合
+        """
+        key = (region, job_definition)
+        with self._lock:
+            if key in self._definitions:
+                return self._definitions[key]
+
+        if ':' in job_definition:
+            params = {'jobDefinitions': [job_definition]}
+        else:
+            params = {'jobDefinitionName': job_definition, 'status': 'ACTIVE'}
+        definitions = []
+        while True:
+            response = batch_client.describe_job_definitions(**params)
+            definitions.extend(response.get('jobDefinitions', []))
+            if not response.get('nextToken'):
+                break
+            params['nextToken'] = response['nextToken']
+        if not definitions:
+            raise JobDefinitionMismatchError(f"ジョブ定義が見つかりません: {job_definition}")
+        info = JobDefinitionInfo(max(definitions, key=lambda d: d['revision']))
+
+        with self._lock:
+            self._definitions[key] = info
+        return info
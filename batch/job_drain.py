@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+実行中のジョブの一斉停止（ドレイン）
+
+送信済みのジョブのうち、キューで待機中のジョブ（SUBMITTED / PENDING / RUNNABLE）は cancel_job で取り消し、
+実行中のジョブ（STARTING / RUNNING）は terminate_job で停止する。API 呼び出しは並列に行い、
+トークンバケットで API のレート制限以下に抑える（スロットリングされた場合は RetryPolicy でリトライ）。
+
+配列ジョブは親ジョブIDに対して terminate_job を1回呼び出し、全子ジョブをまとめて停止する
+（待機中の子ジョブは取り消され、実行中の子ジョブは停止される）。
+
+停止を要求した後は describe_jobs で全ジョブが終了状態になったことを確認し、
+停止の要求から確認までの時間（time-to-drain）を報告する。
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from retry_policy import RetryExhaustedError, RetryPolicy, error_code
+
+
+# cancel_job で取り消せる（まだ実行が始まっていない）ジョブ状態
+CANCELABLE_STATUSES = ('SUBMITTED', 'PENDING', 'RUNNABLE')
+
+# 終了していないジョブ状態
+ACTIVE_STATUSES = ('SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING')
+
+# describe_jobs 1回あたりに指定できるジョブIDの上限
+DESCRIBE_JOBS_MAX_IDS = 100
+
+# キューに残っているジョブ数を数える list_jobs のページ数の上限（状態ごと、1ページ100件）
+QUEUE_CHECK_MAX_PAGES = 10
+
+DEFAULT_DRAIN_REASON = 'Drained by concurrent-job-launcher'
+
+
+class RateLimiter:
+    """
+    スレッドセーフなトークンバケット（トークンを取得できるまで待機する）
+
+    Args:
+        rate (float): 1秒あたりの呼び出し数の上限
+        burst (float): バケットの容量（デフォルト: rate）
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def drain_job_ids(job_ids):
+    """
+    停止を要求するジョブID（配列ジョブの子ジョブ「<親ジョブID>:<インデックス>」は親ジョブIDにまとめる）
+
+    Returns:
+        list: 重複を除いたジョブID（元の順序を保つ）
+    """
+    return list(dict.fromkeys(job_id.split(':')[0] for job_id in job_ids if job_id))
+
+
+class JobDrainer:
+    """
+    ジョブを並列に取り消し・停止して、終了を確認する
+
+    Args:
+        batch_client: Batchクライアント
+        retry_policy (RetryPolicy): API 呼び出しのリトライポリシー（スロットリング時のリトライ）
+        max_workers (int): 同時に API を呼び出すワーカー数
+        rate (float): cancel_job / terminate_job / describe_jobs を合わせた1秒あたりの呼び出し数の上限
+        reason (str): cancel_job / terminate_job に指定する理由
+    """
+
+    def __init__(self, batch_client, retry_policy=None, max_workers=16, rate=20.0, reason=DEFAULT_DRAIN_REASON):
+        self.batch_client = batch_client
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=8)
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.reason = reason
+
+    def _call(self, fn, **kwargs):
+        self.limiter.acquire()
+        response, _ = self.retry_policy.call(fn, **kwargs)
+        return response
+
+    def describe(self, job_ids):
+        """
+        describe_jobs を100件ずつ並列に呼び出す
+
+        Returns:
+            dict: ジョブID → describe_jobs のジョブ情報（取得できなかったジョブは含まない）
+        """
+        chunks = [job_ids[i:i + DESCRIBE_JOBS_MAX_IDS] for i in range(0, len(job_ids), DESCRIBE_JOBS_MAX_IDS)]
+        jobs = {}
+        if not chunks:
+            return jobs
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(chunks)))) as executor:
+            futures = [executor.submit(self._call, self.batch_client.describe_jobs, jobs=chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                try:
+                    for job in future.result()['jobs']:
+                        jobs[job['jobId']] = job
+                except Exception as e:
+                    print(f"⚠️  ジョブ状態の取得エラー: {e}")
+        return jobs
+
+    def _stop(self, job_id, status, is_array):
+        # 配列ジョブは親ジョブの terminate_job で待機中・実行中の子ジョブをまとめて停止する
+        if status in CANCELABLE_STATUSES and not is_array:
+            self._call(self.batch_client.cancel_job, jobId=job_id, reason=self.reason)
+            return 'cancelled'
+        self._call(self.batch_client.terminate_job, jobId=job_id, reason=self.reason)
+        return 'terminated'
+
+    def _request_stops(self, statuses, array_ids, report):
+        """
+        cancel_job / terminate_job を並列に呼び出し、件数とエラーを report に加算
+
+        Args:
+            statuses (dict): ジョブID → ジョブ状態
+            array_ids (set): 配列ジョブの親ジョブID
+            report (dict): drain の結果
+
+        Returns:
+            set: terminate_job を呼び出したジョブID
+        """
+        terminated = set()
+        if not statuses:
+            return terminated
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(statuses)))) as executor:
+            future_to_id = {
+                executor.submit(self._stop, job_id, status, job_id in array_ids): job_id
+                for job_id, status in statuses.items()
+            }
+            for future in as_completed(future_to_id):
+                job_id = future_to_id[future]
+                try:
+                    action = future.result()
+                except RetryExhaustedError as e:
+                    report['errors'].append({'jobId': job_id, 'errorCode': error_code(e.last_error),
+                                             'error': str(e.last_error)})
+                    continue
+                except Exception as e:
+                    report['errors'].append({'jobId': job_id, 'errorCode': error_code(e), 'error': str(e)})
+                    continue
+                report[action] += 1
+                if action == 'terminated':
+                    terminated.add(job_id)
+        return terminated
+
+    def queue_active_jobs(self, job_queue):
+        """
+        ジョブキューに残っている終了していないジョブ数（他の実行のジョブを含む）
+
+        Returns:
+            dict: 状態 → ジョブ数（QUEUE_CHECK_MAX_PAGES ページまで数える）
+        """
+        counts = {}
+        for status in ACTIVE_STATUSES:
+            params = {'jobQueue': job_queue, 'jobStatus': status, 'maxResults': 100}
+            count = 0
+            for _ in range(QUEUE_CHECK_MAX_PAGES):
+                response = self._call(self.batch_client.list_jobs, **params)
+                count += len(response.get('jobSummaryList', []))
+                if not response.get('nextToken'):
+                    break
+                params['nextToken'] = response['nextToken']
+            if count:
+                counts[status] = count
+        return counts
+
+    def drain(self, job_ids, job_queue=None, timeout=300, check_interval=2):
+        """
+        ジョブを取り消し・停止して、全ジョブが終了状態になるまで待つ
+
+        Args:
+            job_ids (list): 停止するジョブID（配列ジョブの子ジョブIDを含んでよい）
+            job_queue (str): 停止後に残っているジョブ数を確認するジョブキュー（Noneの場合は確認しない）
+            timeout (float): 終了を確認するまで待つ最大時間（秒）
+            check_interval (float): 終了を確認する間隔（秒）
+
+        Returns:
+            dict: targetJobs, alreadyFinished, cancelled, terminated, errors, remainingJobs,
+                  timeToDrainSeconds（終了を確認できなかった場合はNone）, queueActiveJobs
+        """
+        started = time.perf_counter()
+        ids = drain_job_ids(job_ids)
+        jobs = self.describe(ids)
+        statuses = {job_id: job['jobStatus'] for job_id, job in jobs.items()}
+        array_ids = {job_id.split(':')[0] for job_id in job_ids if job_id and ':' in job_id}
+        array_ids.update(job_id for job_id, job in jobs.items() if 'size' in job.get('arrayProperties', {}))
+        print(f"🛑 {len(ids)}個のジョブ（配列ジョブ{len(array_ids)}個を含む）を停止します...")
+
+        # 状態を取得できなかったジョブも停止を要求する
+        active = [job_id for job_id in ids if statuses.get(job_id, 'SUBMITTED') in ACTIVE_STATUSES]
+        report = {
+            'targetJobs': len(ids),
+            'alreadyFinished': len(ids) - len(active),
+            'cancelled': 0,
+            'terminated': 0,
+            'errors': [],
+        }
+
+        terminated = self._request_stops(
+            {job_id: statuses.get(job_id, 'SUBMITTED') for job_id in active}, array_ids, report)
+        requested = time.perf_counter() - started
+        print(f"   取り消し {report['cancelled']}個 / 停止 {report['terminated']}個 / "
+              f"終了済み {report['alreadyFinished']}個 / エラー {len(report['errors'])}個 ({requested:.1f}秒)")
+
+        # 全ジョブが終了状態になったことを確認する
+        remaining = active
+        deadline = started + timeout
+        while remaining:
+            jobs = self.describe(remaining)
+            # 状態を取得できなかったジョブは終了を確認できるまで残す
+            remaining = [job_id for job_id in remaining
+                         if jobs.get(job_id, {}).get('jobStatus') not in ('SUCCEEDED', 'FAILED')]
+            if not remaining or time.perf_counter() >= deadline:
+                break
+            # 取り消しの要求と前後して実行が始まったジョブは cancel_job では止まらないため停止する
+            started_jobs = {
+                job_id: jobs[job_id]['jobStatus'] for job_id in remaining
+                if job_id not in terminated and jobs.get(job_id, {}).get('jobStatus') in ('STARTING', 'RUNNING')
+            }
+            if started_jobs:
+                terminated |= self._request_stops(started_jobs, array_ids, report)
+            time.sleep(check_interval)
+
+        report['requestSeconds'] = requested
+        report['remainingJobs'] = len(remaining)
+        report['timeToDrainSeconds'] = None if remaining else time.perf_counter() - started
+        if remaining:
+            print(f"⚠️  {timeout:g}秒以内に終了を確認できなかったジョブ: {len(remaining)}個")
+        else:
+            print(f"✅ 全ジョブの終了を確認しました (time-to-drain: {report['timeToDrainSeconds']:.1f}秒)")
+
+        if job_queue:
+            report['queueActiveJobs'] = self.queue_active_jobs(job_queue)
+            if report['queueActiveJobs']:
+                print(f"⚠️  キュー {job_queue} に終了していないジョブが残っています: {report['queueActiveJobs']}")
+            else:
+                print(f"✅ キュー {job_queue} は空です")
+        return report
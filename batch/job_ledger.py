@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+ジョブ台帳（SQLite）
+
+送信しようとしたジョブ（INTENDED）、送信結果（SUBMITTED / FAILED_TO_SUBMIT）、
+終了状態（SUCCEEDED / FAILED）を発生した時点で記録する。ランチャーが途中で停止しても、
+--resume で送信済みのジョブを再送信せずに残りのジョブの送信と監視を再開できる。
+
+ジョブ名は「concurrent-test-<実行ID>-<サフィックス>」で実行ごとに一意かつ決定的に決まるため、
+INTENDED のまま停止したジョブ（送信されたかどうか不明なジョブ）は list_jobs のジョブ名で確認できる。
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+
+LEDGER_INTENDED = 'INTENDED'
+
+# 台帳上で送信済みとみなす状態
+LEDGER_SUBMITTED_STATES = ('SUBMITTED', 'SUCCEEDED', 'FAILED')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    params TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id TEXT NOT NULL,
+    job_name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    job_id TEXT,
+    record TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, job_name)
+);
+CREATE INDEX IF NOT EXISTS jobs_job_id ON jobs (run_id, job_id);
+"""
+
+
+def new_run_id():
+    """実行ID（時刻 + ランダムな6桁の16進数）を生成"""
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def job_name_prefix(run_id):
+    """実行IDに対応するジョブ名の接頭辞"""
+    return f"concurrent-test-{run_id}-"
+
+
+class JobLedger:
+    """
+    SQLite のジョブ台帳（スレッドセーフ）
+
+    start_run または resume_run で対象の実行を決めてから記録する。
+
+    Args:
+        path (str): 台帳ファイルのパス
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _now(self):
+        return datetime.now().isoformat()
+
+    def start_run(self, params, run_id=None):
+        """
+        新しい実行を登録
+
+        Args:
+            params (dict): 再開時に必要な実行パラメータ（ジョブキュー、ジョブ数など）
+            run_id (str): 実行ID（Noneの場合は生成）
+
+        Returns:
+            str: 実行ID
+        """
+        self.run_id = run_id or new_run_id()
+        with self._lock:
+            self._conn.execute('INSERT INTO runs (run_id, created_at, params) VALUES (?, ?, ?)',
+                               (self.run_id, self._now(), json.dumps(params, ensure_ascii=False)))
+            self._conn.commit()
+        return self.run_id
+
+    def resume_run(self, run_id=None):
+        """
+        既存の実行を再開の対象にする
+
+        Args:
+            run_id (str): 実行ID（Noneの場合は最後に登録された実行）
+
+        Returns:
+            dict: start_run で登録した実行パラメータ
+
+        Raises:
+            ValueError: 実行が台帳に無い場合
+        """
+        with self._lock:
+            if run_id is None:
+                row = self._conn.execute(
+                    'SELECT run_id, params FROM runs ORDER BY created_at DESC LIMIT 1').fetchone()
+            else:
+                row = self._conn.execute(
+                    'SELECT run_id, params FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"台帳 {self.path} に再開できる実行がありません"
+                             + (f": {run_id}" if run_id else ''))
+        self.run_id = row[0]
+        return json.loads(row[1])
+
+    def record_intended(self, job_name):
+        """送信直前のジョブを記録（既に記録がある場合は変更しない）"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO jobs (run_id, job_name, state, updated_at) VALUES (?, ?, ?, ?)',
+                (self.run_id, job_name, LEDGER_INTENDED, self._now()))
+            self._conn.commit()
+
+    def record_submitted(self, job_result):
+        """送信結果（submit_single_job の戻り値）を記録"""
+        with self._lock:
+            self._upsert(job_result['jobName'], job_result['status'], job_result)
+            self._conn.commit()
+
+    def record_terminal(self, job_id, status):
+        """監視中に観測した終了状態を記録"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE jobs SET state = ?, updated_at = ? WHERE run_id = ? AND job_id = ?',
+                (status, self._now(), self.run_id, job_id))
+            self._conn.commit()
+
+    def record_results(self, job_results):
+        """ライフサイクル情報を含むジョブ結果をまとめて記録（終了したジョブは終了状態にする）"""
+        with self._lock:
+            for job_result in job_results:
+                self._upsert(job_result['jobName'], job_result.get('finalStatus') or job_result['status'],
+                             job_result)
+            self._conn.commit()
+
+    def _upsert(self, job_name, state, record):
+        self._conn.execute(
+            'INSERT INTO jobs (run_id, job_name, state, job_id, record, updated_at) VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (run_id, job_name) DO UPDATE SET '
+            'state = excluded.state, job_id = excluded.job_id, record = excluded.record, '
+            'updated_at = excluded.updated_at',
+            (self.run_id, job_name, state, record.get('jobId'),
+             json.dumps(record, ensure_ascii=False), self._now()))
+
+    def jobs(self):
+        """
+        対象の実行で記録されたジョブ
+
+        Returns:
+            dict: ジョブ名 → (台帳の状態, 送信結果のレコード（INTENDED の場合はNone）)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT job_name, state, record FROM jobs WHERE run_id = ?', (self.run_id,)).fetchall()
+        return {name: (state, json.loads(record) if record else None) for name, state, record in rows}
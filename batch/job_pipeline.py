@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+依存関係（dependsOn）のあるジョブのパイプライン
+
+パイプラインは複数のステージからなり、各ステージは1つのジョブまたは配列ジョブとして送信する。
+依存先のジョブIDが必要なため、依存関係のトポロジカル順に「ウェーブ」単位で送信する
+（同じウェーブのステージは互いに依存しないので同時に送信できる）。全ステージを最初に送信し、
+依存先の終了後に後続のジョブを実行可能にするのは AWS Batch 側で行う。
+
+パイプラインの定義（JSON）:
+    {
+      "stages": [
+        {"name": "extract", "jobs": 10, "countdown": 30},
+        {"name": "transform", "jobs": 10, "dependsOn": [{"stage": "extract", "type": "N_TO_N"}]},
+        {"name": "report", "dependsOn": ["transform"]}
+      ]
+    }
+
+    jobs        ジョブ数（2以上で配列ジョブ、デフォルト: 1）
+    countdown   カウントダウン秒数（省略時は --countdown）
+    dependsOn   依存するステージ。"N_TO_N" は同じサイズの配列ジョブ同士で同じインデックスの子ジョブに依存する
+                （省略時は依存先のステージの全ジョブの終了を待つ）
+    sequential  true の場合、配列ジョブの子ジョブをインデックス順に1つずつ実行する（SEQUENTIAL）
+"""
+
+import json
+from datetime import datetime
+
+
+# submit_job の dependsOn に指定できる依存先の上限
+MAX_STAGE_DEPENDENCIES = 20
+
+# 配列ジョブのサイズ上限（arrayProperties.size は 2〜10000）
+MAX_STAGE_JOBS = 10000
+
+
+class PipelineStage:
+    """
+    パイプラインのステージ
+
+    Args:
+        name (str): ステージ名（ジョブ名のサフィックスに使用）
+        jobs (int): ジョブ数（2以上で配列ジョブ）
+        countdown (int): カウントダウン秒数（Noneの場合はランチャーの指定値）
+        depends_on (list): (依存するステージ名, 依存の種類（None または 'N_TO_N'）) のリスト
+        sequential (bool): 配列ジョブの子ジョブを順番に実行するか
+    """
+
+    def __init__(self, name, jobs=1, countdown=None, depends_on=None, sequential=False):
+        self.name = name
+        self.jobs = jobs
+        self.countdown = countdown
+        self.depends_on = depends_on or []
+        self.sequential = sequential
+
+    @property
+    def is_array(self):
+        return self.jobs >= 2
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'jobs': self.jobs,
+            'countdown': self.countdown,
+            'dependsOn': [{'stage': stage, 'type': kind} for stage, kind in self.depends_on],
+            'sequential': self.sequential,
+        }
+
+
+def _parse_dependency(entry):
+    if isinstance(entry, str):
+        return entry, None
+    kind = entry.get('type')
+    if kind not in (None, 'N_TO_N'):
+        raise ValueError(f"依存の種類は N_TO_N のみ指定できます: {kind}")
+    return entry['stage'], kind
+
+
+def parse_pipeline(spec):
+    """
+    パイプラインの定義を解析して検証
+
+    Args:
+        spec (dict): パイプラインの定義（{"stages": [...]}）
+
+    Returns:
+        list: PipelineStage のリスト
+
+    Raises:
+        ValueError: 定義が不正な場合（未知のステージへの依存、循環、N_TO_N のサイズ不一致など）
+    """
+    stages = []
+    for entry in spec.get('stages', []):
+        try:
+            stage = PipelineStage(
+                entry['name'],
+                jobs=int(entry.get('jobs', 1)),
+                countdown=entry.get('countdown'),
+                depends_on=[_parse_dependency(d) for d in entry.get('dependsOn', [])],
+                sequential=bool(entry.get('sequential', False))
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"ステージの定義が不正です: {entry} ({e})") from None
+        stages.append(stage)
+
+    if not stages:
+        raise ValueError("パイプラインにステージがありません")
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"ステージ名が重複しています: {stage.name}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        if not 1 <= stage.jobs <= MAX_STAGE_JOBS:
+            raise ValueError(f"ステージ {stage.name} のジョブ数は1〜{MAX_STAGE_JOBS}で指定してください: {stage.jobs}")
+        if stage.sequential and not stage.is_array:
+            raise ValueError(f"ステージ {stage.name}: sequential は配列ジョブ（jobs が2以上）でのみ指定できます")
+        if len(stage.depends_on) + stage.sequential > MAX_STAGE_DEPENDENCIES:
+            raise ValueError(f"ステージ {stage.name} の依存先は{MAX_STAGE_DEPENDENCIES}個までです")
+        for dependency, kind in stage.depends_on:
+            if dependency not in by_name:
+                raise ValueError(f"ステージ {stage.name} の依存先 {dependency} がありません")
+            if kind == 'N_TO_N' and (not stage.is_array or by_name[dependency].jobs != stage.jobs):
+                raise ValueError(f"ステージ {stage.name}: N_TO_N は同じサイズの配列ジョブ同士でのみ指定できます")
+
+    topological_waves(stages)
+    return stages
+
+
+def load_pipeline(path):
+    """パイプラインの定義ファイル（JSON）を読み込む"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_pipeline(json.load(f))
+
+
+def topological_waves(stages):
+    """
+    依存関係のトポロジカル順にステージをウェーブに分ける
+
+    Returns:
+        list: ウェーブ（同時に送信できるステージのリスト）のリスト
+
+    Raises:
+        ValueError: 依存関係が循環している場合
+    """
+    remaining = {stage.name: stage for stage in stages}
+    done = set()
+    waves = []
+    while remaining:
+        wave = [
+            stage for stage in remaining.values()
+            if all(dependency in done for dependency, _ in stage.depends_on)
+        ]
+        if not wave:
+            raise ValueError(f"ステージの依存関係が循環しています: {', '.join(sorted(remaining))}")
+        for stage in wave:
+            del remaining[stage.name]
+        done.update(stage.name for stage in wave)
+        waves.append(wave)
+    return waves
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def analyze_pipeline(stages, job_results):
+    """
+    ライフサイクル情報を追加したジョブ結果からパイプラインの所要時間を分析
+
+    各ジョブの「依存解除」時刻は依存先のジョブ（N_TO_N は同じインデックス、SEQUENTIAL は1つ前の子ジョブ）が
+    最後に終了した時刻（依存先が無い場合は作成時刻）とし、依存解除 → 実行開始の時間を
+    依存関係のスケジューリングによる待ち時間（キュー待ち）として集計する。
+
+    クリティカルパスは最後に終了したジョブから、そのジョブを依存解除したジョブを順にたどって求める。
+
+    Args:
+        stages (list): PipelineStage のリスト
+        job_results (list): submit_pipeline の結果（apply_lifecycle で createdAt などを追加したもの）
+
+    Returns:
+        dict: {'stages': ステージごとの集計, 'criticalPath': クリティカルパス, 'makespanSeconds': 全体の所要時間}
+    """
+    jobs = {}
+    for job in job_results:
+        if job.get('stoppedAt') and job.get('startedAt'):
+            jobs[(job['stage'], job.get('arrayIndex', 0))] = job
+
+    def dependencies(stage, index):
+        keys = []
+        for dependency, kind in stage.depends_on:
+            if kind == 'N_TO_N':
+                keys.append((dependency, index))
+            else:
+                keys.extend((dependency, i) for i in range(by_name[dependency].jobs))
+        if stage.sequential and index:
+            keys.append((stage.name, index - 1))
+        return [key for key in keys if key in jobs]
+
+    by_name = {stage.name: stage for stage in stages}
+    # (ステージ, インデックス) → (依存解除時刻, 依存解除したジョブのキー)
+    released = {}
+    for stage in stages:
+        for index in range(stage.jobs):
+            key = (stage.name, index)
+            if key not in jobs:
+                continue
+            created = _parse_time(jobs[key]['createdAt'])
+            upstream = dependencies(stage, index)
+            last = max(upstream, key=lambda k: _parse_time(jobs[k]['stoppedAt']), default=None)
+            release = max(created, _parse_time(jobs[last]['stoppedAt'])) if last else created
+            released[key] = (release, last)
+
+    stage_summary = {}
+    for stage in stages:
+        keys = [(stage.name, i) for i in range(stage.jobs) if (stage.name, i) in jobs]
+        if not keys:
+            stage_summary[stage.name] = {'jobs': stage.jobs, 'completedJobs': 0}
+            continue
+        waits = sorted(
+            (_parse_time(jobs[k]['startedAt']) - released[k][0]).total_seconds() for k in keys
+        )
+        first_start = min(_parse_time(jobs[k]['startedAt']) for k in keys)
+        last_stop = max(_parse_time(jobs[k]['stoppedAt']) for k in keys)
+        stage_summary[stage.name] = {
+            'jobs': stage.jobs,
+            'completedJobs': len(keys),
+            'queueLatency': {
+                'p50': _percentile(waits, 50),
+                'p90': _percentile(waits, 90),
+                'max': waits[-1],
+            },
+            'firstStartedAt': first_start.isoformat(),
+            'lastStoppedAt': last_stop.isoformat(),
+            'durationSeconds': (last_stop - first_start).total_seconds(),
+        }
+
+    if not jobs:
+        return {'stages': stage_summary, 'criticalPath': [], 'makespanSeconds': None}
+
+    # 最後に終了したジョブから依存解除したジョブをたどる
+    path = []
+    key = max(jobs, key=lambda k: _parse_time(jobs[k]['stoppedAt']))
+    while key is not None:
+        release, previous = released[key]
+        started = _parse_time(jobs[key]['startedAt'])
+        path.append({
+            'stage': key[0],
+            'arrayIndex': key[1] if by_name[key[0]].is_array else None,
+            'queueLatencySeconds': (started - release).total_seconds(),
+            'runTimeSeconds': (_parse_time(jobs[key]['stoppedAt']) - started).total_seconds(),
+        })
+        key = previous
+    path.reverse()
+
+    first_created = min(_parse_time(job['createdAt']) for job in jobs.values())
+    last_stopped = max(_parse_time(job['stoppedAt']) for job in jobs.values())
+    queue = sum(step['queueLatencySeconds'] for step in path)
+    run = sum(step['runTimeSeconds'] for step in path)
+    return {
+        'stages': stage_summary,
+        'criticalPath': path,
+        'criticalPathSeconds': queue + run,
+        'criticalPathQueueSeconds': queue,
+        'criticalPathRunSeconds': run,
+        'makespanSeconds': (last_stopped - first_created).total_seconds(),
+    }
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+複数の送信先（ジョブキュー・ジョブ定義・リージョン）へのジョブの振り分け
+
+    WeightedRouter      重みに比例して順番に振り分ける（smooth weighted round-robin）
+    LeastBacklogRouter  RUNNABLE のジョブ数（滞留数）を重みで割った値が最小の送信先に振り分ける
+
+送信先の指定形式:
+    QUEUE,DEFINITION[,REGION[,WEIGHT]]
+重みにはコンピュート環境の最大vCPU数などのキャパシティの目安を指定できる。
+"""
+
+import json
+import threading
+import time
+
+
+class JobTarget:
+    """
+    ジョブの送信先
+
+    Args:
+        job_queue (str): ジョブキュー名
+        job_definition (str): ジョブ定義名
+        region (str): AWSリージョン
+        weight (float): 振り分けの重み（キャパシティの目安）
+        name (str): 結果に記録する送信先の名前（デフォルト: キュー名@リージョン）
+    """
+
+    def __init__(self, job_queue, job_definition, region, weight=1.0, name=None):
+        if weight <= 0:
+            raise ValueError(f"送信先の重みは正の値を指定してください: {weight}")
+        self.job_queue = job_queue
+        self.job_definition = job_definition
+        self.region = region
+        self.weight = float(weight)
+        self.name = name or f"{job_queue}@{region}"
+        # MultiTargetLauncher が送信先ごとのランチャーを設定する
+        self.launcher = None
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'jobQueue': self.job_queue,
+            'jobDefinition': self.job_definition,
+            'region': self.region,
+            'weight': self.weight,
+        }
+
+
+def parse_target(spec, default_region):
+    """
+    送信先の指定文字列を解析
+
+    Args:
+        spec (str): QUEUE,DEFINITION[,REGION[,WEIGHT]]
+        default_region (str): REGION を省略した場合のリージョン
+
+    Returns:
+        JobTarget: 送信先
+
+    Raises:
+        ValueError: 指定形式が不正な場合
+    """
+    parts = [p.strip() for p in spec.split(',')]
+    if len(parts) < 2 or len(parts) > 4 or not parts[0] or not parts[1]:
+        raise ValueError(f"送信先の指定が不正です（QUEUE,DEFINITION[,REGION[,WEIGHT]]）: {spec}")
+    region = parts[2] if len(parts) > 2 and parts[2] else default_region
+    try:
+        weight = float(parts[3]) if len(parts) > 3 else 1.0
+    except ValueError:
+        raise ValueError(f"送信先の重みが数値ではありません: {spec}") from None
+    return JobTarget(parts[0], parts[1], region, weight)
+
+
+def targets_from_dicts(specs, default_region):
+    """
+    送信先の定義（JobTarget.to_dict と同じ形式の辞書のリスト）から送信先を作成
+
+    Returns:
+        list: JobTarget のリスト
+    """
+    return [
+        JobTarget(s['jobQueue'], s['jobDefinition'], s.get('region') or default_region,
+                  s.get('weight', 1.0), s.get('name'))
+        for s in specs
+    ]
+
+
+def load_targets(path, default_region):
+    """
+    送信先の定義ファイル（JSON）を読み込む
+
+    形式: [{"jobQueue": ..., "jobDefinition": ..., "region": ..., "weight": ..., "name": ...}, ...]
+
+    Returns:
+        list: JobTarget のリスト
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+    return targets_from_dicts(specs, default_region)
+
+
+class WeightedRouter:
+    """
+    重みに比例して送信先を順番に選ぶ（smooth weighted round-robin、スレッドセーフ）
+
+    重み 3:1 の場合は A A A B ではなく A A B A の繰り返しのように、特定の送信先に連続して偏らないよう振り分ける。
+    """
+
+    def __init__(self, targets):
+        self.targets = targets
+        self._current = [0.0] * len(targets)
+        self._total_weight = sum(t.weight for t in targets)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        with self._lock:
+            for i, target in enumerate(self.targets):
+                self._current[i] += target.weight
+            best = max(range(len(self.targets)), key=lambda i: self._current[i])
+            self._current[best] -= self._total_weight
+            return self.targets[best]
+
+
+class LeastBacklogRouter:
+    """
+    滞留数（RUNNABLE のジョブ数）を重みで割った値が最小の送信先を選ぶ（スレッドセーフ）
+
+    滞留数は refresh_interval 秒ごとに backlog_fn で取得し、その間に送信したジョブ数を加算して推定する。
+    取得（送信先ごとの API 呼び出し）は1つのスレッドのみがロックの外で行い、その間も他のスレッドは推定値で振り分ける。
+
+    Args:
+        targets (list): JobTarget のリスト
+        backlog_fn (callable): 送信先を受け取り RUNNABLE のジョブ数を返す関数
+        refresh_interval (float): 滞留数を取得し直す間隔（秒）
+    """
+
+    def __init__(self, targets, backlog_fn, refresh_interval=5.0):
+        self.targets = targets
+        self.backlog_fn = backlog_fn
+        self.refresh_interval = refresh_interval
+        self.backlog = {t.name: 0 for t in targets}
+        self.refreshes = 0
+        self._refreshed_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        fetched = {}
+        try:
+            for target in self.targets:
+                try:
+                    fetched[target.name] = self.backlog_fn(target)
+                except Exception as e:
+                    # 取得できない場合は推定値のまま振り分けを続ける
+                    print(f"⚠️  {target.name} の滞留数の取得エラー: {e}")
+        finally:
+            with self._lock:
+                self.backlog.update(fetched)
+                self._refreshed_at = time.monotonic()
+                self.refreshes += 1
+                self._refreshing = False
+
+    def choose(self):
+        with self._lock:
+            refresh = not self._refreshing and (
+                self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval)
+            if refresh:
+                self._refreshing = True
+        if refresh:
+            self._refresh()
+        with self._lock:
+            target = min(self.targets, key=lambda t: (self.backlog[t.name] + 1) / t.weight)
+            self.backlog[target.name] += 1
+            return target
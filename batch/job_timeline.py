@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+ジョブの送信・実行開始・完了のスループットと実行中ジョブ数の時系列
+
+ジョブの時刻（submissionTime / startedAt / stoppedAt）をソートし、
+- 送信・実行開始・完了のレート（ジョブ/秒）を、時間軸上の各点で直前 window 秒の件数から求める
+- 実行中ジョブ数を、実行開始で +1・終了で -1 するイベントを時刻順に走査（スイープライン）して求める
+テスト全体の平均スループットだけでは分からない、立ち上がりの遅れやスループットの頭打ちを確認するためのもの。
+
+実行開始後に終了時刻が無いジョブ（監視の終了時点で実行中）は、最後に観測した時刻まで実行中として数える。
+同時刻に終了と実行開始がある場合は終了を先に数える（入れ替わりを同時実行として数えない）。
+numpy が無い場合は同じ結果を Python で計算する。
+"""
+
+import math
+from bisect import bisect_right
+
+from timing_stats import HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+# 時系列の点の数（テストの開始〜終了を等分する）
+TIMELINE_POINTS = 300
+
+# レートを求めるウィンドウのデフォルト（テストの所要時間に対する割合）
+DEFAULT_WINDOW_FRACTION = 1 / 30
+
+# イベントの種類 → 時刻の列
+EVENT_COLUMNS = {
+    'submitted': 'submissionTime',
+    'started': 'startedAt',
+    'completed': 'stoppedAt',
+}
+
+
+def summarize_timeline(columns, window=None, points=TIMELINE_POINTS):
+    """
+    スループットと実行中ジョブ数の時系列を集計
+
+    Args:
+        columns (JobColumns): ジョブの列
+        window (float): レートを求めるウィンドウ（秒、Noneの場合はテストの所要時間の1/30）
+        points (int): 時系列の点の数
+
+    Returns:
+        dict: durationSeconds, windowSeconds, counts, meanRates, peakRates（種類 → ジョブ/秒）,
+              peakConcurrency, peakConcurrencyAt（開始からの秒）, meanConcurrency,
+              series（t: 開始からの秒, submitted / started / completed: レート, running: 実行中ジョブ数）
+              （時刻が記録されていない場合はNone）
+    """
+    times = {event: columns.times(column) for event, column in EVENT_COLUMNS.items()}
+    if HAS_NUMPY:
+        return _summarize_numpy(times, window, points)
+    return _summarize_python(times, window, points)
+
+
+def _summary(span, window, events, peak, peak_at, busy_seconds, busy_span):
+    counts = {event: len(values) for event, values in events.items()}
+    return {
+        'durationSeconds': span,
+        'windowSeconds': window,
+        'counts': counts,
+        # 平均レートはその種類のイベントが続いた期間（最初〜最後、ウィンドウより短い場合はウィンドウ）あたりの件数
+        'meanRates': {
+            event: len(values) / max(values[-1] - values[0], window) if values else None
+            for event, values in events.items()
+        },
+        'peakConcurrency': peak,
+        'peakConcurrencyAt': peak_at,
+        'meanConcurrency': busy_seconds / busy_span if busy_span > 0 else None,
+    }
+
+
+def _summarize_numpy(times, window, points):
+    events = {event: np.sort(values[~np.isnan(values)]) for event, values in times.items()}
+    observed = np.concatenate(list(events.values()))
+    if len(observed) < 2 or observed.max() <= observed.min():
+        return None
+    start, end = float(observed.min()), float(observed.max())
+    span = end - start
+    window = max(window or span * DEFAULT_WINDOW_FRACTION, span / points)
+    grid = start + span * np.arange(points + 1) / points
+
+    series = {'t': (grid - start).tolist()}
+    for event, values in events.items():
+        in_window = np.searchsorted(values, grid, 'right') - np.searchsorted(values, grid - window, 'right')
+        series[event] = (in_window / window).tolist()
+
+    # 実行開始したジョブの実行期間（終了時刻が無い場合は最後に観測した時刻まで）
+    started = ~np.isnan(times['started'])
+    run_start = times['started'][started]
+    run_end = np.fmax(np.where(np.isnan(times['completed'][started]), end, times['completed'][started]), run_start)
+    peak, peak_at, busy_seconds, busy_span = 0, None, 0.0, 0.0
+    if len(run_start):
+        stamps = np.concatenate([run_start, run_end])
+        deltas = np.concatenate([np.ones(len(run_start), dtype=np.int64), -np.ones(len(run_end), dtype=np.int64)])
+        order = np.lexsort((deltas, stamps))
+        level = np.cumsum(deltas[order])
+        top = int(np.argmax(level))
+        if level[top] > 0:
+            peak, peak_at = int(level[top]), float(stamps[order][top] - start)
+        busy_seconds = float((run_end - run_start).sum())
+        busy_span = float(run_end.max() - run_start.min())
+    series['running'] = (np.searchsorted(np.sort(run_start), grid, 'right')
+                         - np.searchsorted(np.sort(run_end), grid, 'right')).tolist()
+
+    summary = _summary(span, window, {e: v.tolist() for e, v in events.items()},
+                       peak, peak_at, busy_seconds, busy_span)
+    summary['peakRates'] = {event: max(series[event]) for event in events}
+    summary['series'] = series
+    return summary
+
+
+def _summarize_python(times, window, points):
+    events = {event: sorted(v for v in values if not math.isnan(v)) for event, values in times.items()}
+    observed = [v for values in events.values() for v in values]
+    if len(observed) < 2 or max(observed) <= min(observed):
+        return None
+    start, end = min(observed), max(observed)
+    span = end - start
+    window = max(window or span * DEFAULT_WINDOW_FRACTION, span / points)
+    grid = [start + span * i / points for i in range(points + 1)]
+
+    series = {'t': [g - start for g in grid]}
+    for event, values in events.items():
+        series[event] = [(bisect_right(values, g) - bisect_right(values, g - window)) / window for g in grid]
+
+    runs = [
+        (s, max(e if not math.isnan(e) else end, s))
+        for s, e in zip(times['started'], times['completed']) if not math.isnan(s)
+    ]
+    peak, peak_at, busy_seconds, busy_span = 0, None, 0.0, 0.0
+    if runs:
+        # (時刻, -1) が (時刻, +1) より先に並ぶため、同時刻は終了を先に数える
+        level = 0
+        for stamp, delta in sorted([(s, 1) for s, _ in runs] + [(e, -1) for _, e in runs]):
+            level += delta
+            if level > peak:
+                peak, peak_at = level, stamp - start
+        busy_seconds = sum(e - s for s, e in runs)
+        busy_span = max(e for _, e in runs) - min(s for s, _ in runs)
+    run_starts = sorted(s for s, _ in runs)
+    run_ends = sorted(e for _, e in runs)
+    series['running'] = [bisect_right(run_starts, g) - bisect_right(run_ends, g) for g in grid]
+
+    summary = _summary(span, window, events, peak, peak_at, busy_seconds, busy_span)
+    summary['peakRates'] = {event: max(series[event]) for event in events}
+    summary['series'] = series
+    return summary
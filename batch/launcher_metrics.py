@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+ランチャーの計測値（ヒストグラム・カウンター・ゲージ）と OpenMetrics 形式での公開
+
+ヒストグラムは HdrHistogram と同じ対数線形のバケットを使い、値の範囲によらず
+固定のメモリで相対誤差 1% 未満のパーセンタイルを計算できる。計測値は実行中に
+HTTP エンドポイント（Prometheus のスクレイプ対象）またはファイル
+（node_exporter の textfile コレクターなど）として公開できる。
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# OpenMetrics で公開するヒストグラムのバケット境界（秒）
+DEFAULT_EXPORT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# ジョブ状態（ゲージを0で初期化するため）
+JOB_STATES = ('SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING', 'SUCCEEDED', 'FAILED')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{k}="{str(v)}"' for k, v in labels)
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class HdrHistogram:
+    """
+    対数線形バケットのヒストグラム（スレッドセーフ、固定メモリ）
+
+    値は unit 単位の整数に丸めて記録する。unit 未満の値は 0 になる。
+    2**sub_bucket_bits 未満の値は正確に、それ以上は上位 sub_bucket_bits ビットの精度
+    （相対誤差 2**-(sub_bucket_bits-1) 未満）で記録する。
+
+    Args:
+        unit (float): 最小単位（デフォルト 1マイクロ秒）
+        highest_value (float): 記録できる最大値（これを超える値は最大値として記録）
+        sub_bucket_bits (int): バケット内の精度ビット数（8 で相対誤差 1% 未満）
+    """
+
+    def __init__(self, unit=1e-6, highest_value=3600.0, sub_bucket_bits=8):
+        self.unit = unit
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.highest = int(highest_value / unit)
+        self.counts = [0] * (self._index(self.highest) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def _index(self, raw):
+        if raw < self.sub_bucket_count:
+            return raw
+        shift = raw.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.sub_bucket_half + ((raw >> shift) - self.sub_bucket_half)
+
+    def _upper_bound(self, index):
+        """バケットに入る値の上限（unit 単位、この値を含まない）"""
+        if index < self.sub_bucket_count:
+            return index + 1
+        offset = index - self.sub_bucket_count
+        shift = offset // self.sub_bucket_half + 1
+        return ((offset % self.sub_bucket_half) + self.sub_bucket_half + 1) << shift
+
+    def record(self, value):
+        """値を記録"""
+        raw = min(max(int(value / self.unit), 0), self.highest)
+        with self._lock:
+            self.counts[self._index(raw)] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def percentile(self, p):
+        """
+        p パーセンタイルの値（バケットの上限値、最大値を超えない）
+
+        Args:
+            p (float): パーセンタイル（0〜100）
+
+        Returns:
+            float: パーセンタイル値（記録が無い場合はNone）
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            target = max(1, int(self.count * p / 100 + 0.5))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return min(self._upper_bound(index) * self.unit, self.max)
+            return self.max
+
+    def cumulative_counts(self, boundaries):
+        """
+        境界値ごとの累積件数（OpenMetrics のバケット用）
+
+        各バケットは上限値が境界値以下であれば境界値以下の件数として数える。
+
+        Returns:
+            list: boundaries と同じ順の累積件数
+        """
+        with self._lock:
+            result = []
+            seen = 0
+            index = 0
+            for boundary in boundaries:
+                while index < len(self.counts) and self._upper_bound(index) * self.unit <= boundary:
+                    seen += self.counts[index]
+                    index += 1
+                result.append(seen)
+            return result
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        件数・最大値・パーセンタイルの辞書
+
+        Returns:
+            dict: {count, mean, min, max, p50, ...}
+        """
+        summary = {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+        }
+        for p in percentiles:
+            summary[f"p{p}"] = self.percentile(p)
+        return summary
+
+
+class _Metric:
+    def __init__(self, name, help_text, metric_type):
+        self.name = name
+        self.help = help_text
+        self.type = metric_type
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(sorted(labels.items()))
+
+
+class Counter(_Metric):
+    """単調増加するカウンター（ラベルごと）"""
+
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text, 'counter')
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items()) or [((), 0)]
+        return [f"{self.name}_total{_format_labels(k)} {_format_value(v)}" for k, v in values]
+
+
+class Gauge(_Metric):
+    """増減する値（ラベルごと）"""
+
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text, 'gauge')
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items()) or [((), 0)]
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in values]
+
+
+class Histogram(_Metric):
+    """HdrHistogram で記録し、OpenMetrics では固定の境界値のバケットとして公開するヒストグラム"""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_EXPORT_BUCKETS, **hdr_options):
+        super().__init__(name, help_text, 'histogram')
+        self.buckets = tuple(buckets)
+        self.hdr = HdrHistogram(**hdr_options)
+
+    def record(self, value):
+        self.hdr.record(value)
+
+    def render(self):
+        lines = []
+        for boundary, count in zip(self.buckets, self.hdr.cumulative_counts(self.buckets)):
+            lines.append(f'{self.name}_bucket{{le="{boundary}"}} {count}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.hdr.count}')
+        lines.append(f"{self.name}_count {self.hdr.count}")
+        lines.append(f"{self.name}_sum {_format_value(float(self.hdr.total))}")
+        return lines
+
+
+class MetricsRegistry:
+    """計測値の登録と OpenMetrics テキスト形式への変換"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        登録された全計測値の OpenMetrics テキスト
+
+        Returns:
+            str: 末尾に "# EOF" を含む OpenMetrics テキスト
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.extend(metric.render())
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+class LauncherMetrics:
+    """
+    ランチャーが記録する計測値
+
+    - batch_launcher_submit_latency_seconds: submit_job 1回の所要時間（最後の試行のみ。リトライとバックオフの待機を含まない）
+    - batch_launcher_submits_total{result}: 送信結果（submitted / failed）ごとの件数
+    - batch_launcher_submit_retries_total: 送信のリトライ回数
+    - batch_launcher_submit_throttles_total: 送信時のスロットリング回数
+    - batch_launcher_submits_in_flight: 送信中のリクエスト数
+    - batch_launcher_jobs{state}: 監視中に観測した状態ごとのジョブ数
+    """
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        self.submit_latency = self.registry.register(Histogram(
+            'batch_launcher_submit_latency_seconds', 'Latency of the final submit_job attempt (excluding retries and backoff)'))
+        self.submits = self.registry.register(Counter(
+            'batch_launcher_submits', 'Job submissions by result'))
+        self.retries = self.registry.register(Counter(
+            'batch_launcher_submit_retries', 'submit_job retries'))
+        self.throttles = self.registry.register(Counter(
+            'batch_launcher_submit_throttles', 'Throttled submit_job calls'))
+        self.in_flight = self.registry.register(Gauge(
+            'batch_launcher_submits_in_flight', 'submit_job requests in flight'))
+        self.jobs = self.registry.register(Gauge(
+            'batch_launcher_jobs', 'Monitored jobs by state'))
+        self.set_job_states({})
+
+    def record_submit(self, latency, submitted, retries=0, throttles=0):
+        """1件の送信結果を記録"""
+        self.submit_latency.record(latency)
+        self.submits.inc(result='submitted' if submitted else 'failed')
+        if retries:
+            self.retries.inc(retries)
+        if throttles:
+            self.throttles.inc(throttles)
+
+    def set_job_states(self, status_count):
+        """状態ごとのジョブ数を更新（観測されていない状態は0）"""
+        for state in JOB_STATES:
+            self.jobs.set(status_count.get(state, 0), state=state)
+
+    def render(self):
+        return self.registry.render()
+
+
+class MetricsHttpServer:
+    """
+    計測値を OpenMetrics 形式で返す HTTP サーバー（バックグラウンドスレッドで動作）
+
+    Args:
+        metrics (LauncherMetrics): 公開する計測値
+        port (int): 待ち受けポート
+        host (str): 待ち受けアドレス
+    """
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class MetricsFileWriter:
+    """
+    計測値を一定間隔でファイルに書き出す（書き込み途中のファイルを読まれないよう置き換えで更新）
+
+    Args:
+        metrics (LauncherMetrics): 公開する計測値
+        path (str): 出力ファイル
+        interval (float): 書き出し間隔（秒）
+    """
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def write(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.metrics.render())
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self):
+        self.write()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """書き出しを停止し、最終値を書き出す"""
+        self._stop.set()
+        self._thread.join()
+        self.write()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+オープンループの負荷プロファイル
+
+各ジョブの送信予定時刻（開始からの経過秒）をあらかじめ決め、前の送信の完了を待たずに
+予定時刻どおりに送信する。送信予定時刻は開始時刻からの絶対時刻で管理するため、
+送信が遅れても以降のスケジュールはずれない。応答時間は予定時刻から計測し、
+coordinated omission（送信側の遅れによる遅延の過小評価）を避ける。
+
+プロファイルの指定形式:
+    constant:RATE                 一定レート（件/秒）
+    poisson:RATE                  平均 RATE 件/秒のポアソン到着
+    ramp:START:END:SECONDS        SECONDS 秒かけて START から END 件/秒へ線形に増加
+    steps:RATExSECONDS,...        段階的なレート（例: steps:5x30,10x30,20x30）
+"""
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+def constant_offsets(rate, num_jobs):
+    """一定レートの送信予定時刻"""
+    return [i / rate for i in range(num_jobs)]
+
+
+def poisson_offsets(rate, num_jobs, seed=None):
+    """ポアソン到着（指数分布の到着間隔）の送信予定時刻"""
+    rng = random.Random(seed)
+    offsets = []
+    t = 0.0
+    for _ in range(num_jobs):
+        offsets.append(t)
+        t += rng.expovariate(rate)
+    return offsets
+
+
+def ramp_offsets(start_rate, end_rate, duration, num_jobs=None):
+    """
+    線形に増加（減少）するレートの送信予定時刻
+
+    レート r(t) = start + (end - start) * t / duration の累積到着数
+    N(t) = start * t + (end - start) * t^2 / (2 * duration) が整数になる時刻を送信予定時刻とする。
+    """
+    slope = (end_rate - start_rate) / duration
+    total = int((start_rate + end_rate) / 2 * duration)
+    if num_jobs is not None:
+        total = min(total, num_jobs)
+
+    offsets = []
+    for n in range(total):
+        if abs(slope) < 1e-12:
+            offsets.append(n / start_rate)
+        else:
+            # slope/2 * t^2 + start * t - n = 0 の正の解
+            offsets.append((-start_rate + math.sqrt(start_rate ** 2 + 2 * slope * n)) / slope)
+    return offsets
+
+
+def step_offsets(stages, num_jobs=None):
+    """
+    段階的なレートの送信予定時刻
+
+    Args:
+        stages (list): (レート, 継続秒数) のリスト
+    """
+    offsets = []
+    stage_start = 0.0
+    for rate, duration in stages:
+        count = int(rate * duration)
+        offsets.extend(stage_start + i / rate for i in range(count))
+        stage_start += duration
+    if num_jobs is not None:
+        offsets = offsets[:num_jobs]
+    return offsets
+
+
+def parse_load_profile(spec, num_jobs, seed=None):
+    """
+    プロファイル指定文字列から送信予定時刻のリストを生成
+
+    Args:
+        spec (str): プロファイル指定（モジュールのドキュメント参照）
+        num_jobs (int): 送信するジョブ数の上限
+        seed (int): poisson の乱数シード
+
+    Returns:
+        list: 開始からの送信予定時刻（秒）の昇順リスト
+
+    Raises:
+        ValueError: 指定形式が不正な場合
+    """
+    kind, _, args = spec.partition(':')
+    try:
+        if kind == 'constant':
+            return constant_offsets(_positive(float(args)), num_jobs)
+        if kind == 'poisson':
+            return poisson_offsets(_positive(float(args)), num_jobs, seed)
+        if kind == 'ramp':
+            start_rate, end_rate, duration = (float(v) for v in args.split(':'))
+            return ramp_offsets(_positive(start_rate), _positive(end_rate), _positive(duration), num_jobs)
+        if kind == 'steps':
+            stages = []
+            for stage in args.split(','):
+                rate, duration = stage.split('x')
+                stages.append((_positive(float(rate)), _positive(float(duration))))
+            return step_offsets(stages, num_jobs)
+    except ValueError as e:
+        raise ValueError(f"負荷プロファイルの指定が不正です: {spec} ({e})") from e
+    raise ValueError(f"未知の負荷プロファイルです: {spec}")
+
+
+def _positive(value):
+    if value <= 0:
+        raise ValueError(f"正の値を指定してください: {value}")
+    return value
+
+
+class OpenLoopScheduler:
+    """
+    送信予定時刻どおりにジョブを送信するオープンループのスケジューラ
+
+    送信はスレッドプールに投入し、完了を待たずに次の予定時刻まで待機する。
+    ワーカーが不足した場合は実際の送信時刻が予定より遅れ、その遅れが記録される。
+
+    Args:
+        submit_fn (callable): 1件分の送信を行う関数。引数はジョブ番号、戻り値は結果の辞書
+        offsets (list): 開始からの送信予定時刻（秒）
+        max_workers (int): 送信を実行するワーカー数
+        on_result (callable): 結果が得られるたびに呼び出されるコールバック
+        collect_results (bool): Falseの場合は結果をメモリに保持しない
+    """
+
+    def __init__(self, submit_fn, offsets, max_workers=32, on_result=None, collect_results=True):
+        self.submit_fn = submit_fn
+        self.offsets = offsets
+        self.max_workers = max_workers
+        self.on_result = on_result
+        self.collect_results = collect_results
+        self.results = []
+        self.max_dispatch_lag = 0.0
+        self._lock = threading.Lock()
+
+    def run(self):
+        """
+        全ジョブを予定時刻どおりに送信
+
+        Returns:
+            list: 完了順の結果リスト（collect_results=Falseの場合は空）
+        """
+        start_wall = datetime.now()
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for index, offset in enumerate(self.offsets, start=1):
+                delay = start + offset - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_dispatch_lag = max(self.max_dispatch_lag, -delay)
+                executor.submit(self._send, index, offset, start, start_wall)
+
+        return self.results
+
+    def _send(self, index, offset, start, start_wall):
+        actual = time.monotonic() - start
+        result = self.submit_fn(index)
+        completed = time.monotonic() - start
+
+        result['intendedSendTime'] = (start_wall + timedelta(seconds=offset)).isoformat()
+        result['actualSendTime'] = (start_wall + timedelta(seconds=actual)).isoformat()
+        result['sendLagSeconds'] = actual - offset
+        # 予定時刻から計測した応答時間（送信側の遅れを含む）
+        result['intendedResponseSeconds'] = completed - offset
+
+        with self._lock:
+            if self.collect_results:
+                self.results.append(result)
+            if self.on_result:
+                self.on_result(result)
+        return result
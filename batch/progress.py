@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+monitor_jobs の進捗表示
+
+ポーリングごとに全ジョブを表示する代わりに、前回からの状態遷移と状態ごとのジョブ数、
+完了予定時刻（ETA）のみを出力する。1回の出力量はジョブ数に依存しない。
+
+    TextProgressRenderer    人が読むための表示（変化が無いポーリングでは何も出力しない）
+    NdjsonProgressRenderer  機械処理用の1行1イベントの JSON（NDJSON）
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+
+
+class ProgressRenderer:
+    """
+    進捗表示の基底クラス
+
+    monitor_jobs から start → (transition* → update)* → finish の順に呼び出される。
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._started = None
+
+    def start(self, total):
+        """監視開始"""
+        self.total = total
+        self._started = time.monotonic()
+
+    def transition(self, job, previous, status):
+        """ジョブの状態遷移（previous は初回観測時None）"""
+
+    def update(self, status_count, completed):
+        """1回のポーリング（またはイベント受信）の処理後"""
+
+    def finish(self, status_count, completed):
+        """全ジョブが終了状態になった"""
+
+    def elapsed(self):
+        return time.monotonic() - self._started
+
+    def eta_seconds(self, completed):
+        """
+        これまでの完了ペースから残りジョブの完了までの秒数を推定
+
+        Returns:
+            float: 推定秒数（完了したジョブが無い場合はNone）
+        """
+        if not completed:
+            return None
+        elapsed = self.elapsed()
+        return (self.total - completed) * elapsed / completed
+
+
+class TextProgressRenderer(ProgressRenderer):
+    """
+    状態遷移と状態ごとのジョブ数のみを表示する進捗表示
+
+    1回の更新で終了したジョブが max_job_lines 件以下の場合はジョブ名を表示し、
+    それを超える場合は遷移ごとの件数のみを表示する。失敗したジョブは max_job_lines 件まで理由を表示する。
+
+    Args:
+        stream: 出力先
+        max_job_lines (int): 1回の更新で個別に表示するジョブ数の上限
+        heartbeat_interval (float): 変化が無い場合でも状態を表示する間隔（秒）
+    """
+
+    def __init__(self, stream=None, max_job_lines=20, heartbeat_interval=60):
+        super().__init__()
+        self.stream = stream or sys.stdout
+        self.max_job_lines = max_job_lines
+        self.heartbeat_interval = heartbeat_interval
+        self._transitions = {}
+        self._finished = []
+        self._failed = []
+        self._last_output = None
+
+    def _print(self, line=''):
+        print(line, file=self.stream)
+
+    def start(self, total):
+        super().start(total)
+        self._last_output = time.monotonic()
+        self._print(f"📈 {total}個のジョブを監視開始...")
+
+    def transition(self, job, previous, status):
+        key = (previous, status)
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        if status == 'SUCCEEDED':
+            self._finished.append(job)
+        elif status == 'FAILED':
+            self._finished.append(job)
+            self._failed.append(job)
+
+    def update(self, status_count, completed):
+        now = time.monotonic()
+        if not self._transitions and now - self._last_output < self.heartbeat_interval:
+            return
+        self._last_output = now
+
+        self._print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ジョブ状態:")
+        if len(self._finished) <= self.max_job_lines:
+            for job in self._finished:
+                mark = '✓' if job['jobStatus'] == 'SUCCEEDED' else '✗'
+                self._print(f"  {mark} {job['jobName']}: {job['jobStatus']}")
+                if job['jobStatus'] == 'FAILED' and 'statusReason' in job:
+                    self._print(f"    理由: {job['statusReason']}")
+        else:
+            for job in self._failed[:self.max_job_lines]:
+                self._print(f"  ✗ {job['jobName']}: FAILED")
+                if 'statusReason' in job:
+                    self._print(f"    理由: {job['statusReason']}")
+            if len(self._failed) > self.max_job_lines:
+                self._print(f"  ✗ ...ほか {len(self._failed) - self.max_job_lines}個のジョブが失敗")
+
+        if self._transitions:
+            moves = ', '.join(
+                f"{previous or '新規'}→{status}: {count}"
+                for (previous, status), count in sorted(self._transitions.items(), key=lambda i: -i[1])
+            )
+            self._print(f"  遷移: {moves}")
+
+        summary = {k: v for k, v in status_count.items() if v}
+        eta = self.eta_seconds(completed)
+        eta_text = f"{eta:.0f}秒" if eta is not None else '-'
+        self._print(f"  状態サマリー: {summary}")
+        self._print(f"  完了: {completed}/{self.total} (経過 {self.elapsed():.0f}秒, 残り予想 {eta_text})")
+
+        self._transitions.clear()
+        self._finished.clear()
+        self._failed.clear()
+
+    def finish(self, status_count, completed):
+        self._print("\n🎉 全ジョブが完了しました！")
+
+
+class NdjsonProgressRenderer(ProgressRenderer):
+    """
+    進捗を1行1イベントの JSON（NDJSON）で出力する進捗表示
+
+    イベント:
+        {"event":"start","total":N,"ts":...}
+        {"event":"transition","jobId":...,"jobName":...,"from":...,"to":...,"ts":...}（job_events=True の場合のみ）
+        {"event":"progress","counts":{...},"completed":N,"total":N,"elapsedSeconds":...,"etaSeconds":...,"ts":...}
+        {"event":"finish","counts":{...},"completed":N,"total":N,"elapsedSeconds":...,"ts":...}
+
+    progress は状態遷移があった更新でのみ、状態ごとのジョブ数を1行にまとめて出力する。ts はエポック秒。
+
+    Args:
+        stream: 出力先
+        job_events (bool): ジョブごとの状態遷移（transition）も出力する（出力量がジョブ数に比例する）
+    """
+
+    def __init__(self, stream=None, job_events=False):
+        super().__init__()
+        self.stream = stream or sys.stdout
+        self.job_events = job_events
+        self._changed = False
+
+    def _emit(self, event, **fields):
+        fields = dict({'event': event}, **fields, ts=round(time.time(), 3))
+        self.stream.write(json.dumps(fields, separators=(',', ':'), ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def start(self, total):
+        super().start(total)
+        self._emit('start', total=total)
+
+    def transition(self, job, previous, status):
+        self._changed = True
+        if self.job_events:
+            self._emit('transition', jobId=job['jobId'], jobName=job.get('jobName'),
+                       **{'from': previous, 'to': status})
+
+    def _counts(self, status_count):
+        return {k: v for k, v in status_count.items() if v}
+
+    def update(self, status_count, completed):
+        if not self._changed:
+            return
+        self._changed = False
+        eta = self.eta_seconds(completed)
+        self._emit('progress', counts=self._counts(status_count), completed=completed, total=self.total,
+                   elapsedSeconds=round(self.elapsed(), 3),
+                   etaSeconds=round(eta, 3) if eta is not None else None)
+
+    def finish(self, status_count, completed):
+        self._emit('finish', counts=self._counts(status_count), completed=completed, total=self.total,
+                   elapsedSeconds=round(self.elapsed(), 3))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+テスト結果の JSON Lines 形式での逐次書き込み・読み込み
+
+1行目にヘッダー（実行条件）、以降にジョブごとのレコード、監視した場合はジョブごとの
+ライフサイクルレコード、最終行にフッター（集計）を書き込む。
+各レコードは書き込みのたびにフラッシュされるため、ランチャーが途中で停止しても
+それまでの結果は失われない。フッターが無いファイルは読み込み時に集計し直す。
+"""
+
+import json
+import threading
+from datetime import datetime
+
+
+RECORD_HEADER = 'header'
+RECORD_JOB = 'job'
+RECORD_FOOTER = 'footer'
+RECORD_LIFECYCLE = 'lifecycle'
+
+# ライフサイクルレコードとして書き込むキー（job_lifecycle の戻り値）
+LIFECYCLE_KEYS = (
+    'finalStatus', 'statusReason', 'createdAt', 'startedAt', 'stoppedAt',
+    'queueWaitSeconds', 'startLatencySeconds', 'timeToStartSeconds', 'runTimeSeconds', 'attempts',
+)
+
+
+class JsonlResultWriter:
+    """
+    ジョブ結果を JSON Lines 形式で逐次書き込むライター（スレッドセーフ）
+
+    Args:
+        output_file (str): 出力ファイルパス
+        header (dict): ヘッダーレコードに書き込む実行条件
+    """
+
+    def __init__(self, output_file, header=None):
+        self.output_file = output_file
+        self.total_jobs = 0
+        self.successful_jobs = 0
+        self.failed_jobs = 0
+        self._lock = threading.Lock()
+        self._file = open(output_file, 'w', encoding='utf-8')
+
+        record = {'recordType': RECORD_HEADER, 'timestamp': datetime.now().isoformat()}
+        record.update(header or {})
+        self._write(record)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def write_job(self, job_result):
+        """
+        ジョブ1件分の結果を書き込む
+
+        Args:
+            job_result (dict): submit_single_jobの戻り値
+        """
+        record = {'recordType': RECORD_JOB}
+        record.update(job_result)
+        with self._lock:
+            self.total_jobs += 1
+            if job_result.get('status') == 'SUBMITTED':
+                self.successful_jobs += 1
+            elif job_result.get('status') == 'FAILED_TO_SUBMIT':
+                self.failed_jobs += 1
+            self._write(record)
+
+    def write_lifecycle(self, job_result):
+        """
+        監視で得られたジョブのライフサイクル情報を書き込む
+
+        読み込み時に jobId が一致するジョブのレコードへマージされる。
+
+        Args:
+            job_result (dict): ライフサイクル情報を追加した送信結果
+        """
+        record = {'recordType': RECORD_LIFECYCLE, 'jobId': job_result['jobId']}
+        record.update({k: job_result[k] for k in LIFECYCLE_KEYS if k in job_result})
+        with self._lock:
+            self._write(record)
+
+    def close(self, metadata=None):
+        """
+        フッターを書き込んでファイルを閉じる
+
+        Args:
+            metadata (dict): フッターに追加する実行時の情報
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            record = {
+                'recordType': RECORD_FOOTER,
+                'timestamp': datetime.now().isoformat(),
+                'totalJobs': self.total_jobs,
+                'successfulJobs': self.successful_jobs,
+                'failedJobs': self.failed_jobs,
+            }
+            record.update(metadata or {})
+            self._write(record)
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 例外で抜けた場合はフッターを書かず、途中結果であることを読み込み側で判別させる
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+        return False
+
+
+def read_jsonl_results(file_path, loads=json.loads):
+    """
+    JSON Lines 形式の結果ファイルを従来のJSON形式と同じ構造の辞書として読み込む
+
+    フッターが無い（途中で停止した）ファイルは、読み込めたジョブから集計し直し
+    'incomplete': True を設定する。末尾の壊れた行は無視する。
+
+    Args:
+        file_path (str): 結果ファイルのパス
+        loads (callable): 1行の JSON を解析する関数（orjson.loads など。解析エラーは json.JSONDecodeError のサブクラス）
+
+    Returns:
+        dict: timestamp, jobQueue, jobDefinition, totalJobs, successfulJobs, failedJobs, jobs を含む辞書
+    """
+    header = {}
+    footer = None
+    jobs = []
+    jobs_by_id = {}
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = loads(line)
+            except json.JSONDecodeError:
+                # 書き込み途中で停止した最終行
+                continue
+
+            record_type = record.pop('recordType', RECORD_JOB)
+            if record_type == RECORD_HEADER:
+                header = record
+            elif record_type == RECORD_FOOTER:
+                footer = record
+            elif record_type == RECORD_LIFECYCLE:
+                job = jobs_by_id.get(record.get('jobId'))
+                if job is not None:
+                    job.update(record)
+            else:
+                jobs.append(record)
+                if 'jobId' in record:
+                    jobs_by_id[record['jobId']] = record
+
+    data = dict(header)
+    if footer is not None:
+        data.update({k: v for k, v in footer.items() if k != 'timestamp'})
+        data['completedAt'] = footer.get('timestamp')
+    else:
+        data['incomplete'] = True
+        data['totalJobs'] = len(jobs)
+        data['successfulJobs'] = len([j for j in jobs if j.get('status') == 'SUBMITTED'])
+        data['failedJobs'] = len([j for j in jobs if j.get('status') == 'FAILED_TO_SUBMIT'])
+    data['jobs'] = jobs
+
+    return data
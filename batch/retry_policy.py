@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+AWS API 呼び出しのリトライ制御
+
+エラーをスロットリング・リトライ可能・致命的の3種類に分類し、
+デコリレーテッド・ジッター方式のバックオフとプロセス全体で共有する
+リトライ予算の範囲内でリトライする。
+"""
+
+import random
+import threading
+import time
+
+try:
+    from botocore.exceptions import ConnectionError as BotoConnectionError, HTTPClientError
+    RETRYABLE_EXCEPTIONS = (BotoConnectionError, HTTPClientError, ConnectionError, TimeoutError)
+except ImportError:
+    RETRYABLE_EXCEPTIONS = (ConnectionError, TimeoutError)
+
+
+# エラー分類
+ERROR_CLASS_THROTTLING = 'throttling'
+ERROR_CLASS_RETRYABLE = 'retryable'
+ERROR_CLASS_FATAL = 'fatal'
+
+# スロットリングとみなすAWS APIのエラーコード
+THROTTLING_ERROR_CODES = frozenset([
+    'TooManyRequestsException',
+    'ThrottlingException',
+    'Throttling',
+    'RequestLimitExceeded',
+])
+
+# 一時的な障害とみなすAWS APIのエラーコード
+RETRYABLE_ERROR_CODES = frozenset([
+    'InternalServerError',
+    'InternalFailure',
+    'ServerException',
+    'ServiceUnavailable',
+    'ServiceUnavailableException',
+    'RequestTimeout',
+    'RequestTimeoutException',
+])
+
+
+def error_code(error):
+    """
+    例外からAWS APIのエラーコードを取り出す
+
+    Args:
+        error (Exception): 発生した例外
+
+    Returns:
+        str: エラーコード（ClientError以外はNone）
+    """
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+def classify_error(error):
+    """
+    例外をスロットリング・リトライ可能・致命的のいずれかに分類
+
+    Args:
+        error (Exception): 発生した例外
+
+    Returns:
+        str: ERROR_CLASS_THROTTLING / ERROR_CLASS_RETRYABLE / ERROR_CLASS_FATAL
+    """
+    code = error_code(error)
+    if code in THROTTLING_ERROR_CODES:
+        return ERROR_CLASS_THROTTLING
+    if code in RETRYABLE_ERROR_CODES:
+        return ERROR_CLASS_RETRYABLE
+
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        if status == 429:
+            return ERROR_CLASS_THROTTLING
+        if status >= 500:
+            return ERROR_CLASS_RETRYABLE
+
+    if isinstance(error, RETRYABLE_EXCEPTIONS):
+        return ERROR_CLASS_RETRYABLE
+    return ERROR_CLASS_FATAL
+
+
+class RetryBudget:
+    """
+    プロセス全体で共有するリトライ回数の予算（スレッドセーフ）
+
+    大量のジョブが同時にスロットリングされた場合に、
+    リトライが負荷をさらに増幅するのを防ぐ。
+
+    Args:
+        max_retries (int): 実行全体で許可するリトライ回数（Noneで無制限）
+    """
+
+    def __init__(self, max_retries=None):
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """予算が残っていれば1回分を消費してTrueを返す"""
+        with self._lock:
+            if self.max_retries is not None and self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self):
+        """残りのリトライ回数（無制限の場合はNone）"""
+        if self.max_retries is None:
+            return None
+        return max(0, self.max_retries - self.used)
+
+
+class RetryExhaustedError(Exception):
+    """
+    リトライしても呼び出しが成功しなかったことを示す例外
+
+    Attributes:
+        last_error (Exception): 最後に発生した例外
+        error_class (str): 最後の例外の分類
+        retries (int): 実施したリトライ回数
+        backoff_seconds (float): バックオフで待機した合計時間（秒）
+        throttle_count (int): スロットリングされた回数
+        attempt_seconds (float): 最後の試行の所要時間（秒、バックオフの待機を含まない）
+    """
+
+    def __init__(self, last_error, error_class, retries, backoff_seconds, throttle_count, attempt_seconds=0.0):
+        super().__init__(str(last_error))
+        self.last_error = last_error
+        self.error_class = error_class
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.throttle_count = throttle_count
+        self.attempt_seconds = attempt_seconds
+
+
+class RetryPolicy:
+    """
+    デコリレーテッド・ジッター方式のバックオフでリトライするポリシー
+
+    待機時間は sleep = min(cap, uniform(base, 前回の待機時間 * 3)) で決める。
+    スロットリングとリトライ可能なエラーのみをリトライし、致命的なエラーは即座に失敗させる。
+
+    Args:
+        max_attempts (int): 1回目を含む最大試行回数
+        base_delay (float): 最小待機時間（秒）
+        max_delay (float): 最大待機時間（秒）
+        budget (RetryBudget): 共有するリトライ予算
+        sleep (callable): 待機に使う関数（テスト・シミュレーション用）
+    """
+
+    def __init__(self, max_attempts=5, base_delay=0.1, max_delay=20.0, budget=None, sleep=time.sleep):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.sleep = sleep
+
+    def next_delay(self, previous_delay):
+        """前回の待機時間から次の待機時間を計算"""
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def call(self, fn, *args, **kwargs):
+        """
+        リトライ付きで関数を呼び出す
+
+        Args:
+            fn (callable): 呼び出す関数
+
+        Returns:
+            tuple: (fnの戻り値, リトライ情報の辞書。attemptSeconds は最後の試行（成功した呼び出し）の所要時間で、
+                   バックオフの待機は backoffSeconds に含まれる)
+
+        Raises:
+            RetryExhaustedError: 致命的なエラー、試行回数超過、または予算切れの場合
+        """
+        return self._call(fn, args, kwargs, None)
+
+    def call_non_idempotent(self, fn, recover, *args, **kwargs):
+        """
+        冪等でない関数（submit_job など）をリトライ付きで呼び出す
+
+        スロットリングは呼び出しが受け付けられていないためそのままリトライする。接続エラー・タイムアウト・5xx は
+        呼び出しが反映されたか分からないため、リトライする前（試行回数を使い切った場合は失敗とする前）に
+        recover() で確認し、反映されていればその戻り値を fn の戻り値として返す（重複して呼び出さない）。
+
+        Args:
+            fn (callable): 呼び出す関数
+            recover (callable): 呼び出しが反映されていれば fn の戻り値に相当する値、反映されていなければ None を返す関数
+
+        Returns:
+            tuple: call と同じ（recover で確認できた場合はリトライ情報の recovered が True）
+
+        Raises:
+            RetryExhaustedError: 致命的なエラー、試行回数超過、または予算切れの場合
+        """
+        return self._call(fn, args, kwargs, recover)
+
+    def _call(self, fn, args, kwargs, recover):
+        retries = 0
+        throttle_count = 0
+        backoff_seconds = 0.0
+        delay = self.base_delay
+        last_class = None
+
+        while True:
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                return result, {
+                    'retryCount': retries,
+                    'throttleCount': throttle_count,
+                    'backoffSeconds': backoff_seconds,
+                    'errorClass': last_class,
+                    'attemptSeconds': time.perf_counter() - started,
+                }
+            except Exception as e:
+                attempt_seconds = time.perf_counter() - started
+                last_class = classify_error(e)
+                if last_class == ERROR_CLASS_THROTTLING:
+                    throttle_count += 1
+
+                give_up = (last_class == ERROR_CLASS_FATAL
+                           or retries + 1 >= self.max_attempts
+                           or not self.budget.try_acquire())
+                if not give_up:
+                    # 反映の確認（recover）の前にも待機して、反映が検索結果に現れるまでの時間を取る
+                    delay = self.next_delay(delay)
+                    self.sleep(delay)
+                    backoff_seconds += delay
+
+                if recover is not None and last_class == ERROR_CLASS_RETRYABLE:
+                    recovered = recover()
+                    if recovered is not None:
+                        return recovered, {
+                            'retryCount': retries,
+                            'throttleCount': throttle_count,
+                            'backoffSeconds': backoff_seconds,
+                            'errorClass': last_class,
+                            'attemptSeconds': attempt_seconds,
+                            'recovered': True,
+                        }
+
+                if give_up:
+                    raise RetryExhaustedError(e, last_class, retries, backoff_seconds, throttle_count,
+                                              attempt_seconds) from e
+                retries += 1
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+ランチャーと分析スクリプト自体の処理コストを計測するベンチマーク
+
+AWS の代わりに即座に応答するスタブの Batch クライアントを使い、以下の処理を
+ジョブ数ごとに計測する。ランチャーや分析スクリプトの変更で、スレッドやログ出力などの
+クライアント側の処理がボトルネックになっていないかを確認するためのもの。
+
+    submit   BatchJobLauncher.submit_concurrent_jobs
+    monitor  BatchJobLauncher.monitor_jobs（全ジョブが RUNNING → SUCCEEDED と遷移）
+    load     analyze-test-results.py の load_test_results
+    analyze  analyze-test-results.py の analyze_submission_performance
+
+各ケースは別プロセスで実行し、スループット（ジョブ/秒）・CPU時間・最大メモリ使用量（RSS）を記録する。
+--baseline で保存済みのベースラインと比較し、しきい値を超えて悪化した場合は終了コード1で終了する。
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    # Windows では最大メモリ使用量を計測しない
+    HAS_RESOURCE = False
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, 'benchmarks', 'baseline.json')
+
+BENCHMARK_NAMES = ('submit', 'monitor', 'load', 'analyze')
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+
+# 比較する指標と、値が大きいほど良いかどうか
+METRICS = {
+    'throughput': True,
+    'cpuSeconds': False,
+    'peakRssMb': False,
+}
+
+# これより短い時間の計測値はばらつきが大きいため比較しない
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def load_script(filename, module_name):
+    """ハイフンを含むファイル名のスクリプトをモジュールとして読み込む"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StubBatchClient:
+    """
+    即座に応答する Batch クライアントのスタブ
+
+    describe_jobs では、各ジョブは1回目に RUNNING、2回目以降に SUCCEEDED を返す。
+    """
+
+    def __init__(self):
+        self._describe_count = {}
+        self._lock = threading.Lock()
+
+    def submit_job(self, jobName, **kwargs):
+        return {'jobId': str(uuid.uuid4()), 'jobName': jobName}
+
+    def describe_jobs(self, jobs):
+        now = int(time.time() * 1000)
+        described = []
+        with self._lock:
+            for job_id in jobs:
+                count = self._describe_count.get(job_id, 0)
+                self._describe_count[job_id] = count + 1
+                job = {
+                    'jobId': job_id,
+                    'jobName': f"benchmark-{job_id[:8]}",
+                    'jobStatus': 'RUNNING' if count == 0 else 'SUCCEEDED',
+                    'createdAt': now - 60000,
+                    'startedAt': now - 30000,
+                }
+                if count:
+                    job['stoppedAt'] = now
+                described.append(job)
+        return {'jobs': described}
+
+
+def synthetic_job_results(num_jobs):
+    """送信・監視済みの結果ファイルと同じ形式のジョブレコードを生成"""
+    submitted = datetime.now().isoformat()
+    return [{
+        'jobId': str(uuid.uuid4()),
+        'jobName': f"concurrent-test-job{i:03d}-0",
+        'submissionTime': submitted,
+        'submitDuration': 0.05 + (i % 97) / 1000,
+        'countdownSeconds': 30,
+        'status': 'SUBMITTED',
+        'retryCount': 0,
+        'throttleCount': 0,
+        'backoffSeconds': 0.0,
+        'errorClass': None,
+        'finalStatus': 'SUCCEEDED',
+        'queueWaitSeconds': 60.0 + i % 61,
+        'startLatencySeconds': 5.0 + i % 7,
+        'timeToStartSeconds': 65.0 + i % 67,
+        'runTimeSeconds': 30.0 + (i % 11) / 10,
+    } for i in range(num_jobs)]
+
+
+def prepare_data(data_dir, num_jobs):
+    """load / analyze 用の結果ファイルを作成"""
+    path = os.path.join(data_dir, str(num_jobs))
+    os.makedirs(path, exist_ok=True)
+    jobs = synthetic_job_results(num_jobs)
+    with open(os.path.join(path, f"benchmark-{num_jobs}.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'jobQueue': 'benchmark-queue',
+            'jobDefinition': 'benchmark-definition',
+            'totalJobs': num_jobs,
+            'successfulJobs': num_jobs,
+            'failedJobs': 0,
+            'jobs': jobs,
+        }, f, ensure_ascii=False)
+    return path
+
+
+def peak_rss_mb():
+    """プロセスの最大メモリ使用量（MB）"""
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS はバイト単位、Linux はキロバイト単位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(name, num_jobs, data_dir):
+    """
+    1つのベンチマークケースを実行（子プロセス内で呼び出される）
+
+    Returns:
+        dict: 計測結果
+    """
+    setup = None
+    launcher_module = None
+    analyzer = None
+    if name in ('submit', 'monitor'):
+        launcher_module = load_script('concurrent-job-launcher.py', 'concurrent_job_launcher')
+    else:
+        analyzer = load_script('analyze-test-results.py', 'analyze_test_results')
+
+    if name == 'submit':
+        launcher = launcher_module.BatchJobLauncher('benchmark-queue', 'benchmark-definition',
+                                                    batch_client=StubBatchClient())
+
+        def work():
+            launcher.submit_concurrent_jobs(num_jobs, max_workers=10)
+    elif name == 'monitor':
+        launcher = launcher_module.BatchJobLauncher('benchmark-queue', 'benchmark-definition',
+                                                    batch_client=StubBatchClient())
+        setup = synthetic_job_results(num_jobs)
+
+        def work():
+            launcher.monitor_jobs(setup, check_interval=0)
+    elif name == 'load':
+        def work():
+            analyzer.load_test_results(data_dir)
+    elif name == 'analyze':
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            setup = analyzer.load_test_results(data_dir)
+
+        def work():
+            analyzer.analyze_submission_performance(setup)
+    else:
+        raise ValueError(f"未知のベンチマークです: {name}")
+
+    # 処理ごとの出力のコストは計測に含め、端末への書き込みは除く
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        work()
+        cpu_seconds = time.process_time() - cpu_start
+        wall_seconds = time.perf_counter() - wall_start
+
+    return {
+        'benchmark': name,
+        'jobs': num_jobs,
+        'wallSeconds': wall_seconds,
+        'cpuSeconds': cpu_seconds,
+        'throughput': num_jobs / wall_seconds if wall_seconds > 0 else None,
+        'peakRssMb': peak_rss_mb(),
+    }
+
+
+def run_case_subprocess(name, num_jobs, data_dir):
+    """ケースを別プロセスで実行し、計測結果を返す"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-case', name,
+         '--sizes', str(num_jobs), '--data-dir', data_dir],
+        capture_output=True, text=True, encoding='utf-8'
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip()
+                           else f"終了コード {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def best_of(measurements):
+    """繰り返し計測のうち、指標ごとに最も良い値を採用"""
+    best = dict(measurements[0])
+    for metric, higher_is_better in METRICS.items():
+        values = [m[metric] for m in measurements if m.get(metric) is not None]
+        if values:
+            best[metric] = max(values) if higher_is_better else min(values)
+    best['wallSeconds'] = min(m['wallSeconds'] for m in measurements)
+    return best
+
+
+def case_key(result):
+    return f"{result['benchmark']}/{result['jobs']}"
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    ベースラインと比較して悪化した指標を返す
+
+    Args:
+        results (list): 計測結果
+        baseline (dict): ケース名（benchmark/jobs）→ 計測結果
+        threshold (float): 許容する悪化の割合（0.2 = 20%）
+
+    Returns:
+        list: (ケース名, 指標, ベースライン値, 今回の値) のリスト
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(case_key(result))
+        if not base:
+            continue
+        if base['wallSeconds'] < MIN_COMPARABLE_SECONDS:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if metric == 'cpuSeconds' and old < MIN_COMPARABLE_SECONDS:
+                continue
+            if higher_is_better:
+                regressed = new < old * (1 - threshold)
+            else:
+                regressed = new > old * (1 + threshold)
+            if regressed:
+                regressions.append((case_key(result), metric, old, new))
+    return regressions
+
+
+def format_value(value, digits=2):
+    return '-' if value is None else f"{value:,.{digits}f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ランチャー・分析スクリプトのベンチマーク')
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARK_NAMES, default=list(BENCHMARK_NAMES),
+                        help='実行するベンチマーク (デフォルト: すべて)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='ジョブ数 (デフォルト: 100 1000 10000 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='各ケースの繰り返し回数（最良値を採用、デフォルト: 3）')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='比較するベースラインファイル (デフォルト: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='今回の計測結果をベースラインとして保存する')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='失敗とみなす悪化の割合 (デフォルト: 0.2 = 20%%)')
+    parser.add_argument('--output', help='計測結果を保存するJSONファイル')
+    parser.add_argument('--run-case', choices=BENCHMARK_NAMES, help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.sizes[0], args.data_dir)))
+        return
+
+    print("⏱️  ランチャー・分析スクリプトのベンチマーク")
+    print("=" * 50)
+
+    results = []
+    failed = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        for num_jobs in args.sizes:
+            case_dir = prepare_data(data_dir, num_jobs)
+            for name in args.benchmarks:
+                try:
+                    measurements = [run_case_subprocess(name, num_jobs, case_dir) for _ in range(max(1, args.repeat))]
+                except Exception as e:
+                    print(f"❌ {name}/{num_jobs}: {e}")
+                    failed.append(f"{name}/{num_jobs}")
+                    continue
+                result = best_of(measurements)
+                results.append(result)
+                print(f"  {case_key(result):<16} {format_value(result['throughput'], 0):>12} ジョブ/秒  "
+                      f"CPU {format_value(result['cpuSeconds'], 3):>8}秒  "
+                      f"最大RSS {format_value(result['peakRssMb'], 1):>8}MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"💾 計測結果を保存しました: {args.output}")
+
+    exit_code = 1 if failed else 0
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update({case_key(r): r for r in results})
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        print(f"💾 ベースラインを保存しました: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ ベースラインから {args.threshold:.0%} を超えて悪化しました:")
+            for key, metric, old, new in regressions:
+                print(f"  {key} {metric}: {format_value(old, 3)} → {format_value(new, 3)}")
+            exit_code = 1
+        else:
+            print(f"\n✅ ベースラインからの悪化はありません（しきい値 {args.threshold:.0%}）")
+    else:
+        print(f"\nℹ️  ベースラインがありません（--save-baseline で {args.baseline} に保存できます）")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
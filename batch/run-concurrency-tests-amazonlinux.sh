@@ -81,6 +81,11 @@ check_prerequisites() {
         exit 1
     fi
     
+    if [ ! -f "run-scenarios.py" ]; then
+        log_error "run-scenarios.py が見つかりません"
+        exit 1
+    fi
+    
     # AWS認証情報確認
     if ! aws sts get-caller-identity &> /dev/null; then
         log_error "AWS認証情報が設定されていません"
@@ -115,35 +120,8 @@ prepare_results_dir() {
     log_info "結果ディレクトリ '$RESULTS_DIR' を作成しました"
 }
 
-# 個別テストシナリオの実行
-run_test_scenario() {
-    local num_jobs=$1
-    local scenario_name="scenario_${num_jobs}_jobs"
-    
-    log_info "テストシナリオ実行中: $num_jobs 個の同時ジョブ"
-    
-    python3 concurrent-job-launcher.py \
-        --job-queue "$JOB_QUEUE" \
-        --job-definition "$JOB_DEFINITION" \
-        --num-jobs $num_jobs \
-        --countdown $COUNTDOWN_DURATION \
-        --monitor \
-        --output-file "${RESULTS_DIR}/${scenario_name}.json" \
-        --region $REGION
-    
-    if [ $? -eq 0 ]; then
-        log_info "シナリオ '$scenario_name' 完了"
-    else
-        log_error "シナリオ '$scenario_name' 失敗"
-        return 1
-    fi
-    
-    # 冷却期間
-    log_info "冷却期間: 30秒待機中..."
-    sleep 30
-}
-
 # 全テストシナリオの実行
+# シナリオ間ではキューが空になりコンピュート環境がアイドルになるまで待機する（run-scenarios.py）
 run_all_scenarios() {
     log_info "Amazon Linux 2 多重度テスト開始"
     log_info "テストシナリオ: ${TEST_SCENARIOS[*]}"
@@ -151,19 +129,20 @@ run_all_scenarios() {
     log_info "ジョブキュー: $JOB_QUEUE"
     log_info "ジョブ定義: $JOB_DEFINITION"
     
-    local failed_scenarios=()
-    
-    for num_jobs in "${TEST_SCENARIOS[@]}"; do
-        if ! run_test_scenario $num_jobs; then
-            failed_scenarios+=($num_jobs)
-        fi
-    done
+    python3 run-scenarios.py \
+        --job-queue "$JOB_QUEUE" \
+        --job-definition "$JOB_DEFINITION" \
+        --region $REGION \
+        --num-jobs "${TEST_SCENARIOS[@]}" \
+        --countdown $COUNTDOWN_DURATION \
+        --results-dir "$RESULTS_DIR" \
+        --skip-analysis
     
-    if [ ${#failed_scenarios[@]} -eq 0 ]; then
+    if [ $? -eq 0 ]; then
         log_info "全てのテストシナリオが正常に完了しました"
         return 0
     else
-        log_warn "以下のシナリオが失敗しました: ${failed_scenarios[*]}"
+        log_warn "一部のシナリオが失敗しました"
         return 1
     fi
 }
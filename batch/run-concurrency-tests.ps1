@@ -106,92 +106,36 @@ if (-not $SkipVenv) {
 }
 
 # Pythonスクリプトのパス
-$LauncherScript = Join-Path $ScriptDir "concurrent-job-launcher.py"
-$AnalyzeScript = Join-Path $ScriptDir "analyze-test-results.py"
+$ScenarioScript = Join-Path $ScriptDir "run-scenarios.py"
+$MatrixFile = Join-Path $ScriptDir "scenarios\default-matrix.json"
 
 # スクリプトの存在確認
-if (-not (Test-Path $LauncherScript)) {
-    Write-Host "❌ ランチャースクリプトが見つかりません: $LauncherScript" -ForegroundColor Red
+if (-not (Test-Path $ScenarioScript)) {
+    Write-Host "❌ シナリオ実行スクリプトが見つかりません: $ScenarioScript" -ForegroundColor Red
     exit 1
 }
 
-if (-not (Test-Path $AnalyzeScript)) {
-    Write-Host "❌ 分析スクリプトが見つかりません: $AnalyzeScript" -ForegroundColor Red
-    exit 1
-}
-
-# テスト実行関数
-function Invoke-TestCase {
-    param(
-        [string]$TestName,
-        [int]$NumJobs,
-        [string]$OutputFile
-    )
-    
-    Write-Host "📊 $TestName" -ForegroundColor Cyan
-    
-    $Arguments = @(
-        $LauncherScript,
-        "--job-queue", $JobQueue,
-        "--job-definition", $JobDefinition, 
-        "--num-jobs", $NumJobs,
-        "--countdown", "30",
-        "--region", $Region,
-        "--output", $OutputFile,
-        "--monitor"
-    )
-    
-    try {
-        & $VenvPython @Arguments
-        if ($LASTEXITCODE -ne 0) {
-            Write-Host "⚠️ テストケースでエラーが発生しましたが、続行します" -ForegroundColor Yellow
-        }
-    } catch {
-        Write-Host "⚠️ テストケース実行エラー: $($_.Exception.Message)" -ForegroundColor Yellow
-    }
-}
-
-# テストケース1: 少数のジョブ（ベースライン）
-Invoke-TestCase -TestName "テストケース1: 少数ジョブ（2個）でのベースライン測定" `
-                -NumJobs 2 `
-                -OutputFile (Join-Path $ResultsDir "test-case-1-baseline.json")
-
-Write-Host ""
-Write-Host "⏱️ 次のテストまで30秒待機..." -ForegroundColor Yellow
-Start-Sleep -Seconds 30
-
-# テストケース2: 中程度の多重度
-Invoke-TestCase -TestName "テストケース2: 中程度多重度（5個）" `
-                -NumJobs 5 `
-                -OutputFile (Join-Path $ResultsDir "test-case-2-medium.json")
-
-Write-Host ""
-Write-Host "⏱️ 次のテストまで30秒待機..." -ForegroundColor Yellow
-Start-Sleep -Seconds 30
-
-# テストケース3: 高い多重度
-Invoke-TestCase -TestName "テストケース3: 高い多重度（10個）" `
-                -NumJobs 10 `
-                -OutputFile (Join-Path $ResultsDir "test-case-3-high.json")
-
-Write-Host ""
-Write-Host "⏱️ 次のテストまで30秒待機..." -ForegroundColor Yellow
-Start-Sleep -Seconds 30
-
-# テストケース4: 非常に高い多重度
-Invoke-TestCase -TestName "テストケース4: 非常に高い多重度（20個）" `
-                -NumJobs 20 `
-                -OutputFile (Join-Path $ResultsDir "test-case-4-very-high.json")
+# テストケースの実行と結果分析
+# default-matrix.json の各ケース（2, 5, 10, 20ジョブ）を順に実行し、
+# ケース間ではキューが空になりコンピュート環境がアイドルになるまで待機する
+Write-Host "📊 シナリオマトリクスを実行中: $MatrixFile" -ForegroundColor Cyan
+
+$Arguments = @(
+    $ScenarioScript,
+    "--job-queue", $JobQueue,
+    "--job-definition", $JobDefinition,
+    "--region", $Region,
+    "--matrix", $MatrixFile,
+    "--results-dir", $ResultsDir
+)
 
-Write-Host ""
-Write-Host "📈 結果分析を生成中..." -ForegroundColor Yellow
 try {
-    & $VenvPython $AnalyzeScript $ResultsDir
+    & $VenvPython @Arguments
     if ($LASTEXITCODE -ne 0) {
-        Write-Host "⚠️ 結果分析でエラーが発生しました" -ForegroundColor Yellow
+        Write-Host "⚠️ 一部のテストケースでエラーが発生しました" -ForegroundColor Yellow
     }
 } catch {
-    Write-Host "⚠️ 結果分析エラー: $($_.Exception.Message)" -ForegroundColor Yellow
+    Write-Host "⚠️ シナリオ実行エラー: $($_.Exception.Message)" -ForegroundColor Yellow
 }
 
 Write-Host ""
@@ -116,62 +116,17 @@ else
     echo "⏭️ 仮想環境をスキップ（システムPythonを使用）"
 fi
 
-# テストケース実行関数
-run_test_case() {
-    local test_name="$1"
-    local num_jobs="$2"
-    local output_file="$3"
-    
-    echo "📊 $test_name"
-    
-    $PYTHON_CMD "$SCRIPT_DIR/concurrent-job-launcher.py" \
-        --job-queue "$JOB_QUEUE" \
-        --job-definition "$JOB_DEFINITION" \
-        --num-jobs "$num_jobs" \
-        --countdown 30 \
-        --region "$REGION" \
-        --output "$output_file" \
-        --monitor || {
-        echo "⚠️ テストケースでエラーが発生しましたが、続行します"
-    }
-}
-
-# テストケース1: 少数のジョブ（ベースライン）
-run_test_case "テストケース1: 少数ジョブ（2個）でのベースライン測定" \
-              2 \
-              "$RESULTS_DIR/test-case-1-baseline.json"
-
-echo ""
-echo "⏱️  次のテストまで30秒待機..."
-sleep 30
-
-# テストケース2: 中程度の多重度
-run_test_case "テストケース2: 中程度多重度（5個）" \
-              5 \
-              "$RESULTS_DIR/test-case-2-medium.json"
-
-echo ""
-echo "⏱️  次のテストまで30秒待機..."
-sleep 30
-
-# テストケース3: 高い多重度
-run_test_case "テストケース3: 高い多重度（10個）" \
-              10 \
-              "$RESULTS_DIR/test-case-3-high.json"
-
-echo ""
-echo "⏱️  次のテストまで30秒待機..."
-sleep 30
-
-# テストケース4: 非常に高い多重度
-run_test_case "テストケース4: 非常に高い多重度（20個）" \
-              20 \
-              "$RESULTS_DIR/test-case-4-very-high.json"
-
-echo ""
-echo "📈 結果分析を生成中..."
-$PYTHON_CMD "$SCRIPT_DIR/analyze-test-results.py" "$RESULTS_DIR" || {
-    echo "⚠️ 結果分析でエラーが発生しました"
+# テストケースの実行と結果分析
+# scenarios/default-matrix.json の各ケース（2, 5, 10, 20ジョブ）を順に実行し、
+# ケース間ではキューが空になりコンピュート環境がアイドルになるまで待機する
+echo "📊 シナリオマトリクスを実行中: $SCRIPT_DIR/scenarios/default-matrix.json"
+$PYTHON_CMD "$SCRIPT_DIR/run-scenarios.py" \
+    --job-queue "$JOB_QUEUE" \
+    --job-definition "$JOB_DEFINITION" \
+    --region "$REGION" \
+    --matrix "$SCRIPT_DIR/scenarios/default-matrix.json" \
+    --results-dir "$RESULTS_DIR" || {
+    echo "⚠️ 一部のテストケースでエラーが発生しました"
 }
 
 echo ""
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+宣言的なシナリオマトリクスに従って多重度テストを連続実行するスクリプト
+
+各テストケースの終了後、ジョブキューが空になりコンピュート環境がスケールインするまで
+待機してから次のケースを開始する（固定時間の待機は行わない）。
+全ケースの完了後、analyze-test-results.py の分析をプロセス内で実行する。
+
+マトリクスファイル（JSON）の形式:
+    {
+      "defaults": {"countdown": 30, "monitor": true},
+      "cases": [
+        {"name": "test-case-1-baseline", "num-jobs": 2},
+        {"name": "adaptive-100", "num-jobs": 100, "adaptive": true}
+      ],
+      "matrix": {"num-jobs": [50, 100], "countdown": [30, 60]}
+    }
+
+cases と defaults のキーは concurrent-job-launcher.py のオプション名（先頭の -- を除く）。
+値が true のキーはフラグとして渡される。matrix を指定した場合は全組み合わせのケースを生成する。
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import boto3
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MATRIX = os.path.join(SCRIPT_DIR, 'scenarios', 'default-matrix.json')
+
+# キューに残っているとみなすジョブ状態
+ACTIVE_STATUSES = ('SUBMITTED', 'PENDING', 'RUNNABLE', 'STARTING', 'RUNNING')
+
+# ランチャーに渡さないケースのキー
+CASE_META_KEYS = ('name', 'description')
+
+
+def load_script(filename, module_name):
+    """
+    ハイフンを含むファイル名のスクリプトをモジュールとして読み込む
+
+    Args:
+        filename (str): batch ディレクトリ内のファイル名
+        module_name (str): モジュール名
+
+    Returns:
+        module: 読み込んだモジュール
+    """
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_matrix(matrix_file):
+    """
+    マトリクスファイルからテストケースのリストを生成
+
+    Args:
+        matrix_file (str): マトリクスファイルのパス
+
+    Returns:
+        list: テストケース（ランチャーのオプション名→値の辞書、name を含む）
+    """
+    with open(matrix_file, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+
+    defaults = spec.get('defaults', {})
+    cases = [dict(defaults, **case) for case in spec.get('cases', [])]
+
+    matrix = spec.get('matrix', {})
+    if matrix:
+        keys = sorted(matrix)
+        for values in itertools.product(*(matrix[k] for k in keys)):
+            case = dict(defaults, **dict(zip(keys, values)))
+            case['name'] = 'matrix-' + '-'.join(f"{k}{v}" for k, v in zip(keys, values))
+            cases.append(case)
+
+    for index, case in enumerate(cases, start=1):
+        case.setdefault('name', f"test-case-{index}")
+    return cases
+
+
+def case_to_argv(case):
+    """
+    テストケースの辞書をランチャーのコマンドライン引数に変換
+
+    Args:
+        case (dict): テストケース
+
+    Returns:
+        list: concurrent-job-launcher.py の引数
+    """
+    argv = []
+    for key, value in case.items():
+        if key in CASE_META_KEYS or value is None or value is False:
+            continue
+        argv.append(f"--{key}")
+        if value is not True:
+            argv.append(str(value))
+    return argv
+
+
+def active_job_status(batch_client, job_queue):
+    """
+    ジョブキューに残っているジョブの状態を1つ返す
+
+    Args:
+        batch_client: boto3 の Batch クライアント
+        job_queue (str): ジョブキュー名
+
+    Returns:
+        str: 残っているジョブの状態（キューが空の場合はNone）
+    """
+    for status in ACTIVE_STATUSES:
+        response = batch_client.list_jobs(jobQueue=job_queue, jobStatus=status, maxResults=1)
+        if response.get('jobSummaryList'):
+            return status
+    return None
+
+
+def busy_compute_environments(batch_client, job_queue):
+    """
+    ジョブキューに紐づくマネージドコンピュート環境のうち、スケールインしていないものを返す
+
+    desiredvCpus が minvCpus を超えている環境をアイドルでないとみなす。
+
+    Args:
+        batch_client: boto3 の Batch クライアント
+        job_queue (str): ジョブキュー名
+
+    Returns:
+        list: (コンピュート環境名, desiredvCpus, minvCpus) のリスト
+    """
+    queues = batch_client.describe_job_queues(jobQueues=[job_queue])['jobQueues']
+    environments = [
+        order['computeEnvironment']
+        for queue in queues
+        for order in queue.get('computeEnvironmentOrder', [])
+    ]
+    if not environments:
+        return []
+
+    busy = []
+    response = batch_client.describe_compute_environments(computeEnvironments=environments)
+    for environment in response['computeEnvironments']:
+        resources = environment.get('computeResources')
+        if not resources:
+            continue
+        desired = resources.get('desiredvCpus', 0)
+        minimum = resources.get('minvCpus', 0)
+        if desired > minimum:
+            busy.append((environment['computeEnvironmentName'], desired, minimum))
+    return busy
+
+
+def wait_for_drain(batch_client, job_queue, timeout=1800, interval=15, wait_idle=True):
+    """
+    ジョブキューが空になり、コンピュート環境がアイドルになるまで待機
+
+    Args:
+        batch_client: boto3 の Batch クライアント
+        job_queue (str): ジョブキュー名
+        timeout (float): 最大待機時間（秒）
+        interval (float): 確認間隔（秒）
+        wait_idle (bool): コンピュート環境のスケールインも待つか
+
+    Returns:
+        float: 待機した時間（秒）。タイムアウトした場合はNone
+    """
+    start = time.monotonic()
+    while True:
+        elapsed = time.monotonic() - start
+        try:
+            status = active_job_status(batch_client, job_queue)
+            if status:
+                print(f"   ⏳ キューに {status} のジョブが残っています ({elapsed:.0f}秒経過)")
+            else:
+                busy = busy_compute_environments(batch_client, job_queue) if wait_idle else []
+                if not busy:
+                    return elapsed
+                for name, desired, minimum in busy:
+                    print(f"   ⏳ コンピュート環境 {name} のスケールイン待ち: "
+                          f"desiredvCpus={desired} (minvCpus={minimum}, {elapsed:.0f}秒経過)")
+        except Exception as e:
+            print(f"   ⚠️  キュー状態の確認エラー: {e}")
+
+        if elapsed >= timeout:
+            return None
+        time.sleep(interval)
+
+
+def run_analysis(results_dir):
+    """analyze-test-results.py の分析をプロセス内で実行"""
+    analyzer = load_script('analyze-test-results.py', 'analyze_test_results')
+
+    files = analyzer.result_files(results_dir)
+    if not files:
+        print("❌ 分析対象の結果ファイルが見つかりません")
+        return False
+
+    # importlib で読み込んだスクリプトの関数は spawn のワーカープロセスに渡せないため、このプロセスで順番に処理する
+    analysis, invalid_files = analyzer.analyze_result_files(files, workers=1)
+    print(f"📄 {len(files) - len(invalid_files)}個のテスト結果ファイルを読み込みました")
+    if not analysis:
+        return False
+    analyzer.generate_performance_report(analysis, os.path.join(results_dir, 'performance-report.md'), invalid_files)
+    analyzer.create_performance_charts(analysis, results_dir)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AWS Batch 多重度テストのシナリオ実行')
+    parser.add_argument('--job-queue', required=True, help='Batchジョブキュー名')
+    parser.add_argument('--job-definition', required=True, help='Batchジョブ定義名')
+    parser.add_argument('--region', default='us-west-2', help='AWSリージョン (デフォルト: us-west-2)')
+    parser.add_argument('--matrix', default=DEFAULT_MATRIX,
+                        help='シナリオマトリクスファイル (デフォルト: scenarios/default-matrix.json)')
+    parser.add_argument('--num-jobs', type=int, nargs='+',
+                        help='マトリクスファイルの代わりに指定したジョブ数のケースを実行')
+    parser.add_argument('--countdown', type=int, help='全ケースのカウントダウン秒数を上書き')
+    parser.add_argument('--results-dir', default=os.path.join(SCRIPT_DIR, 'test-results'),
+                        help='結果ディレクトリ (デフォルト: test-results)')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json', help='結果ファイルの形式')
+    parser.add_argument('--drain-timeout', type=float, default=1800,
+                        help='ケース間でキューが空になるのを待つ最大時間（秒） (デフォルト: 1800)')
+    parser.add_argument('--drain-interval', type=float, default=15,
+                        help='キュー状態の確認間隔（秒） (デフォルト: 15)')
+    parser.add_argument('--no-wait-idle', action='store_true',
+                        help='コンピュート環境のスケールインを待たない（キューが空になれば次へ進む）')
+    parser.add_argument('--skip-analysis', action='store_true', help='全ケース完了後の分析を行わない')
+
+    args = parser.parse_args()
+
+    if args.num_jobs:
+        cases = [
+            {'name': f"scenario_{n}_jobs", 'num-jobs': n, 'countdown': 30, 'monitor': True}
+            for n in args.num_jobs
+        ]
+    else:
+        cases = load_matrix(args.matrix)
+    if not cases:
+        print("❌ 実行するテストケースがありません")
+        sys.exit(1)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    launcher = load_script('concurrent-job-launcher.py', 'concurrent_job_launcher')
+    batch_client = boto3.client('batch', region_name=args.region)
+
+    print("🧪 AWS Batch 多重度検証テスト（シナリオ実行）")
+    print("=" * 50)
+    print(f"ジョブキュー: {args.job_queue}")
+    print(f"ジョブ定義: {args.job_definition}")
+    print(f"リージョン: {args.region}")
+    print(f"テストケース: {len(cases)}件")
+    print("")
+
+    failed_cases = []
+    for index, case in enumerate(cases, start=1):
+        case.setdefault('job-queue', args.job_queue)
+        case.setdefault('job-definition', args.job_definition)
+        case.setdefault('region', args.region)
+        if args.countdown is not None:
+            case['countdown'] = args.countdown
+        case.setdefault('output', os.path.join(args.results_dir, f"{case['name']}.{args.format}"))
+
+        title = case.get('description', case['name'])
+        print(f"📊 テストケース{index}/{len(cases)}: {title}")
+
+        # 前のケースの残りジョブと重ならないよう、開始前にキューが空であることを確認する
+        waited = wait_for_drain(batch_client, case['job-queue'], args.drain_timeout,
+                                args.drain_interval, not args.no_wait_idle)
+        if waited is None:
+            print(f"⚠️ {args.drain_timeout:.0f}秒待機してもキューが空になりませんでした。テストケースをスキップします")
+            failed_cases.append(case['name'])
+            continue
+        if waited > 0:
+            print(f"   ✅ キューが空になりました（{waited:.0f}秒待機）")
+
+        started = datetime.now()
+        try:
+            launcher.main(case_to_argv(case))
+        except SystemExit as e:
+            if e.code:
+                print(f"⚠️ テストケースでエラーが発生しましたが、続行します (終了コード: {e.code})")
+                failed_cases.append(case['name'])
+        except Exception as e:
+            print(f"⚠️ テストケースでエラーが発生しましたが、続行します: {e}")
+            failed_cases.append(case['name'])
+        print(f"   所要時間: {(datetime.now() - started).total_seconds():.0f}秒")
+        print("")
+
+    if not args.skip_analysis:
+        print("📈 結果分析を生成中...")
+        try:
+            run_analysis(args.results_dir)
+        except Exception as e:
+            print(f"⚠️ 結果分析でエラーが発生しました: {e}")
+
+    print("")
+    if failed_cases:
+        print(f"⚠️ 以下のテストケースでエラーが発生しました: {', '.join(failed_cases)}")
+    print("🎉 全テストケースが完了しました！")
+    print(f"結果は {args.results_dir} ディレクトリに保存されています。")
+
+    sys.exit(1 if failed_cases else 0)
+
+
+if __name__ == "__main__":
+    main()
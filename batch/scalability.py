@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+多重度とスループットのスケーラビリティモデル（Amdahl の法則 / Universal Scalability Law）
+
+テストケースごとの多重度 N（ジョブ数）とスループット X(N)（ジョブ/秒）に、次のモデルを当てはめる。
+    Amdahl:  X(N) = λN / (1 + σ(N - 1))
+    USL:     X(N) = λN / (1 + σ(N - 1) + κN(N - 1))
+λ は多重度1のスループット、σ は競合（直列化される処理の割合）、κ は整合性（多重度の2乗で増える調整コスト）の係数。
+USL で κ > 0 の場合、スループットは N* = √((1 - σ) / κ) で最大になり、それ以上の多重度では低下する。
+Amdahl（κ = 0）の場合は低下せず、λ / σ に漸近する。
+
+N / X(N) = (1 + σ(N - 1) + κN(N - 1)) / λ は係数について線形のため、線形最小二乗法で求める
+（σ・κ が負になる場合は 0 に固定して当てはめ直す）。当てはまりの良さ（R²）は X(N) について計算する。
+"""
+
+import math
+from itertools import product
+
+from timing_stats import HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+def measure_throughput(columns, mask):
+    """
+    テストケースのスループット（ジョブ/秒）
+
+    Args:
+        columns (JobColumns): ジョブの列
+        mask: 送信に成功したジョブ（JobColumns.equals の戻り値）
+
+    Returns:
+        dict: submit（最初の送信開始〜最後の送信完了あたりの送信数）,
+              completion（最初の送信開始〜最後の終了あたりの終了したジョブ数、終了時刻が無い場合はNone）
+    """
+    submitted = columns.times('submissionTime')
+    # 送信の完了はリトライ込みの所要時間（記録されていない古い結果は submitDuration）で求める
+    walls, durations = columns.numeric('submitWallSeconds'), columns.numeric('submitDuration')
+    stopped = columns.times('stoppedAt')
+    if HAS_NUMPY:
+        durations = np.where(np.isnan(walls), durations, walls)
+        submitted, durations, stopped = submitted[mask], durations[mask], stopped[mask]
+        present = ~np.isnan(submitted)
+        if not present.any():
+            return {'submit': None, 'completion': None}
+        first = float(np.nanmin(submitted))
+        submit_end = float(np.nanmax(submitted + np.nan_to_num(durations)))
+        submit_count = int(np.count_nonzero(present))
+        completed = stopped[~np.isnan(stopped)]
+        completion_count = len(completed)
+        completion_end = float(completed.max()) if completion_count else None
+    else:
+        durations = [d if math.isnan(w) else w for w, d in zip(walls, durations)]
+        rows = [(s, d, e) for s, d, e, selected in zip(submitted, durations, stopped, mask)
+                if selected and not math.isnan(s)]
+        if not rows:
+            return {'submit': None, 'completion': None}
+        first = min(s for s, _, _ in rows)
+        submit_end = max(s + (0.0 if math.isnan(d) else d) for s, d, _ in rows)
+        submit_count = len(rows)
+        completed = [e for _, _, e in rows if not math.isnan(e)]
+        completion_count = len(completed)
+        completion_end = max(completed) if completed else None
+    return {
+        'submit': submit_count / (submit_end - first) if submit_end > first else None,
+        'completion': (completion_count / (completion_end - first)
+                       if completion_end is not None and completion_end > first else None),
+    }
+
+
+def _solve(matrix, vector):
+    """連立一次方程式をガウスの消去法で解く（解が定まらない場合はNone）"""
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(size):
+            if r != col:
+                factor = rows[r][col] / rows[col][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    return [rows[i][size] / rows[i][i] for i in range(size)]
+
+
+def _least_squares(features, targets):
+    """正規方程式による線形最小二乗法（解が定まらない場合はNone）"""
+    size = len(features[0])
+    matrix = [[sum(f[i] * f[j] for f in features) for j in range(size)] for i in range(size)]
+    vector = [sum(f[i] * y for f, y in zip(features, targets)) for i in range(size)]
+    return _solve(matrix, vector)
+
+
+def _predict(n, lam, sigma, kappa):
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def _fit(points, with_kappa):
+    """
+    σ・κ ≥ 0 の制約付きで係数を求める
+
+    N / X の線形モデル a + b(N - 1) + cN(N - 1) の係数（b, c）を、負になる場合は 0 に固定して
+    当てはめ直し、X(N) の残差平方和が最小の組み合わせを選ぶ。
+    """
+    best = None
+    for use_sigma, use_kappa in product((True, False), (True, False) if with_kappa else (False,)):
+        features = [[1.0] + ([n - 1.0] if use_sigma else []) + ([n * (n - 1.0)] if use_kappa else [])
+                    for n, _ in points]
+        if len(features) < len(features[0]):
+            continue
+        solution = _least_squares(features, [n / x for n, x in points])
+        if solution is None or solution[0] <= 0 or any(c < 0 for c in solution[1:]):
+            continue
+        coefficients = iter(solution[1:])
+        lam = 1 / solution[0]
+        sigma = max(0.0, next(coefficients) / solution[0]) if use_sigma else 0.0
+        kappa = max(0.0, next(coefficients) / solution[0]) if use_kappa else 0.0
+        residual = sum((x - _predict(n, lam, sigma, kappa)) ** 2 for n, x in points)
+        if best is None or residual < best[0]:
+            best = (residual, lam, sigma, kappa)
+    return best
+
+
+def fit_scalability(points, model='usl'):
+    """
+    多重度とスループットにスケーラビリティモデルを当てはめる
+
+    Args:
+        points (list): (多重度, スループット) のリスト（スループットが正の値のもの）
+        model (str): 'usl' または 'amdahl'
+
+    Returns:
+        dict: model, lambda（多重度1のスループット）, sigma（競合）, kappa（整合性、Amdahl は 0）,
+              r2（決定係数）, peakConcurrency / peakThroughput（スループットが最大になる多重度と、その値。
+              最大にならない場合はNone）, ceilingThroughput（多重度を増やした場合の上限、κ = 0 の場合のみ）
+              （当てはめられない場合はNone）
+    """
+    points = [(float(n), float(x)) for n, x in points if n and x and x > 0]
+    if len({n for n, _ in points}) < (3 if model == 'usl' else 2):
+        return None
+    fitted = _fit(points, with_kappa=(model == 'usl'))
+    if fitted is None:
+        return None
+    residual, lam, sigma, kappa = fitted
+
+    mean = sum(x for _, x in points) / len(points)
+    total = sum((x - mean) ** 2 for _, x in points)
+    peak_concurrency = peak_throughput = None
+    if kappa > 0 and sigma < 1:
+        peak_concurrency = math.sqrt((1 - sigma) / kappa)
+        peak_throughput = _predict(peak_concurrency, lam, sigma, kappa)
+    return {
+        'model': model,
+        'lambda': lam,
+        'sigma': sigma,
+        'kappa': kappa,
+        'r2': 1 - residual / total if total > 0 else None,
+        'peakConcurrency': peak_concurrency,
+        'peakThroughput': peak_throughput,
+        'ceilingThroughput': lam / sigma if kappa == 0 and sigma > 0 else None,
+    }
+
+
+def predict_throughput(fit, n):
+    """当てはめたモデルによる多重度 n のスループットの予測値"""
+    return _predict(n, fit['lambda'], fit['sigma'], fit['kappa'])
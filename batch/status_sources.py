@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+ジョブ状態の取得元（ステータスソース）
+
+monitor_jobs は describe_jobs のポーリングの代わりに、AWS Batch の
+「Batch Job State Change」イベントを受け取るイベントソースを利用できる。
+イベントは EventBridge → SQS で配信されたものを受信するほか、
+テスト用にローカルファイル（JSON Lines）やプロセス内キューからも読み込める。
+イベントの取りこぼしは monitor_jobs 側の定期的なポーリングで補正する。
+"""
+
+import json
+import queue
+import time
+from datetime import datetime
+
+
+# Batch Job State Change イベントの detail-type
+JOB_STATE_CHANGE_DETAIL_TYPE = 'Batch Job State Change'
+
+# SQS の receive_message で一度に受信できる最大件数
+SQS_MAX_MESSAGES = 10
+
+
+def _event_time_ms(event):
+    """イベントの time（ISO 8601）をエポックミリ秒に変換（無い場合はNone）"""
+    value = event.get('time')
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def job_from_event(event):
+    """
+    Batch Job State Change イベントを describe_jobs のジョブ情報と同じ形式に変換
+
+    Args:
+        event (dict): EventBridge のイベント
+
+    Returns:
+        tuple: (ジョブ情報の辞書, イベント発生時刻(エポックミリ秒)) 対象外のイベントは (None, None)
+    """
+    if event.get('detail-type') != JOB_STATE_CHANGE_DETAIL_TYPE:
+        return None, None
+    detail = dict(event.get('detail', {}))
+    if 'jobId' not in detail or 'status' not in detail:
+        return None, None
+    detail['jobStatus'] = detail.pop('status')
+    return detail, _event_time_ms(event)
+
+
+class EventStatusSource:
+    """
+    ジョブ状態変化イベントを受け取るステータスソースの基底クラス
+
+    サブクラスは _receive_events を実装し、EventBridge 形式のイベントのリストを返す。
+    """
+
+    def receive(self, wait_seconds, job_ids=None):
+        """
+        ジョブ状態変化イベントを受信
+
+        Args:
+            wait_seconds (float): イベントが無い場合に待機する最大時間（秒）
+            job_ids (set): 監視中のジョブID（配列ジョブの親ジョブIDを含む）。共有のキューでは
+                           このジョブのイベントのみを消費する（Noneの場合は全イベント）
+
+        Returns:
+            list: (ジョブ情報の辞書, イベント発生時刻(エポックミリ秒)) のリスト
+        """
+        updates = []
+        for event in self._receive_events(wait_seconds, job_ids):
+            job, event_time = job_from_event(event)
+            if job is not None:
+                updates.append((job, event_time))
+        return updates
+
+    def _receive_events(self, wait_seconds, job_ids):
+        raise NotImplementedError
+
+    def close(self):
+        """ソースが保持するリソースを解放"""
+
+
+class SqsEventStatusSource(EventStatusSource):
+    """
+    EventBridge から SQS キューに配信されたイベントを受信するステータスソース
+
+    監視中のジョブのイベントのみを処理後に削除する。他の実行のジョブのイベントや解釈できないメッセージは削除せず、
+    可視性タイムアウトの後に他の受信者（または SQS のデッドレターキュー）が受け取れるようにする。
+
+    Args:
+        queue_url (str): SQS キューのURL
+        sqs_client: boto3 の SQS クライアント
+        max_batches (int): 1回の receive で繰り返し受信する最大回数（10件×回数まで）
+    """
+
+    def __init__(self, queue_url, sqs_client, max_batches=10):
+        self.queue_url = queue_url
+        self.sqs_client = sqs_client
+        self.max_batches = max_batches
+
+    def _receive_events(self, wait_seconds, job_ids):
+        events = []
+        wait = int(min(20, max(0, wait_seconds)))
+        for _ in range(self.max_batches):
+            response = self.sqs_client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=SQS_MAX_MESSAGES,
+                WaitTimeSeconds=wait
+            )
+            messages = response.get('Messages', [])
+            if not messages:
+                break
+
+            consumed = []
+            for message in messages:
+                try:
+                    event = json.loads(message['Body'])
+                except (ValueError, KeyError):
+                    continue
+                job, _ = job_from_event(event)
+                if job_ids is not None and (job is None or job['jobId'] not in job_ids):
+                    continue
+                events.append(event)
+                consumed.append(message)
+            if consumed:
+                self.sqs_client.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {'Id': str(i), 'ReceiptHandle': m['ReceiptHandle']}
+                        for i, m in enumerate(consumed)
+                    ]
+                )
+            # 2回目以降はキューに残っている分だけを待たずに受信する
+            wait = 0
+            if len(messages) < SQS_MAX_MESSAGES:
+                break
+        return events
+
+
+class FileEventStatusSource(EventStatusSource):
+    """
+    JSON Lines ファイルに追記されるイベントを読み込むステータスソース（テスト用）
+
+    1行に1イベント（EventBridge 形式）を記述する。ファイルの読み込み位置を保持し、
+    呼び出しごとに追記された分だけを返す。
+
+    Args:
+        event_file (str): イベントファイルのパス
+        poll_interval (float): 追記を待つ間のファイル確認間隔（秒）
+    """
+
+    def __init__(self, event_file, poll_interval=0.1):
+        self.event_file = event_file
+        self.poll_interval = poll_interval
+        self._offset = 0
+
+    def _read_new_lines(self):
+        try:
+            with open(self.event_file, 'r', encoding='utf-8') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        # 書き込み途中の最終行は次回に持ち越す
+        end = data.rfind('\n') + 1
+        self._offset += len(data[:end].encode('utf-8'))
+        return [line for line in data[:end].splitlines() if line.strip()]
+
+    def _receive_events(self, wait_seconds, job_ids):
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            lines = self._read_new_lines()
+            if lines or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+
+class QueueEventStatusSource(EventStatusSource):
+    """
+    プロセス内の queue.Queue からイベントを受け取るステータスソース（テスト・シミュレーション用）
+
+    Args:
+        event_queue (queue.Queue): EventBridge 形式のイベントが投入されるキュー
+    """
+
+    def __init__(self, event_queue):
+        self.event_queue = event_queue
+
+    def _receive_events(self, wait_seconds, job_ids):
+        events = []
+        try:
+            events.append(self.event_queue.get(timeout=max(0.0, wait_seconds)))
+        except queue.Empty:
+            return events
+        while True:
+            try:
+                events.append(self.event_queue.get_nowait())
+            except queue.Empty:
+                return events
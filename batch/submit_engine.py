@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+AWS Batch ジョブ送信用の非同期エンジン
+
+トークンバケットによる送信レート制限と、AIMD（加算増加・乗算減少）による
+同時実行数制御を組み合わせ、スロットリングとレイテンシに応じて
+持続可能な最大送信レートへ自動的に収束させる。
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from retry_policy import THROTTLING_ERROR_CODES
+
+
+def result_was_throttled(result):
+    """
+    送信結果がスロットリングを受けたかを判定
+
+    リトライで最終的に成功した場合も、途中でスロットリングされていれば混雑とみなす。
+    """
+    return result.get('throttleCount', 0) > 0 or result.get('errorCode') in THROTTLING_ERROR_CODES
+
+
+class TokenBucket:
+    """
+    非同期のトークンバケット
+
+    Args:
+        rate (float): 1秒あたりに補充するトークン数
+        burst (float): バケットの容量（最大バースト数）
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate):
+        """補充レートを変更（容量もレートに合わせて調整）"""
+        self._refill()
+        self.rate = float(rate)
+        self.burst = max(1.0, self.rate)
+        self._tokens = min(self._tokens, self.burst)
+
+    async def acquire(self):
+        """トークンを1つ取得できるまで待機"""
+        while True:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class AimdController:
+    """
+    AIMD による同時実行数・送信レートの制御
+
+    成功ごとに同時実行数を 1/concurrency、送信レートを rate_increase/rate ずつ増やし
+    （同時実行数は1ウィンドウあたり +1、レートは1秒あたり +rate_increase）、
+    スロットリングまたはレイテンシ目標の超過を検知すると両方を decrease_factor 倍に減らす。
+    減少は直近の平均レイテンシ1回分につき1度だけ行い、同じ混雑による連続的な縮小を防ぐ。
+
+    Args:
+        initial_concurrency (int): 初期同時実行数
+        min_concurrency (int): 同時実行数の下限
+        max_concurrency (int): 同時実行数の上限
+        initial_rate (float): 初期送信レート（件/秒）
+        min_rate (float): 送信レートの下限
+        max_rate (float): 送信レートの上限
+        rate_increase (float): 1秒あたりの送信レート増加量
+        decrease_factor (float): 混雑検知時の乗算減少係数
+        latency_target (float): これを超える送信レイテンシを混雑とみなす（秒、Noneで無効）
+    """
+
+    def __init__(self, initial_concurrency=4, min_concurrency=1, max_concurrency=64,
+                 initial_rate=10.0, min_rate=1.0, max_rate=500.0,
+                 rate_increase=5.0, decrease_factor=0.5, latency_target=None):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase = rate_increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+
+        self.concurrency = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self.rate = float(min(max(initial_rate, min_rate), max_rate))
+        self.avg_latency = None
+        self.throttle_events = 0
+        self.decrease_events = 0
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self):
+        """現在の同時実行数の上限（整数）"""
+        return max(self.min_concurrency, int(self.concurrency))
+
+    def on_success(self, latency, in_flight=None):
+        """
+        送信成功時の加算増加
+
+        Args:
+            latency (float): 送信にかかった時間（秒）
+            in_flight (int): 送信時点の同時実行数。上限に達していない場合は同時実行数を増やさない
+        """
+        self._observe_latency(latency)
+        if self.latency_target is not None and latency > self.latency_target:
+            self._decrease()
+            return
+        if in_flight is None or in_flight >= self.limit:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+        self.rate = min(self.max_rate, self.rate + self.rate_increase / self.rate)
+
+    def on_throttle(self, latency):
+        """スロットリング検知時の乗算減少"""
+        self._observe_latency(latency)
+        self.throttle_events += 1
+        self._decrease()
+
+    def on_error(self, latency):
+        """スロットリング以外のエラー（制御量は変更しない）"""
+        self._observe_latency(latency)
+
+    def _observe_latency(self, latency):
+        # 指数移動平均
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < (self.avg_latency or 0.0):
+            return
+        self._last_decrease = now
+        self.decrease_events += 1
+        self.concurrency = max(float(self.min_concurrency), self.concurrency * self.decrease_factor)
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+
+class AsyncSubmitEngine:
+    """
+    トークンバケットとAIMD制御でジョブを非同期に送信するエンジン
+
+    boto3 は同期APIのため、個々の送信はスレッドプール上で実行し、
+    asyncio 側で流量制御だけを行う。
+
+    Args:
+        submit_fn (callable): 1件分の送信を行う関数。引数はアイテム、戻り値は結果の辞書
+        controller (AimdController): 同時実行数・レートの制御器
+        is_throttled (callable): 結果の辞書がスロットリングによる失敗かを判定する関数
+        is_success (callable): 結果の辞書が送信成功かを判定する関数
+        on_result (callable): 結果が得られるたびに呼び出されるコールバック
+        collect_results (bool): Falseの場合は結果をメモリに保持しない（on_resultで逐次処理する場合）
+        rate_window (float): 到達送信レートを計算する直近の時間幅（秒）
+    """
+
+    def __init__(self, submit_fn, controller=None, is_throttled=None, is_success=None,
+                 on_result=None, collect_results=True, rate_window=5.0):
+        self.submit_fn = submit_fn
+        self.controller = controller or AimdController()
+        self.is_throttled = is_throttled or result_was_throttled
+        self.is_success = is_success or (lambda r: r.get('status') == 'SUBMITTED')
+        self.on_result = on_result
+        self.collect_results = collect_results
+        self.total_results = 0
+        self.successful_results = 0
+        self.rate_window = rate_window
+
+        self.bucket = TokenBucket(self.controller.rate)
+        self.peak_in_flight = 0
+        self._active = 0
+        self._completions = deque()
+        self._started = None
+        self._finished = None
+
+    def run(self, items):
+        """
+        全アイテムを送信して結果のリストを返す（同期呼び出し用）
+
+        Args:
+            items (iterable): submit_fn に渡すアイテム
+
+        Returns:
+            list: 完了順の結果リスト（collect_results=Falseの場合は空）
+        """
+        return asyncio.run(self.run_async(items))
+
+    async def run_async(self, items):
+        """全アイテムを送信して結果のリストを返す"""
+        loop = asyncio.get_running_loop()
+        pending = deque(items)
+        in_flight = set()
+        results = []
+
+        self._started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.controller.max_concurrency) as executor:
+            while pending or in_flight:
+                while pending and self._active < self.controller.limit:
+                    await self.bucket.acquire()
+                    item = pending.popleft()
+                    self._active += 1
+                    self.peak_in_flight = max(self.peak_in_flight, self._active)
+                    in_flight.add(loop.create_task(self._submit(loop, executor, item)))
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    self.total_results += 1
+                    if self.is_success(result):
+                        self.successful_results += 1
+                    if self.collect_results:
+                        results.append(result)
+                    if self.on_result:
+                        self.on_result(result)
+        self._finished = time.monotonic()
+
+        return results
+
+    async def _submit(self, loop, executor, item):
+        start = time.monotonic()
+        in_flight = self._active
+        try:
+            result = await loop.run_in_executor(executor, self.submit_fn, item)
+        finally:
+            self._active -= 1
+        end = time.monotonic()
+        latency = end - start
+
+        if self.is_throttled(result):
+            self.controller.on_throttle(latency)
+        elif self.is_success(result):
+            self.controller.on_success(latency, in_flight)
+        else:
+            self.controller.on_error(latency)
+        if self.is_success(result):
+            self._completions.append(end)
+        self.bucket.set_rate(self.controller.rate)
+
+        while self._completions and end - self._completions[0] > self.rate_window:
+            self._completions.popleft()
+
+        return result
+
+    def settled_submit_rate(self):
+        """直近 rate_window 秒間に成功した送信のレート（件/秒）"""
+        if len(self._completions) < 2:
+            return float(len(self._completions))
+        span = self._completions[-1] - self._completions[0]
+        return (len(self._completions) - 1) / span if span > 0 else float(len(self._completions))
+
+    def stats(self):
+        """
+        送信エンジンの統計情報
+
+        Returns:
+            dict: 到達した送信レートや最終的な制御量
+        """
+        elapsed = (self._finished or time.monotonic()) - (self._started or time.monotonic())
+        return {
+            'settledSubmitRate': self.settled_submit_rate(),
+            'finalConcurrency': self.controller.limit,
+            'finalRateLimit': self.controller.rate,
+            'peakInFlight': self.peak_in_flight,
+            'throttleEvents': self.controller.throttle_events,
+            'decreaseEvents': self.controller.decrease_events,
+            'avgLatency': self.controller.avg_latency,
+            'elapsedSeconds': elapsed,
+            'totalResults': self.total_results,
+            'successfulResults': self.successful_results,
+        }
@@ -0,0 +1,70 @@
+"""
+batch/ のテストの共通設定
+
+batch/ のモジュールをインポートできるようにし、ハイフンを含むスクリプト（concurrent-job-launcher.py など）を
+モジュールとして読み込むフィクスチャを提供する。
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+
+BATCH_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BATCH_DIR)
+
+
+def load_script(filename):
+    """ハイフンを含むスクリプトをモジュールとして読み込む"""
+    name = os.path.splitext(filename)[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BATCH_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def launcher_module():
+    """concurrent-job-launcher.py（boto3 が無い環境ではスキップ）"""
+    pytest.importorskip('boto3')
+    return load_script('concurrent-job-launcher.py')
+
+
+def _disable_numpy(patcher):
+    import job_timeline
+    import scalability
+    import timing_stats
+
+    for module in (timing_stats, job_timeline, scalability):
+        patcher.setattr(module, 'HAS_NUMPY', False)
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def compute_path(request, monkeypatch):
+    """numpy と Python の両方の計算パスで実行する（numpy が無い環境では numpy のパスをスキップ）"""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        _disable_numpy(monkeypatch)
+    return request.param
+
+
+@pytest.fixture
+def numpy_and_python(monkeypatch):
+    """
+    同じ計算を numpy と Python の計算パスで実行して両方の結果を返す関数
+
+    計算する関数は JobColumns などを毎回作り直すこと（列のキャッシュは計算パスごとに型が異なる）。
+    """
+    pytest.importorskip('numpy')
+
+    def run(compute):
+        with_numpy = compute()
+        with monkeypatch.context() as patcher:
+            _disable_numpy(patcher)
+            without_numpy = compute()
+        return with_numpy, without_numpy
+    return run
@@ -0,0 +1,73 @@
+"""columnar_results の列指向形式（.npz）の保存と読み込みのテスト"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from columnar_results import read_columnar_result, write_columnar_result  # noqa: E402
+
+
+def sample_result():
+    jobs = []
+    for i in range(6):
+        job = {
+            'jobId': f"id-{i:04d}-{'x' * i}",
+            'jobName': f"concurrent-test-run-job{i + 1:03d}",
+            'status': 'SUBMITTED' if i % 3 else 'FAILED_TO_SUBMIT',
+            'submissionTime': f"2025-01-01T12:00:0{i}.{i * 111111 + 1:06d}",
+            'submitDuration': 0.05 * (i + 1),
+            'retryCount': i % 2,
+            'recovered': i == 4,
+            'attempts': [{'exitCode': i}],
+            'target': 'queue-a@日本' if i % 2 else 'queue-b@us-west-2',
+        }
+        if i == 2:
+            # 値が無い（None）キーは欠損として扱う
+            job['submitDuration'] = None
+            del job['attempts']
+        jobs.append(job)
+    return {'runId': 'run', 'totalJobs': len(jobs), 'submitLatency': {'p50': 0.1}, 'jobs': jobs}
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_round_trip(tmp_path, compress):
+    data = sample_result()
+    path = str(tmp_path / 'result.npz')
+
+    kinds = write_columnar_result(data, path, compress=compress)
+    loaded = read_columnar_result(path)
+
+    assert kinds['status'] == 'category'
+    assert kinds['submissionTime'] == 'time'
+    assert kinds['retryCount'] == 'int'
+    assert kinds['recovered'] == 'bool'
+    assert kinds['attempts'] == 'json'
+    assert kinds['jobId'] == 'string'
+    assert {k: v for k, v in loaded.items() if k != 'jobs'} == {
+        k: v for k, v in data.items() if k != 'jobs'}
+    assert len(loaded['jobs']) == len(data['jobs'])
+    for original, row in zip(data['jobs'], loaded['jobs']):
+        assert dict(row) == {k: v for k, v in original.items() if v is not None}
+    assert loaded['jobs'][2].get('submitDuration') is None
+    assert loaded['jobs'][-1]['jobName'] == data['jobs'][-1]['jobName']
+
+
+def test_columns_and_missing(tmp_path):
+    path = str(tmp_path / 'result.npz')
+    write_columnar_result(sample_result(), path)
+    jobs = read_columnar_result(path)['jobs']
+
+    durations = jobs.column('submitDuration')
+    assert np.isnan(durations[2])
+    assert durations[0] == pytest.approx(0.05)
+    assert jobs.missing('submitDuration').tolist() == [False, False, True, False, False, False]
+    assert jobs.missing('unknown').all()
+    assert jobs.column('unknown') is None
+    assert jobs.column('status').tolist()[:2] == ['FAILED_TO_SUBMIT', 'SUBMITTED']
+
+
+def test_rejects_files_that_are_not_columnar_results(tmp_path):
+    path = str(tmp_path / 'other.npz')
+    np.savez(path, values=np.arange(3))
+    with pytest.raises(ValueError):
+        read_columnar_result(path)
@@ -0,0 +1,160 @@
+"""job_drain のジョブの一斉停止のテスト"""
+
+import threading
+
+import pytest
+
+from conftest import load_script
+from job_drain import JobDrainer, drain_job_ids
+from job_ledger import JobLedger
+from retry_policy import RetryPolicy
+
+
+class DrainClient:
+    """
+    cancel_job / terminate_job を記録する Batch クライアント
+
+    cancel_job の要求と前後して実行が始まったジョブ（started_on_cancel）は、cancel_job では止まらず
+    RUNNING になる。terminate_job を呼び出したジョブは次の describe_jobs で FAILED になる。
+    """
+
+    def __init__(self, statuses, started_on_cancel=(), array_ids=()):
+        self.statuses = dict(statuses)
+        self.started_on_cancel = set(started_on_cancel)
+        self.array_ids = set(array_ids)
+        self.cancelled = []
+        self.terminated = []
+        self._lock = threading.Lock()
+
+    def describe_jobs(self, jobs):
+        with self._lock:
+            result = []
+            for job_id in jobs:
+                if job_id not in self.statuses:
+                    continue
+                job = {'jobId': job_id, 'jobStatus': self.statuses[job_id]}
+                if job_id in self.array_ids:
+                    job['arrayProperties'] = {'size': 3}
+                result.append(job)
+            return {'jobs': result}
+
+    def cancel_job(self, jobId, reason):
+        with self._lock:
+            self.cancelled.append(jobId)
+            self.statuses[jobId] = 'RUNNING' if jobId in self.started_on_cancel else 'FAILED'
+        return {}
+
+    def terminate_job(self, jobId, reason):
+        with self._lock:
+            self.terminated.append(jobId)
+            self.statuses[jobId] = 'FAILED'
+        return {}
+
+    def list_jobs(self, jobQueue, jobStatus, **kwargs):
+        with self._lock:
+            return {'jobSummaryList': [{'jobId': j} for j, s in self.statuses.items() if s == jobStatus]}
+
+
+def drainer(client):
+    return JobDrainer(client, retry_policy=RetryPolicy(sleep=lambda delay: None), max_workers=4, rate=1000)
+
+
+def test_drain_job_ids_groups_array_children():
+    assert drain_job_ids(['a:0', 'a:1', 'b', None, 'b', 'c:2']) == ['a', 'b', 'c']
+
+
+def test_drain_cancels_queued_and_terminates_running_jobs():
+    client = DrainClient({'queued': 'RUNNABLE', 'running': 'RUNNING', 'done': 'SUCCEEDED'})
+
+    report = drainer(client).drain(['queued', 'running', 'done'], job_queue='queue', check_interval=0)
+
+    assert client.cancelled == ['queued']
+    assert client.terminated == ['running']
+    assert report['targetJobs'] == 3
+    assert report['alreadyFinished'] == 1
+    assert (report['cancelled'], report['terminated']) == (1, 1)
+    assert report['remainingJobs'] == 0
+    assert report['timeToDrainSeconds'] is not None
+    assert report['queueActiveJobs'] == {}
+
+
+def test_drain_escalates_jobs_that_started_during_cancel():
+    client = DrainClient({'racing': 'RUNNABLE', 'queued': 'PENDING'}, started_on_cancel=['racing'])
+
+    report = drainer(client).drain(['racing', 'queued'], check_interval=0)
+
+    # 取り消しの要求と前後して実行が始まったジョブは terminate_job で停止し直す
+    assert sorted(client.cancelled) == ['queued', 'racing']
+    assert client.terminated == ['racing']
+    assert report['cancelled'] == 2
+    assert report['terminated'] == 1
+    assert report['remainingJobs'] == 0
+
+
+def test_drain_terminates_array_parent_once():
+    client = DrainClient({'parent': 'PENDING'}, array_ids=['parent'])
+
+    report = drainer(client).drain(['parent:0', 'parent:1', 'parent:2'], check_interval=0)
+
+    # 配列ジョブは待機中でも親ジョブの terminate_job でまとめて停止する
+    assert client.cancelled == []
+    assert client.terminated == ['parent']
+    assert report['targetJobs'] == 1
+
+
+def test_drain_reports_jobs_that_do_not_finish():
+    client = DrainClient({'stuck': 'RUNNING'})
+    client.terminate_job = lambda jobId, reason: {}
+
+    report = drainer(client).drain(['stuck'], timeout=0.05, check_interval=0.01)
+
+    assert report['remainingJobs'] == 1
+    assert report['timeToDrainSeconds'] is None
+
+
+class ListJobsClient:
+    """list_jobs のジョブ名の検索を記録し、送信先ごとのジョブを返す Batch クライアント"""
+
+    def __init__(self, region, jobs, searched):
+        self.region = region
+        self.jobs = jobs
+        self.searched = searched
+
+    def list_jobs(self, jobQueue, filters, **kwargs):
+        self.searched.append((jobQueue, self.region))
+        return {'jobSummaryList': self.jobs.get((jobQueue, self.region), [])}
+
+
+def test_jobs_from_ledger_uses_recorded_targets(tmp_path):
+    pytest.importorskip('boto3')
+    drain_jobs = load_script('drain-jobs.py')
+    targets = [
+        {'name': 'a@r1', 'jobQueue': 'queue-a', 'region': 'r1'},
+        {'name': 'b@r2', 'jobQueue': 'queue-b', 'region': 'r2'},
+    ]
+    searched = []
+    found = {('queue-b', 'r2'): [{'jobId': 'id-lost', 'status': 'RUNNABLE'}]}
+
+    def client_for(region):
+        return ListJobsClient(region, found, searched)
+
+    path = str(tmp_path / 'ledger.db')
+    with JobLedger(path) as ledger:
+        ledger.start_run({'job_queue': None, 'targets': targets})
+        ledger.record_submitted({'jobName': 'job001', 'jobId': 'id-1', 'status': 'SUBMITTED', 'target': 'a@r1'})
+        ledger.record_submitted({'jobName': 'job002', 'jobId': 'id-2', 'status': 'SUBMITTED', 'target': 'b@r2'})
+        ledger.record_submitted({'jobName': 'job003', 'jobId': 'id-3', 'status': 'SUBMITTED', 'target': 'a@r1'})
+        ledger.record_terminal('id-3', 'SUCCEEDED')
+
+    # 送信先が記録されたジョブのみの場合は list_jobs で検索しない
+    _, groups = drain_jobs.jobs_from_ledger(path, None, 'us-west-2', client_for)
+    assert groups == {('queue-a', 'r1'): ['id-1'], ('queue-b', 'r2'): ['id-2']}
+    assert searched == []
+
+    # 送信結果が記録されていないジョブがある場合は全送信先のキューを検索する
+    with JobLedger(path) as ledger:
+        ledger.resume_run()
+        ledger.record_intended('job004')
+    _, groups = drain_jobs.jobs_from_ledger(path, None, 'us-west-2', client_for)
+    assert groups == {('queue-a', 'r1'): ['id-1'], ('queue-b', 'r2'): ['id-2', 'id-lost']}
+    assert sorted(searched) == [('queue-a', 'r1'), ('queue-b', 'r2')]
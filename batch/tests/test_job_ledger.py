@@ -0,0 +1,83 @@
+"""job_ledger のジョブ台帳と、台帳からの送信の再開のテスト"""
+
+import pytest
+
+from batch_simulator import SimulatedBatchClient
+from job_ledger import LEDGER_INTENDED, JobLedger, job_name_prefix
+
+
+def test_start_and_resume_run(tmp_path):
+    path = str(tmp_path / 'ledger.db')
+    with JobLedger(path) as ledger:
+        first = ledger.start_run({'num_jobs': 3}, run_id='20250101000000-aaaaaa')
+        ledger.record_intended(f"{job_name_prefix(first)}job001")
+        second = ledger.start_run({'num_jobs': 5}, run_id='20250101000001-bbbbbb')
+
+    with JobLedger(path) as ledger:
+        assert ledger.resume_run() == {'num_jobs': 5}
+        assert ledger.run_id == second
+        assert ledger.jobs() == {}
+
+        assert ledger.resume_run(first) == {'num_jobs': 3}
+        assert ledger.jobs() == {f"{job_name_prefix(first)}job001": (LEDGER_INTENDED, None)}
+
+        with pytest.raises(ValueError):
+            ledger.resume_run('unknown')
+
+
+def test_job_state_transitions(tmp_path):
+    with JobLedger(str(tmp_path / 'ledger.db')) as ledger:
+        ledger.start_run({})
+        ledger.record_intended('job-a')
+        ledger.record_submitted({'jobName': 'job-a', 'jobId': 'id-a', 'status': 'SUBMITTED'})
+        # 送信結果の記録後に INTENDED を記録しても状態は戻らない
+        ledger.record_intended('job-a')
+        ledger.record_intended('job-b')
+        ledger.record_terminal('id-a', 'SUCCEEDED')
+
+        jobs = ledger.jobs()
+        assert jobs['job-a'][0] == 'SUCCEEDED'
+        assert jobs['job-a'][1]['jobId'] == 'id-a'
+        assert jobs['job-b'] == (LEDGER_INTENDED, None)
+
+        ledger.record_results([{'jobName': 'job-b', 'jobId': 'id-b', 'status': 'SUBMITTED', 'finalStatus': 'FAILED'}])
+        assert ledger.jobs()['job-b'][0] == 'FAILED'
+
+
+def test_resume_submits_only_unsubmitted_jobs(tmp_path, launcher_module):
+    path = str(tmp_path / 'ledger.db')
+    client = SimulatedBatchClient(job_queue='queue', time_scale=1000)
+
+    ledger = JobLedger(path)
+    launcher = launcher_module.BatchJobLauncher('queue', 'definition', batch_client=client, ledger=ledger)
+    ledger.start_run({'num_jobs': 7}, run_id=launcher.run_id)
+    first = launcher.submit_concurrent_jobs(7, 1, 2, job_indices=[1, 2, 3])
+    assert all(r['status'] == 'SUBMITTED' for r in first)
+
+    # 送信した後、送信結果を記録する前に停止したジョブ
+    lost = launcher.job_name('job004')
+    ledger.record_intended(lost)
+    lost_id = client.submit_job(jobName=lost, jobQueue='queue', jobDefinition='definition')['jobId']
+    # 送信に失敗したジョブと、送信する前に停止したジョブ
+    ledger.record_submitted({'jobName': launcher.job_name('job005'), 'status': 'FAILED_TO_SUBMIT'})
+    ledger.record_intended(launcher.job_name('job006'))
+    ledger.close()
+
+    ledger = JobLedger(path)
+    assert ledger.resume_run() == {'num_jobs': 7}
+    resumed = launcher_module.BatchJobLauncher('queue', 'definition', batch_client=client,
+                                               run_id=ledger.run_id, ledger=ledger)
+    submits_before = client.api_calls['submit_job']
+    results = resumed.resume_submission(7, 1, 2)
+
+    by_name = {r['jobName']: r for r in results}
+    assert sorted(by_name) == [launcher.job_name(f"job{i:03d}") for i in range(1, 8)]
+    assert all(r['status'] == 'SUBMITTED' for r in results)
+    assert by_name[lost]['jobId'] == lost_id
+    assert by_name[lost]['recovered']
+    for record in first:
+        assert by_name[record['jobName']]['jobId'] == record['jobId']
+    # 再送信したのは job005〜job007 のみ
+    assert client.api_calls['submit_job'] - submits_before == 3
+    assert {state for state, _ in ledger.jobs().values()} == {'SUBMITTED'}
+    ledger.close()
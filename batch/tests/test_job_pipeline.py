@@ -0,0 +1,86 @@
+"""job_pipeline のパイプライン定義の検証・ウェーブ分割・所要時間の分析のテスト"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from job_pipeline import analyze_pipeline, parse_pipeline, topological_waves
+
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def at(seconds):
+    return (START + timedelta(seconds=seconds)).isoformat()
+
+
+def job(stage, created, started, stopped, index=None):
+    record = {'stage': stage, 'createdAt': at(created), 'startedAt': at(started), 'stoppedAt': at(stopped)}
+    if index is not None:
+        record['arrayIndex'] = index
+    return record
+
+
+def test_waves_follow_dependencies():
+    stages = parse_pipeline({'stages': [
+        {'name': 'report', 'dependsOn': ['transform', 'audit']},
+        {'name': 'extract', 'jobs': 4},
+        {'name': 'transform', 'jobs': 4, 'dependsOn': [{'stage': 'extract', 'type': 'N_TO_N'}]},
+        {'name': 'audit'},
+    ]})
+
+    waves = [sorted(stage.name for stage in wave) for wave in topological_waves(stages)]
+
+    assert waves == [['audit', 'extract'], ['transform'], ['report']]
+
+
+@pytest.mark.parametrize('stages, message', [
+    ([{'name': 'a', 'dependsOn': ['b']}, {'name': 'b', 'dependsOn': ['a']}], '循環'),
+    ([{'name': 'a', 'dependsOn': ['a']}], '循環'),
+    ([{'name': 'a', 'dependsOn': ['missing']}], 'missing'),
+    ([{'name': 'a'}, {'name': 'a'}], '重複'),
+    ([{'name': 'a', 'jobs': 3}, {'name': 'b', 'jobs': 4, 'dependsOn': [{'stage': 'a', 'type': 'N_TO_N'}]}],
+     'N_TO_N'),
+    ([{'name': 'a', 'sequential': True}], 'sequential'),
+    ([{'name': 'a', 'dependsOn': [{'stage': 'b', 'type': 'SEQUENTIAL'}]}, {'name': 'b'}], 'N_TO_N'),
+    ([], 'ステージがありません'),
+])
+def test_invalid_pipelines_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        parse_pipeline({'stages': stages})
+
+
+def test_analyze_pipeline_critical_path_and_queue_latency():
+    stages = parse_pipeline({'stages': [
+        {'name': 'extract', 'jobs': 2},
+        {'name': 'transform', 'jobs': 2, 'dependsOn': [{'stage': 'extract', 'type': 'N_TO_N'}]},
+        {'name': 'report', 'dependsOn': ['transform']},
+    ]})
+    results = [
+        job('extract', 0, 5, 10, index=0),
+        job('extract', 0, 5, 30, index=1),
+        # N_TO_N のため、インデックス0は extract[0] の終了（10秒）で依存が解除される
+        job('transform', 0, 12, 20, index=0),
+        job('transform', 0, 31, 40, index=1),
+        job('report', 0, 45, 50),
+    ]
+
+    analysis = analyze_pipeline(stages, results)
+
+    transform = analysis['stages']['transform']
+    assert transform['completedJobs'] == 2
+    assert transform['queueLatency']['max'] == 2.0
+    assert transform['durationSeconds'] == 28.0
+    path = [(step['stage'], step['arrayIndex']) for step in analysis['criticalPath']]
+    assert path == [('extract', 1), ('transform', 1), ('report', None)]
+    assert analysis['criticalPathQueueSeconds'] == 5 + 1 + 5
+    assert analysis['criticalPathRunSeconds'] == 25 + 9 + 5
+    assert analysis['makespanSeconds'] == 50.0
+
+
+def test_analyze_pipeline_without_finished_jobs():
+    stages = parse_pipeline({'stages': [{'name': 'only'}]})
+    analysis = analyze_pipeline(stages, [{'stage': 'only', 'createdAt': at(0)}])
+    assert analysis['criticalPath'] == []
+    assert analysis['makespanSeconds'] is None
+    assert analysis['stages']['only'] == {'jobs': 1, 'completedJobs': 0}
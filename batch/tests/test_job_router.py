@@ -0,0 +1,95 @@
+"""job_router の送信先の指定と振り分けのテスト"""
+
+import threading
+from collections import Counter
+
+import pytest
+
+from job_router import JobTarget, LeastBacklogRouter, WeightedRouter, parse_target, targets_from_dicts
+
+
+def test_parse_target():
+    target = parse_target('queue-a, definition-a, ap-northeast-1, 2.5', 'us-west-2')
+    assert (target.job_queue, target.job_definition, target.region, target.weight) == (
+        'queue-a', 'definition-a', 'ap-northeast-1', 2.5)
+    assert target.name == 'queue-a@ap-northeast-1'
+
+    target = parse_target('queue-b,definition-b', 'us-west-2')
+    assert (target.region, target.weight) == ('us-west-2', 1.0)
+
+
+@pytest.mark.parametrize('spec', ['queue', 'queue,', ',definition', 'a,b,c,d,e', 'a,b,c,heavy', 'a,b,c,0'])
+def test_parse_target_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_target(spec, 'us-west-2')
+
+
+def test_targets_round_trip_through_dicts():
+    targets = [JobTarget('a', 'd', 'r1', 3, name='primary'), JobTarget('b', 'd', 'r2')]
+    restored = targets_from_dicts([t.to_dict() for t in targets], 'ignored')
+    assert [t.to_dict() for t in restored] == [t.to_dict() for t in targets]
+
+
+def test_weighted_router_is_proportional_and_smooth():
+    targets = [JobTarget('a', 'd', 'r', 3), JobTarget('b', 'd', 'r', 1)]
+    router = WeightedRouter(targets)
+
+    picks = [router.choose().job_queue for _ in range(400)]
+
+    assert Counter(picks) == {'a': 300, 'b': 100}
+    # 重み 3:1 でも a を3回より多く連続して選ばない
+    assert 'aaaa' not in ''.join(picks)
+    assert picks[:4] == ['a', 'a', 'b', 'a']
+
+
+def test_least_backlog_router_prefers_capacity_per_backlog():
+    targets = [JobTarget('busy', 'd', 'r', 1), JobTarget('idle', 'd', 'r', 1), JobTarget('big', 'd', 'r', 4)]
+    backlog = {'busy@r': 10, 'idle@r': 0, 'big@r': 8}
+    router = LeastBacklogRouter(targets, lambda t: backlog[t.name], refresh_interval=3600)
+
+    picks = Counter(router.choose().job_queue for _ in range(12))
+
+    # 送信した分を滞留数に加えて推定し、(滞留数 + 1) / 重み の小さい送信先を選ぶ
+    assert picks['busy'] == 0
+    assert picks['idle'] + picks['big'] == 12
+    assert picks['big'] > picks['idle']
+    assert router.refreshes == 1
+
+
+def test_least_backlog_router_keeps_estimates_when_refresh_fails():
+    targets = [JobTarget('a', 'd', 'r'), JobTarget('b', 'd', 'r')]
+
+    def backlog(target):
+        raise RuntimeError('AccessDenied')
+
+    router = LeastBacklogRouter(targets, backlog, refresh_interval=0)
+    picks = Counter(router.choose().job_queue for _ in range(10))
+    assert picks == {'a': 5, 'b': 5}
+
+
+def test_least_backlog_router_refreshes_outside_the_lock():
+    targets = [JobTarget('a', 'd', 'r'), JobTarget('b', 'd', 'r')]
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def backlog(target):
+        calls.append(target.name)
+        started.set()
+        release.wait(5)
+        return 0
+
+    router = LeastBacklogRouter(targets, backlog, refresh_interval=0)
+    refresher = threading.Thread(target=router.choose)
+    refresher.start()
+    assert started.wait(5)
+
+    # 取得中も他のスレッドは待たされずに推定値で振り分け、取得し直すのは1つのスレッドのみ
+    picks = Counter(router.choose().job_queue for _ in range(4))
+    assert picks == {'a': 2, 'b': 2}
+    assert router.refreshes == 0
+
+    release.set()
+    refresher.join(5)
+    assert not refresher.is_alive()
+    assert router.refreshes == 1
+    assert calls == ['a@r', 'b@r']
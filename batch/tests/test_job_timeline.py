@@ -0,0 +1,79 @@
+"""job_timeline のスループットと実行中ジョブ数の時系列のテスト"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from job_timeline import summarize_timeline
+from timing_stats import JobColumns
+
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def at(seconds):
+    return (START + timedelta(seconds=seconds)).isoformat()
+
+
+def job(started, stopped=None, submitted=0):
+    record = {'submissionTime': at(submitted), 'startedAt': at(started)}
+    if stopped is not None:
+        record['stoppedAt'] = at(stopped)
+    return record
+
+
+def test_sweep_line_counts_running_jobs(compute_path):
+    jobs = [
+        job(0, 10),
+        job(5, 15),
+        # 同時刻の終了と実行開始は入れ替わりとして数える（同時実行数は増えない）
+        job(10, 20),
+        # 終了時刻が無いジョブは最後に観測した時刻（20秒）まで実行中とする
+        job(12),
+        {'submissionTime': at(1)},
+    ]
+
+    timeline = summarize_timeline(JobColumns(jobs), window=5, points=20)
+
+    assert timeline['durationSeconds'] == 20
+    assert timeline['counts'] == {'submitted': 5, 'started': 4, 'completed': 3}
+    assert timeline['peakConcurrency'] == 3
+    assert timeline['peakConcurrencyAt'] == 12
+    assert timeline['meanConcurrency'] == pytest.approx(38 / 20)
+    series = timeline['series']
+    assert len(series['t']) == 21
+    assert series['running'][series['t'].index(11.0)] == 2
+    assert series['running'][series['t'].index(13.0)] == 3
+    # 開始時点の直前5秒に送信4件
+    assert series['submitted'][0] == pytest.approx(4 / 5)
+    assert timeline['peakRates']['submitted'] == pytest.approx(5 / 5)
+
+
+def test_too_few_events_returns_none(compute_path):
+    assert summarize_timeline(JobColumns([{'submissionTime': at(0)}])) is None
+    assert summarize_timeline(JobColumns([job(3, 3, submitted=3)])) is None
+
+
+def test_numpy_and_python_timelines_match(numpy_and_python):
+    rng = random.Random(3)
+    jobs = []
+    for _ in range(300):
+        submitted = rng.uniform(0, 60)
+        started = submitted + rng.expovariate(0.2)
+        record = job(started, started + rng.uniform(5, 30) if rng.random() < 0.9 else None, submitted)
+        if rng.random() < 0.05:
+            del record['startedAt']
+        jobs.append(record)
+
+    with_numpy, without_numpy = numpy_and_python(lambda: summarize_timeline(JobColumns(jobs)))
+
+    series_numpy, series_python = with_numpy.pop('series'), without_numpy.pop('series')
+    assert series_numpy.keys() == series_python.keys()
+    for key in series_python:
+        assert series_numpy[key] == pytest.approx(series_python[key]), key
+    assert with_numpy['counts'] == without_numpy['counts']
+    for key in ('durationSeconds', 'windowSeconds', 'peakConcurrency', 'peakConcurrencyAt', 'meanConcurrency'):
+        assert with_numpy[key] == pytest.approx(without_numpy[key]), key
+    for key in ('meanRates', 'peakRates'):
+        assert with_numpy[key] == pytest.approx(without_numpy[key]), key
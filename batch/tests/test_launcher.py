@@ -0,0 +1,202 @@
+"""concurrent-job-launcher.py のシミュレーターでの送信・監視・再開のテスト"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import batch_simulator
+from batch_simulator import ClientError, SimulatedBatchClient
+from conftest import BATCH_DIR
+from job_ledger import JobLedger
+from job_router import JobTarget
+
+
+SIMULATE_ARGS = [
+    '--simulate', '--sim-time-scale', '2000', '--job-queue', 'queue', '--job-definition', 'definition',
+    '--countdown', '5', '--max-workers', '5',
+]
+
+
+def run_script(filename, args, cwd):
+    return subprocess.run([sys.executable, os.path.join(BATCH_DIR, filename)] + args,
+                          cwd=cwd, capture_output=True, text=True, timeout=120)
+
+
+def test_simulate_submit_monitor_and_analyze(tmp_path, launcher_module):
+    results_dir = tmp_path / 'results'
+    results_dir.mkdir()
+    output = results_dir / 'simulated-20.json'
+
+    completed = run_script('concurrent-job-launcher.py', SIMULATE_ARGS + [
+        '--num-jobs', '20', '--monitor', '--monitor-interval', '0.2', '--output', str(output)], tmp_path)
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+
+    result = json.loads(output.read_text(encoding='utf-8'))
+    jobs = result['jobs']
+    assert result['successfulJobs'] == len(jobs) == 20
+    assert {job['finalStatus'] for job in jobs} == {'SUCCEEDED'}
+    for job in jobs:
+        assert job['startedAt'] <= job['stoppedAt']
+        assert job['submitWallSeconds'] >= job['submitDuration']
+    assert result['simulator']['apiCalls']['submit_job'] == 20
+
+    analyzed = run_script('analyze-test-results.py', [str(results_dir), '--strict'], tmp_path)
+    assert analyzed.returncode == 0, analyzed.stdout + analyzed.stderr
+
+
+def test_ledger_is_opt_in(tmp_path, launcher_module):
+    completed = run_script('concurrent-job-launcher.py', SIMULATE_ARGS + ['--num-jobs', '3'], tmp_path)
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    assert os.listdir(tmp_path) == []
+
+    completed = run_script('concurrent-job-launcher.py', SIMULATE_ARGS + [
+        '--num-jobs', '3', '--monitor', '--monitor-interval', '0.2', '--ledger', 'ledger.db'], tmp_path)
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    with JobLedger(str(tmp_path / 'ledger.db')) as ledger:
+        ledger.resume_run()
+        assert len(ledger.jobs()) == 3
+        assert {state for state, _ in ledger.jobs().values()} == {'SUCCEEDED'}
+
+    completed = run_script('concurrent-job-launcher.py', ['--simulate', '--resume'], tmp_path)
+    assert completed.returncode == 2
+    assert '--ledger' in completed.stderr
+
+
+def test_ambiguous_submit_error_is_not_resubmitted(launcher_module):
+    client = SimulatedBatchClient(job_queue='queue', time_scale=2000)
+    submit_job = client.submit_job
+    failures = []
+
+    def lost_response(**kwargs):
+        response = submit_job(**kwargs)
+        if not failures:
+            # 受け付けられた後に応答が失われた
+            failures.append(response['jobId'])
+            raise ClientError({'Error': {'Code': 'InternalServerError', 'Message': 'lost'},
+                               'ResponseMetadata': {'HTTPStatusCode': 500}}, 'SubmitJob')
+        return response
+    client.submit_job = lost_response
+
+    retry_policy = launcher_module.RetryPolicy(sleep=lambda delay: None)
+    launcher = launcher_module.BatchJobLauncher('queue', 'definition', batch_client=client, retry_policy=retry_policy)
+    job_info = launcher.submit_single_job('job001', 1)
+
+    assert job_info['status'] == 'SUBMITTED'
+    assert job_info['jobId'] == failures[0]
+    assert job_info['recovered'] is True
+    assert client.api_calls['submit_job'] == 1
+    assert launcher.submitted_job_ids == failures
+
+
+def run_main(launcher_module, monkeypatch, tmp_path, args):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'argv', ['concurrent-job-launcher.py'] + args)
+    launcher_module.main()
+
+
+def test_definition_check_warns_when_access_is_denied(tmp_path, monkeypatch, capsys, launcher_module):
+    def denied(self, **kwargs):
+        raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}},
+                          'DescribeJobDefinitions')
+    monkeypatch.setattr(batch_simulator.SimulatedBatchClient, 'describe_job_definitions', denied)
+
+    run_main(launcher_module, monkeypatch, tmp_path, SIMULATE_ARGS + ['--num-jobs', '4', '--output', 'out.json'])
+
+    assert '検証せずに送信します' in capsys.readouterr().out
+    result = json.loads((tmp_path / 'out.json').read_text(encoding='utf-8'))
+    assert result['successfulJobs'] == 4
+    assert 'jobDefinitionInfo' not in result
+
+
+def test_definition_check_aborts_when_definition_is_missing(tmp_path, monkeypatch, launcher_module):
+    monkeypatch.setattr(batch_simulator.SimulatedBatchClient, 'describe_job_definitions',
+                        lambda self, **kwargs: {'jobDefinitions': []})
+
+    with pytest.raises(SystemExit) as raised:
+        run_main(launcher_module, monkeypatch, tmp_path, SIMULATE_ARGS + ['--output', 'out.json'])
+
+    assert raised.value.code == 2
+    assert not (tmp_path / 'out.json').exists()
+
+
+def multi_target_launcher(launcher_module, clients, ledger, run_id=None):
+    targets = [JobTarget('queue-a', 'definition', 'region'), JobTarget('queue-b', 'definition', 'region')]
+    return launcher_module.MultiTargetLauncher(
+        targets, client_factory=lambda target: clients[target.job_queue], ledger=ledger, run_id=run_id)
+
+
+def test_multi_target_resume(tmp_path, launcher_module):
+    path = str(tmp_path / 'ledger.db')
+    clients = {queue: SimulatedBatchClient(job_queue=queue, time_scale=2000) for queue in ('queue-a', 'queue-b')}
+
+    ledger = JobLedger(path)
+    launcher = multi_target_launcher(launcher_module, clients, ledger)
+    ledger.start_run({'targets': [t.to_dict() for t in launcher.targets]}, run_id=launcher.run_id)
+    first = launcher.submit_concurrent_jobs(8, 1, 2, job_indices=[1, 2, 3, 4])
+    assert {job['target'] for job in first} == {'queue-a@region', 'queue-b@region'}
+    # queue-b に送信した後、送信結果を記録する前に停止したジョブ
+    lost = launcher.job_name('job005')
+    ledger.record_intended(lost)
+    lost_id = clients['queue-b'].submit_job(jobName=lost, jobQueue='queue-b', jobDefinition='definition')['jobId']
+    ledger.close()
+
+    ledger = JobLedger(path)
+    ledger.resume_run()
+    resumed = multi_target_launcher(launcher_module, clients, ledger, run_id=ledger.run_id)
+    results = resumed.resume_submission(8, 1, 2)
+
+    by_name = {job['jobName']: job for job in results}
+    assert len(by_name) == 8
+    assert all(job['status'] == 'SUBMITTED' for job in results)
+    assert by_name[lost]['jobId'] == lost_id
+    for job in first:
+        assert by_name[job['jobName']]['target'] == job['target']
+    # 台帳から復元したジョブも送信先のランチャーの停止（drain）の対象になる
+    drain_ids = {job_id for t in resumed.targets for job_id in t.launcher.submitted_job_ids}
+    assert drain_ids == {job['jobId'] for job in results}
+    assert lost_id in resumed.targets[1].launcher.submitted_job_ids
+
+    # 送信先が記録されていないジョブIDも送信先を探して取得し、どの送信先にも無いジョブIDは失敗として返す
+    jobs, failed = resumed.describe_jobs_chunked([job['jobId'] for job in results] + ['unknown-job'])
+    assert len(jobs) == 8
+    assert failed == ['unknown-job']
+
+    final_jobs = resumed.monitor_jobs(results, check_interval=0.05)
+    assert {job['jobStatus'] for job in final_jobs.values()} == {'SUCCEEDED'}
+    assert {state for state, _ in ledger.jobs().values()} == {'SUCCEEDED'}
+    ledger.close()
+
+
+def test_array_job_counts_submit_once(launcher_module):
+    parent = {'jobId': 'parent', 'jobName': 'run-array', 'status': 'SUBMITTED', 'submitDuration': 0.2,
+              'submitWallSeconds': 0.5, 'retryCount': 1, 'throttleCount': 1, 'backoffSeconds': 0.3}
+
+    children = launcher_module.BatchJobLauncher.expand_array_job(parent, 3)
+
+    assert [child['jobId'] for child in children] == ['parent:0', 'parent:1', 'parent:2']
+    assert children[0]['submitDuration'] == 0.2 and children[0]['throttleCount'] == 1
+    for child in children[1:]:
+        assert not set(launcher_module.SUBMIT_ATTEMPT_KEYS) & set(child)
+    assert sum(child.get('retryCount', 0) for child in children) == 1
+
+
+def test_resumed_array_job_is_drained(tmp_path, launcher_module):
+    path = str(tmp_path / 'ledger.db')
+    client = SimulatedBatchClient(job_queue='queue', time_scale=2000)
+
+    with JobLedger(path) as ledger:
+        ledger.start_run({})
+        launcher = launcher_module.BatchJobLauncher('queue', 'definition', batch_client=client,
+                                                    run_id=ledger.run_id, ledger=ledger)
+        parent_id = launcher.submit_array_job(4, 1)[0]['arrayJobId']
+
+    with JobLedger(path) as ledger:
+        ledger.resume_run()
+        resumed = launcher_module.BatchJobLauncher('queue', 'definition', batch_client=client,
+                                                   run_id=ledger.run_id, ledger=ledger)
+        children = resumed.resume_submission(4, 1, array_job=True)
+        assert [child['arrayJobId'] for child in children] == [parent_id] * 4
+        assert resumed.submitted_job_ids == [parent_id]
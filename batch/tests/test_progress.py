@@ -0,0 +1,41 @@
+"""progress の NDJSON の進捗表示のテスト"""
+
+import io
+import json
+
+import pytest
+
+from progress import NdjsonProgressRenderer
+
+
+def render(**kwargs):
+    stream = io.StringIO()
+    renderer = NdjsonProgressRenderer(stream, **kwargs)
+    renderer.start(3)
+    for job_id in ('a', 'b', 'c'):
+        renderer.transition({'jobId': job_id, 'jobName': job_id}, None, 'RUNNING')
+    renderer.update({'RUNNING': 3}, 0)
+    # 状態遷移が無い更新では出力しない
+    renderer.update({'RUNNING': 3}, 0)
+    renderer.transition({'jobId': 'a', 'jobName': 'a'}, 'RUNNING', 'SUCCEEDED')
+    renderer.update({'RUNNING': 2, 'SUCCEEDED': 1}, 1)
+    renderer.finish({'RUNNING': 0, 'SUCCEEDED': 3}, 3)
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_ndjson_emits_one_aggregate_line_per_update():
+    events = render()
+
+    assert [event['event'] for event in events] == ['start', 'progress', 'progress', 'finish']
+    assert events[1]['counts'] == {'RUNNING': 3}
+    assert events[2]['counts'] == {'RUNNING': 2, 'SUCCEEDED': 1}
+    assert (events[2]['completed'], events[2]['total']) == (1, 3)
+    assert events[3]['counts'] == {'SUCCEEDED': 3}
+
+
+@pytest.mark.parametrize('job_events, transitions', [(False, 0), (True, 4)])
+def test_ndjson_job_events_are_opt_in(job_events, transitions):
+    events = render(job_events=job_events)
+
+    assert sum(event['event'] == 'transition' for event in events) == transitions
+    assert sum(event['event'] == 'progress' for event in events) == 2
@@ -0,0 +1,178 @@
+"""retry_policy のエラー分類・ジッター・リトライ予算のテスト"""
+
+import random
+
+import pytest
+
+from retry_policy import (
+    ERROR_CLASS_FATAL,
+    ERROR_CLASS_RETRYABLE,
+    ERROR_CLASS_THROTTLING,
+    RetryBudget,
+    RetryExhaustedError,
+    RetryPolicy,
+    classify_error,
+)
+
+
+class ApiError(Exception):
+    """ClientError と同じ response を持つ例外"""
+
+    def __init__(self, code, status=400):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+def failing(errors, result='ok'):
+    """errors の例外を順に発生させ、尽きたら result を返す関数"""
+    errors = list(errors)
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return call
+
+
+class RecordingSleep:
+    def __init__(self):
+        self.delays = []
+
+    def __call__(self, delay):
+        self.delays.append(delay)
+
+
+@pytest.mark.parametrize('error, expected', [
+    (ApiError('TooManyRequestsException'), ERROR_CLASS_THROTTLING),
+    (ApiError('SomethingElse', status=429), ERROR_CLASS_THROTTLING),
+    (ApiError('ServiceUnavailableException'), ERROR_CLASS_RETRYABLE),
+    (ApiError('SomethingElse', status=503), ERROR_CLASS_RETRYABLE),
+    (ConnectionError('reset'), ERROR_CLASS_RETRYABLE),
+    (ApiError('ClientException'), ERROR_CLASS_FATAL),
+    (ValueError('bad'), ERROR_CLASS_FATAL),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_next_delay_is_decorrelated_jitter_within_bounds():
+    random.seed(1)
+    policy = RetryPolicy(base_delay=0.1, max_delay=2.0)
+    previous = policy.base_delay
+    delays = []
+    for _ in range(200):
+        delay = policy.next_delay(previous)
+        assert policy.base_delay <= delay <= min(policy.max_delay, previous * 3)
+        delays.append(delay)
+        previous = delay
+    # 上限に張り付かず、値がばらつく
+    assert len({round(d, 6) for d in delays}) > 100
+    assert max(delays) == pytest.approx(2.0, abs=0.5)
+
+
+def test_call_retries_throttling_and_reports_backoff_separately():
+    sleep = RecordingSleep()
+    policy = RetryPolicy(max_attempts=5, sleep=sleep)
+    errors = [ApiError('ThrottlingException'), ApiError('InternalServerError')]
+
+    result, info = policy.call(failing(errors))
+
+    assert result == 'ok'
+    assert info['retryCount'] == 2
+    assert info['throttleCount'] == 1
+    assert info['errorClass'] == ERROR_CLASS_RETRYABLE
+    assert info['backoffSeconds'] == pytest.approx(sum(sleep.delays))
+    # 所要時間は最後の試行のみで、バックオフの待機を含まない
+    assert 0 <= info['attemptSeconds'] < 0.05
+
+
+def test_fatal_error_is_not_retried():
+    sleep = RecordingSleep()
+    policy = RetryPolicy(sleep=sleep)
+
+    with pytest.raises(RetryExhaustedError) as raised:
+        policy.call(failing([ApiError('ClientException')]))
+
+    assert raised.value.error_class == ERROR_CLASS_FATAL
+    assert raised.value.retries == 0
+    assert sleep.delays == []
+
+
+def test_max_attempts_limits_retries():
+    policy = RetryPolicy(max_attempts=3, sleep=RecordingSleep())
+
+    with pytest.raises(RetryExhaustedError) as raised:
+        policy.call(failing([ApiError('ThrottlingException')] * 10))
+
+    assert raised.value.retries == 2
+    assert raised.value.throttle_count == 3
+    assert raised.value.backoff_seconds > 0
+
+
+def test_budget_is_shared_between_calls():
+    budget = RetryBudget(max_retries=3)
+    policy = RetryPolicy(max_attempts=10, budget=budget, sleep=RecordingSleep())
+
+    _, info = policy.call(failing([ApiError('ThrottlingException')] * 2))
+    assert info['retryCount'] == 2
+    assert budget.remaining == 1
+
+    # 予算が尽きると試行回数が残っていてもリトライしない
+    with pytest.raises(RetryExhaustedError) as raised:
+        policy.call(failing([ApiError('ThrottlingException')] * 5))
+    assert raised.value.retries == 1
+    assert budget.remaining == 0
+    assert not budget.try_acquire()
+
+
+def test_unlimited_budget():
+    budget = RetryBudget()
+    assert budget.remaining is None
+    assert all(budget.try_acquire() for _ in range(1000))
+
+
+def test_non_idempotent_call_recovers_instead_of_resubmitting():
+    calls = []
+
+    def submit():
+        calls.append('submit')
+        if len(calls) == 1:
+            # 受け付けられた後に応答が失われた
+            raise ApiError('InternalServerError', status=500)
+        return 'duplicate'
+
+    def recover():
+        calls.append('recover')
+        return 'accepted'
+
+    policy = RetryPolicy(max_attempts=5, sleep=RecordingSleep())
+    result, info = policy.call_non_idempotent(submit, recover)
+
+    assert result == 'accepted'
+    assert calls == ['submit', 'recover']
+    assert info['recovered'] is True
+    assert info['retryCount'] == 0
+
+
+def test_non_idempotent_call_retries_throttling_without_recovering():
+    recovered = []
+    policy = RetryPolicy(max_attempts=5, sleep=RecordingSleep())
+
+    errors = [ApiError('ThrottlingException'), ConnectionError('reset')]
+    result, info = policy.call_non_idempotent(failing(errors), lambda: recovered.append(1))
+
+    # スロットリングは確認せずにリトライし、結果が不明なエラーは確認して見つからなければリトライする
+    assert result == 'ok'
+    assert recovered == [1]
+    assert info['retryCount'] == 2
+    assert 'recovered' not in info
+
+
+def test_non_idempotent_call_checks_before_giving_up():
+    policy = RetryPolicy(max_attempts=1, sleep=RecordingSleep())
+
+    result, info = policy.call_non_idempotent(failing([TimeoutError('read timeout')]), lambda: 'accepted')
+    assert (result, info['recovered']) == ('accepted', True)
+
+    with pytest.raises(RetryExhaustedError):
+        policy.call_non_idempotent(failing([TimeoutError('read timeout')]), lambda: None)
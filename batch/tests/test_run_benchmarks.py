@@ -0,0 +1,79 @@
+"""run-benchmarks.py のベンチマークの計測とベースラインとの比較のテスト"""
+
+import json
+
+import pytest
+
+from conftest import load_script
+
+
+@pytest.fixture(scope='module')
+def benchmarks():
+    return load_script('run-benchmarks.py')
+
+
+def result(benchmark, jobs, wall, throughput, cpu=1.0, rss=100.0):
+    return {'benchmark': benchmark, 'jobs': jobs, 'wallSeconds': wall, 'throughput': throughput,
+            'cpuSeconds': cpu, 'peakRssMb': rss}
+
+
+def test_best_of_takes_best_value_per_metric(benchmarks):
+    best = benchmarks.best_of([
+        result('submit', 100, 2.0, 50.0, cpu=1.5, rss=90.0),
+        result('submit', 100, 1.0, 40.0, cpu=2.0, rss=None),
+    ])
+    assert (best['throughput'], best['cpuSeconds'], best['peakRssMb'], best['wallSeconds']) == (50.0, 1.5, 90.0, 1.0)
+
+
+def test_compare_with_baseline_reports_regressions_beyond_threshold(benchmarks):
+    baseline = {
+        'submit/1000': result('submit', 1000, 1.0, 1000.0, cpu=1.0, rss=100.0),
+        'load/1000': result('load', 1000, 1.0, 1000.0),
+        # 短すぎる計測値は比較しない
+        'analyze/100': result('analyze', 100, 0.01, 10000.0),
+    }
+    current = [
+        result('submit', 1000, 1.5, 700.0, cpu=1.1, rss=130.0),
+        result('load', 1000, 1.1, 900.0),
+        result('analyze', 100, 0.1, 1000.0),
+        result('monitor', 1000, 1.0, 1.0),
+    ]
+
+    regressions = benchmarks.compare_with_baseline(current, baseline, threshold=0.2)
+
+    assert [(key, metric) for key, metric, _, _ in regressions] == [
+        ('submit/1000', 'throughput'), ('submit/1000', 'peakRssMb')]
+
+
+def test_run_case_measures_analyzer(benchmarks, tmp_path):
+    data_dir = benchmarks.prepare_data(str(tmp_path), 200)
+
+    for name in ('load', 'analyze'):
+        measured = benchmarks.run_case(name, 200, data_dir)
+        assert measured['benchmark'] == name
+        assert measured['jobs'] == 200
+        assert measured['throughput'] > 0
+        assert measured['cpuSeconds'] >= 0
+
+
+def test_run_case_measures_launcher(benchmarks, tmp_path, launcher_module):
+    for name in ('submit', 'monitor'):
+        measured = benchmarks.run_case(name, 50, str(tmp_path))
+        assert measured['throughput'] > 0
+
+
+def test_save_and_compare_baseline(benchmarks, tmp_path, monkeypatch, launcher_module):
+    baseline = tmp_path / 'baseline.json'
+    args = ['run-benchmarks.py', '--sizes', '50', '--repeat', '1', '--baseline', str(baseline)]
+
+    monkeypatch.setattr('sys.argv', args + ['--save-baseline', '--output', str(tmp_path / 'out.json')])
+    with pytest.raises(SystemExit) as raised:
+        benchmarks.main()
+    assert raised.value.code == 0
+    saved = json.loads(baseline.read_text(encoding='utf-8'))
+    assert sorted(saved) == ['analyze/50', 'load/50', 'monitor/50', 'submit/50']
+
+    monkeypatch.setattr('sys.argv', args + ['--threshold', '100'])
+    with pytest.raises(SystemExit) as raised:
+        benchmarks.main()
+    assert raised.value.code == 0
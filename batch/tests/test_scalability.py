@@ -0,0 +1,86 @@
+"""scalability のスループットの計測と Amdahl / USL の当てはめのテスト"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from scalability import fit_scalability, measure_throughput, predict_throughput
+from timing_stats import JobColumns
+
+
+CONCURRENCY = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+def usl(n, lam, sigma, kappa):
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def test_usl_recovers_coefficients():
+    points = [(n, usl(n, 2.0, 0.05, 0.001)) for n in CONCURRENCY]
+
+    fit = fit_scalability(points, 'usl')
+
+    assert fit['lambda'] == pytest.approx(2.0)
+    assert fit['sigma'] == pytest.approx(0.05)
+    assert fit['kappa'] == pytest.approx(0.001)
+    assert fit['r2'] == pytest.approx(1.0)
+    assert fit['peakConcurrency'] == pytest.approx((0.95 / 0.001) ** 0.5)
+    assert fit['peakThroughput'] == pytest.approx(usl(fit['peakConcurrency'], 2.0, 0.05, 0.001))
+    assert fit['ceilingThroughput'] is None
+    assert predict_throughput(fit, 256) == pytest.approx(usl(256, 2.0, 0.05, 0.001))
+
+
+def test_amdahl_has_ceiling_instead_of_peak():
+    points = [(n, usl(n, 5.0, 0.1, 0.0)) for n in CONCURRENCY]
+
+    fit = fit_scalability(points, 'amdahl')
+
+    assert fit['kappa'] == 0
+    assert fit['sigma'] == pytest.approx(0.1)
+    assert fit['ceilingThroughput'] == pytest.approx(50.0)
+    assert fit['peakConcurrency'] is None
+
+
+def test_negative_coefficients_are_clamped_to_zero():
+    # 多重度に比例して増える（競合が無い）場合は σ・κ を 0 にする
+    points = [(n, 3.0 * n * (1 + 0.001 * (n % 3))) for n in CONCURRENCY]
+
+    fit = fit_scalability(points, 'usl')
+
+    assert fit['sigma'] >= 0 and fit['kappa'] >= 0
+    assert fit['lambda'] == pytest.approx(3.0, rel=0.01)
+    assert fit['peakConcurrency'] is None
+
+
+def test_too_few_concurrency_levels():
+    assert fit_scalability([(1, 1.0), (2, 1.9), (2, 1.8)], 'usl') is None
+    assert fit_scalability([(1, 1.0), (4, 3.0)], 'amdahl') is not None
+    assert fit_scalability([(1, 1.0), (4, 0.0), (8, None)], 'amdahl') is None
+
+
+def test_measure_throughput_uses_wall_time_including_retries(compute_path):
+    start = datetime(2025, 1, 1, 12, 0, 0)
+
+    def at(seconds):
+        return (start + timedelta(seconds=seconds)).isoformat()
+
+    jobs = [
+        {'status': 'SUBMITTED', 'submissionTime': at(0), 'submitDuration': 0.1, 'submitWallSeconds': 2.0,
+         'stoppedAt': at(10)},
+        # submitWallSeconds が無い古い結果は submitDuration を使う
+        {'status': 'SUBMITTED', 'submissionTime': at(1), 'submitDuration': 0.5, 'stoppedAt': at(20)},
+        {'status': 'SUBMITTED', 'submissionTime': at(3), 'submitDuration': 0.2, 'submitWallSeconds': 1.0},
+        {'status': 'FAILED_TO_SUBMIT', 'submissionTime': at(100), 'submitWallSeconds': 9.0},
+    ]
+    columns = JobColumns(jobs)
+
+    throughput = measure_throughput(columns, columns.equals('status', 'SUBMITTED'))
+
+    assert throughput['submit'] == pytest.approx(3 / 4)
+    assert throughput['completion'] == pytest.approx(2 / 20)
+
+
+def test_measure_throughput_without_submitted_jobs(compute_path):
+    columns = JobColumns([{'status': 'FAILED_TO_SUBMIT'}])
+    assert measure_throughput(columns, columns.equals('status', 'SUBMITTED')) == {
+        'submit': None, 'completion': None}
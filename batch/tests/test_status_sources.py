@@ -0,0 +1,53 @@
+"""status_sources のジョブ状態変化イベントの受信のテスト"""
+
+import json
+
+from status_sources import JOB_STATE_CHANGE_DETAIL_TYPE, SqsEventStatusSource
+
+
+def message(handle, body):
+    return {'ReceiptHandle': handle, 'Body': body if isinstance(body, str) else json.dumps(body)}
+
+
+def job_event(job_id, status):
+    return {'detail-type': JOB_STATE_CHANGE_DETAIL_TYPE, 'time': '2025-01-01T12:00:00Z',
+            'detail': {'jobId': job_id, 'status': status}}
+
+
+class FakeSqsClient:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.deleted = []
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds):
+        batch, self.messages = self.messages[:MaxNumberOfMessages], self.messages[MaxNumberOfMessages:]
+        return {'Messages': batch}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        self.deleted.extend(entry['ReceiptHandle'] for entry in Entries)
+
+
+def test_sqs_source_consumes_only_monitored_jobs():
+    client = FakeSqsClient([
+        message('mine', job_event('job-1', 'RUNNING')),
+        message('other-run', job_event('job-9', 'RUNNING')),
+        message('array-child', job_event('parent:0', 'SUCCEEDED')),
+        message('array-parent', job_event('parent', 'RUNNING')),
+        message('garbage', 'not json'),
+        message('other-event', {'detail-type': 'Something Else', 'detail': {}}),
+    ])
+    source = SqsEventStatusSource('queue-url', client)
+
+    updates = source.receive(0, job_ids={'job-1', 'parent:0', 'parent'})
+
+    assert [job['jobId'] for job, _ in updates] == ['job-1', 'parent:0', 'parent']
+    # 他の実行のイベントと解釈できないメッセージは可視性タイムアウトの後にキューに戻す
+    assert client.deleted == ['mine', 'array-child', 'array-parent']
+
+
+def test_sqs_source_without_job_ids_consumes_every_parsed_message():
+    client = FakeSqsClient([message('a', job_event('job-1', 'RUNNING')), message('garbage', '{')])
+    source = SqsEventStatusSource('queue-url', client)
+
+    assert len(source.receive(0)) == 1
+    assert client.deleted == ['a']
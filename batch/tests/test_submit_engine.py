@@ -0,0 +1,125 @@
+"""submit_engine のトークンバケット・AIMD 制御・非同期送信エンジンのテスト"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from submit_engine import AimdController, AsyncSubmitEngine, TokenBucket, result_was_throttled
+
+
+def test_token_bucket_limits_rate_after_burst():
+    bucket = TokenBucket(rate=100, burst=5)
+
+    async def take(count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    started = time.monotonic()
+    asyncio.run(take(15))
+    elapsed = time.monotonic() - started
+
+    # バースト5件の後の10件は 100件/秒 で補充される
+    assert elapsed >= 0.09
+    assert elapsed < 1.0
+
+
+def test_token_bucket_set_rate_resizes_burst():
+    bucket = TokenBucket(rate=50)
+    bucket.set_rate(2)
+    assert bucket.rate == 2
+    assert bucket.burst == 2
+    assert bucket._tokens <= 2
+
+
+def test_result_was_throttled():
+    assert result_was_throttled({'status': 'SUBMITTED', 'throttleCount': 1})
+    assert result_was_throttled({'status': 'FAILED_TO_SUBMIT', 'errorCode': 'TooManyRequestsException'})
+    assert not result_was_throttled({'status': 'SUBMITTED', 'throttleCount': 0})
+    assert not result_was_throttled({'status': 'FAILED_TO_SUBMIT', 'errorCode': 'ClientException'})
+
+
+def test_aimd_additive_increase():
+    controller = AimdController(initial_concurrency=4, initial_rate=10, rate_increase=5)
+    controller.on_success(0.01, in_flight=4)
+    assert controller.concurrency == pytest.approx(4.25)
+    assert controller.rate == pytest.approx(10.5)
+
+    # 上限に達していない場合は同時実行数を増やさない
+    controller.on_success(0.01, in_flight=1)
+    assert controller.concurrency == pytest.approx(4.25)
+
+
+def test_aimd_multiplicative_decrease_once_per_latency():
+    controller = AimdController(initial_concurrency=16, initial_rate=100, decrease_factor=0.5)
+    controller.on_throttle(10.0)
+    assert controller.limit == 8
+    assert controller.rate == pytest.approx(50)
+
+    # 同じ混雑（平均レイテンシ1回分の間）による連続した減少は行わない
+    controller.on_throttle(10.0)
+    assert controller.limit == 8
+    assert controller.throttle_events == 2
+    assert controller.decrease_events == 1
+
+
+def test_aimd_respects_bounds_and_latency_target():
+    controller = AimdController(initial_concurrency=2, min_concurrency=2, max_concurrency=3,
+                                initial_rate=1, min_rate=1, latency_target=0.5)
+    controller.on_success(1.0, in_flight=2)
+    assert controller.limit == 2
+    assert controller.rate == 1
+    assert controller.decrease_events == 1
+
+    for _ in range(50):
+        controller.on_success(0.1, in_flight=controller.limit)
+    assert controller.limit == 3
+
+
+def test_engine_submits_all_items_within_concurrency_limit():
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def submit(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.005)
+        with lock:
+            active[0] -= 1
+        return {'status': 'SUBMITTED', 'item': item}
+
+    controller = AimdController(initial_concurrency=2, max_concurrency=4, initial_rate=1000, max_rate=1000)
+    engine = AsyncSubmitEngine(submit, controller=controller)
+    results = engine.run(range(60))
+
+    assert sorted(r['item'] for r in results) == list(range(60))
+    assert peak[0] <= 4
+    assert engine.peak_in_flight <= 4
+    stats = engine.stats()
+    assert stats['totalResults'] == stats['successfulResults'] == 60
+    assert stats['finalConcurrency'] > 2
+
+
+def test_engine_backs_off_on_throttling():
+    calls = [0]
+
+    def submit(item):
+        calls[0] += 1
+        if calls[0] <= 5:
+            return {'status': 'FAILED_TO_SUBMIT', 'errorCode': 'TooManyRequestsException'}
+        return {'status': 'SUBMITTED'}
+
+    received = []
+    controller = AimdController(initial_concurrency=8, initial_rate=200, max_rate=200)
+    engine = AsyncSubmitEngine(submit, controller=controller, on_result=received.append, collect_results=False)
+
+    assert engine.run(range(20)) == []
+    assert len(received) == 20
+    stats = engine.stats()
+    assert stats['throttleEvents'] == 5
+    assert stats['decreaseEvents'] >= 1
+    assert stats['successfulResults'] == 15
+    assert controller.rate < 200
@@ -0,0 +1,124 @@
+"""timing_stats の集計のテスト（numpy と Python の計算パスが同じ結果になること）"""
+
+import math
+import random
+
+import pytest
+
+from timing_stats import JobColumns, empty_summary, percentile
+
+
+def random_jobs(count, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        job = {
+            'status': 'SUBMITTED' if rng.random() < 0.8 else 'FAILED_TO_SUBMIT',
+            'submitDuration': rng.lognormvariate(-3, 0.7),
+            'retryCount': rng.choice([0, 0, 0, 1, 2]),
+            'constant': 0.25,
+            'submissionTime': f"2025-01-01T12:{i // 60 % 60:02d}:{i % 60:02d}.{rng.randrange(10 ** 6):06d}",
+        }
+        if rng.random() < 0.1:
+            # 値が無いジョブ
+            del job['submitDuration']
+        if i == 7:
+            job['single'] = 3.5
+        jobs.append(job)
+    return jobs
+
+
+def assert_same_summary(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        left, right = actual[name], expected[name]
+        assert left.keys() == right.keys(), name
+        for key in right:
+            if key == 'histogram':
+                assert left[key]['counts'] == right[key]['counts'], name
+                assert left[key]['edges'] == pytest.approx(right[key]['edges']), name
+            else:
+                assert left[key] == pytest.approx(right[key], rel=1e-9, abs=1e-12), (name, key)
+
+
+def test_percentile_interpolates_linearly():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 90) == pytest.approx(3.7)
+    assert percentile(values, 100) == 4.0
+    assert percentile([5.0], 99) == 5.0
+
+
+def test_summary_values(compute_path):
+    jobs = [{'value': v} for v in (4.0, 1.0, 3.0, 2.0, 0.0)] + [{}]
+
+    stats = JobColumns(jobs).summarize(['value', 'missing'], percentiles=(50,), bins=4)
+
+    assert set(stats) == {'value'}
+    value = stats['value']
+    assert (value['count'], value['sum'], value['nonzero']) == (5, 10.0, 4)
+    assert (value['min'], value['max'], value['mean'], value['p50']) == (0.0, 4.0, 2.0, 2.0)
+    assert value['std'] == pytest.approx(2.5 ** 0.5)
+    assert value['iqr'] == 2.0
+    assert value['histogram'] == {'edges': [0.0, 1.0, 2.0, 3.0, 4.0], 'counts': [1, 1, 1, 2]}
+
+
+def test_constant_column_counts_in_first_bin(compute_path):
+    stats = JobColumns([{'value': 7.0}] * 5).summarize(['value'], bins=4)
+    assert stats['value']['histogram'] == {'edges': [7.0] * 5, 'counts': [5, 0, 0, 0]}
+    assert stats['value']['std'] == 0.0
+
+
+def test_numpy_and_python_summaries_match(numpy_and_python):
+    jobs = random_jobs(500)
+    names = ['submitDuration', 'retryCount', 'constant', 'single', 'absent']
+
+    def summarize():
+        columns = JobColumns(jobs)
+        return (columns.summarize(names),
+                columns.summarize(names, columns.equals('status', 'SUBMITTED')),
+                columns.count(columns.equals('status', 'FAILED_TO_SUBMIT')))
+
+    with_numpy, without_numpy = numpy_and_python(summarize)
+
+    for actual, expected in zip(with_numpy[:2], without_numpy[:2]):
+        assert_same_summary(actual, expected)
+    assert with_numpy[2] == without_numpy[2]
+    assert with_numpy[0]['single']['count'] == 1
+
+
+def test_numpy_and_python_times_match(numpy_and_python):
+    jobs = random_jobs(50) + [{'status': 'SUBMITTED'}]
+
+    def times():
+        return list(JobColumns(jobs).times('submissionTime'))
+
+    with_numpy, without_numpy = numpy_and_python(times)
+
+    assert math.isnan(with_numpy[-1]) and math.isnan(without_numpy[-1])
+    assert with_numpy[:-1] == pytest.approx(without_numpy[:-1], abs=1e-6)
+
+
+def test_empty_summary_has_summary_keys():
+    stats = JobColumns([{'value': 1.0}, {'value': 2.0}]).summarize(['value'])['value']
+    assert empty_summary().keys() == stats.keys()
+    assert empty_summary()['count'] == 0
+
+
+def test_columnar_results_match_json_records(tmp_path):
+    np = pytest.importorskip('numpy')
+    from columnar_results import read_columnar_result, write_columnar_result
+
+    data = {'jobs': random_jobs(200)}
+    path = str(tmp_path / 'result.npz')
+    write_columnar_result(data, path)
+
+    from_json = JobColumns(data['jobs'])
+    from_npz = JobColumns(read_columnar_result(path)['jobs'])
+
+    names = ['submitDuration', 'retryCount', 'constant']
+    mask_json, mask_npz = from_json.equals('status', 'SUBMITTED'), from_npz.equals('status', 'SUBMITTED')
+    assert mask_json.tolist() == mask_npz.tolist()
+    assert from_json.summarize(names, mask_json) == from_npz.summarize(names, mask_npz)
+    np.testing.assert_allclose(from_json.times('submissionTime'), from_npz.times('submissionTime'))
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+ジョブの所要時間の集計（パーセンタイル・IQR・ヒストグラム）
+
+テストケースごとに、集計する列（submitDuration やライフサイクルの各フェーズ）を
+1つの2次元配列（列 × ジョブ）にまとめ、1回のソートで全列のパーセンタイルを求める。
+値が無いジョブ（NaN）はソートで末尾に集まるため、列ごとの件数から補間位置を計算する。
+
+ジョブは辞書のリストと列指向形式（columnar_results.ColumnarJobs）のどちらでもよく、
+列指向形式の場合は必要な列のみを読み込む。numpy が無い場合は同じ結果を Python で計算する。
+"""
+
+import math
+from datetime import datetime
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# 集計するパーセンタイル（p50 は中央値、IQR には p25 / p75 を使う）
+TAIL_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+# ヒストグラムのビン数（最小値〜最大値を等間隔に分割）
+HISTOGRAM_BINS = 20
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def percentile_key(p):
+    """パーセンタイルの集計結果のキー（p50, p99.9 など）"""
+    return f"p{p:g}"
+
+
+def percentile(sorted_values, p):
+    """
+    ソート済みの値の p パーセンタイルを線形補間で計算
+
+    Args:
+        sorted_values (list): 昇順にソートされた値
+        p (float): パーセンタイル（0〜100）
+
+    Returns:
+        float: パーセンタイル値
+    """
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def empty_summary(percentiles=TAIL_PERCENTILES):
+    """
+    値が1件も無い列の集計（JobColumns.summarize と同じキーで、件数以外は0）
+
+    Returns:
+        dict: {count, sum, nonzero, mean, std, min, max, p50, ..., iqr, histogram}
+    """
+    stats = {'count': 0, 'sum': 0.0, 'nonzero': 0, 'mean': 0.0, 'std': 0.0, 'min': 0.0, 'max': 0.0}
+    stats.update({percentile_key(p): 0.0 for p in percentiles})
+    stats['iqr'] = 0.0
+    stats['histogram'] = {'edges': [], 'counts': []}
+    return stats
+
+
+def _histogram(sorted_values, bins):
+    """
+    最小値〜最大値を bins 個に等分したヒストグラム（Python での計算）
+
+    値が一定の場合は全て先頭のビンに数える（_histogram_numpy も同じ区切りで数える）。
+    """
+    low, high = sorted_values[0], sorted_values[-1]
+    width = (high - low) / bins
+    counts = [0] * bins
+    for value in sorted_values:
+        counts[min(bins - 1, int((value - low) / width)) if width else 0] += 1
+    return {'edges': [low + width * i for i in range(bins + 1)], 'counts': counts}
+
+
+def _histogram_numpy(sorted_values, bins):
+    """_histogram と同じ区切りのヒストグラム（np.histogram は値が一定の場合に中央のビンに数えるため使わない）"""
+    low, high = float(sorted_values[0]), float(sorted_values[-1])
+    width = (high - low) / bins
+    if width:
+        indices = np.minimum(bins - 1, ((sorted_values - low) / width).astype(np.int64))
+    else:
+        indices = np.zeros(len(sorted_values), dtype=np.int64)
+    return {'edges': [low + width * i for i in range(bins + 1)],
+            'counts': np.bincount(indices, minlength=bins).tolist()}
+
+
+class JobColumns:
+    """
+    ジョブのレコードの列を数値の配列として参照する
+
+    Args:
+        jobs: ジョブのレコードのリスト、または ColumnarJobs
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.size = len(jobs)
+        self._numeric = {}
+
+    def numeric(self, name):
+        """
+        列の値（値が無いジョブは NaN）
+
+        Returns:
+            numpy.ndarray（numpy が無い場合は list）: float の値
+        """
+        if name not in self._numeric:
+            column = getattr(self.jobs, 'column', None)
+            if HAS_NUMPY and column is not None:
+                values = column(name)
+                if values is None:
+                    values = np.full(self.size, np.nan)
+                elif values.dtype != np.float64:
+                    missing = self.jobs.missing(name)
+                    values = values.astype(np.float64)
+                    values[missing] = np.nan
+            elif HAS_NUMPY:
+                values = np.array([job.get(name) for job in self.jobs], dtype=np.float64)
+            else:
+                values = [float(v) if v is not None else math.nan for v in (job.get(name) for job in self.jobs)]
+            self._numeric[name] = values
+        return self._numeric[name]
+
+    def times(self, name):
+        """
+        時刻の列（ISO 形式）をエポック秒で返す（値が無いジョブは NaN）
+
+        タイムゾーンなしの時刻はそのまま UTC とみなすため、差を取る用途に使う。
+
+        Returns:
+            numpy.ndarray（numpy が無い場合は list）: float の値
+        """
+        key = ('times', name)
+        if key not in self._numeric:
+            column = getattr(self.jobs, 'column', None)
+            if HAS_NUMPY and column is not None:
+                values = column(name)
+                if values is None or values.dtype != np.float64:
+                    values = np.full(self.size, np.nan)
+            elif HAS_NUMPY:
+                parsed = np.array([job.get(name) for job in self.jobs], dtype='datetime64[us]')
+                values = parsed.astype(np.int64) / 1e6
+                values[np.isnat(parsed)] = np.nan
+            else:
+                values = [
+                    (datetime.fromisoformat(v).replace(tzinfo=None) - _EPOCH).total_seconds() if v else math.nan
+                    for v in (job.get(name) for job in self.jobs)
+                ]
+            self._numeric[key] = values
+        return self._numeric[key]
+
+    def equals(self, name, value):
+        """
+        列の値が value と等しいジョブ
+
+        Returns:
+            numpy.ndarray（numpy が無い場合は list）: 真偽値のマスク
+        """
+        column = getattr(self.jobs, 'column', None)
+        if HAS_NUMPY and column is not None:
+            values = column(name)
+            return values == value if values is not None else np.zeros(self.size, dtype=bool)
+        mask = [job.get(name) == value for job in self.jobs]
+        return np.array(mask, dtype=bool) if HAS_NUMPY else mask
+
+    def count(self, mask):
+        """マスクが True のジョブ数"""
+        return int(np.count_nonzero(mask)) if HAS_NUMPY else sum(mask)
+
+    def summarize(self, names, mask=None, percentiles=TAIL_PERCENTILES, bins=HISTOGRAM_BINS):
+        """
+        列ごとの件数・合計・平均・標準偏差・最小・最大・パーセンタイル・IQR・ヒストグラム
+
+        Args:
+            names (iterable): 集計する列名
+            mask: 集計するジョブ（equals の戻り値、Noneの場合は全ジョブ）
+            percentiles (tuple): 集計するパーセンタイル
+            bins (int): ヒストグラムのビン数
+
+        Returns:
+            dict: 列名 → {count, sum, nonzero, mean, std, min, max, p50, ..., iqr, histogram}
+                  （値が1件も無い列は含まない）
+        """
+        names = list(names)
+        if not names:
+            return {}
+        if HAS_NUMPY:
+            return self._summarize_numpy(names, mask, percentiles, bins)
+        return self._summarize_python(names, mask, percentiles, bins)
+
+    def _summarize_numpy(self, names, mask, percentiles, bins):
+        matrix = np.vstack([self.numeric(name) for name in names])
+        if mask is not None:
+            matrix = matrix[:, mask]
+        # NaN はソートで末尾に集まるため、各列の先頭 count 件が値のあるジョブになる
+        matrix.sort(axis=1)
+        counts = np.count_nonzero(~np.isnan(matrix), axis=1)
+        present = counts > 0
+        if not present.any():
+            return {}
+        names = [name for name, ok in zip(names, present) if ok]
+        matrix, counts = matrix[present], counts[present]
+        rows = np.arange(len(names))
+
+        def at(p):
+            rank = (counts - 1) * p / 100
+            lower = np.floor(rank).astype(np.int64)
+            upper = np.minimum(lower + 1, counts - 1)
+            low, high = matrix[rows, lower], matrix[rows, upper]
+            return low + (high - low) * (rank - lower)
+
+        values = np.where(np.isnan(matrix), 0.0, matrix)
+        sums = values.sum(axis=1)
+        means = sums / counts
+        deviations = np.where(np.isnan(matrix), 0.0, matrix - means[:, None])
+        stds = np.sqrt((deviations ** 2).sum(axis=1) / np.maximum(counts - 1, 1))
+        nonzero = np.count_nonzero(values, axis=1)
+        tails = {percentile_key(p): at(p) for p in percentiles}
+        iqrs = at(75) - at(25)
+
+        summary = {}
+        for i, name in enumerate(names):
+            finite = matrix[i, :counts[i]]
+            stats = {
+                'count': int(counts[i]),
+                'sum': float(sums[i]),
+                'nonzero': int(nonzero[i]),
+                'mean': float(means[i]),
+                'std': float(stds[i]) if counts[i] > 1 else 0.0,
+                'min': float(finite[0]),
+                'max': float(finite[-1]),
+            }
+            stats.update({key: float(value[i]) for key, value in tails.items()})
+            stats['iqr'] = float(iqrs[i])
+            stats['histogram'] = _histogram_numpy(finite, bins)
+            summary[name] = stats
+        return summary
+
+    def _summarize_python(self, names, mask, percentiles, bins):
+        summary = {}
+        for name in names:
+            values = self.numeric(name)
+            if mask is not None:
+                values = [v for v, selected in zip(values, mask) if selected]
+            values = sorted(v for v in values if not math.isnan(v))
+            if not values:
+                continue
+            total = sum(values)
+            mean = total / len(values)
+            stats = {
+                'count': len(values),
+                'sum': total,
+                'nonzero': sum(1 for v in values if v),
+                'mean': mean,
+                'std': (math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+                        if len(values) > 1 else 0.0),
+                'min': values[0],
+                'max': values[-1],
+            }
+            stats.update({percentile_key(p): percentile(values, p) for p in percentiles})
+            stats['iqr'] = percentile(values, 75) - percentile(values, 25)
+            stats['histogram'] = _histogram(values, bins)
+            summary[name] = stats
+        return summary
@@ -0,0 +1,153 @@
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+import boto3
+from botocore.config import Config
+
+# ロギング設定
+logger = logging.getLogger()
+
+# botocore のデフォルトの接続プールサイズ
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+
+class ConnectionPoolMetrics:
+    """
+    クライアントの HTTP 接続プールの利用状況を集計するカウンター（スレッドセーフ）
+
+    - requests: 接続プールから接続を取得した回数（= 送信したリクエスト数）
+    - new_connections: 新しく確立した接続数
+    - reused_connections: 既存の接続を再利用した回数
+    - pool_exhausted: 取得時にプールが空だった回数（プールサイズ不足の指標）
+    - pool_wait_seconds: 接続の取得にかかった合計時間
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.pool_exhausted = 0
+        self.pool_wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_get(self, wait_seconds: float, exhausted: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.pool_wait_seconds += wait_seconds
+            if exhausted:
+                self.pool_exhausted += 1
+
+    def record_new_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在のカウンターの値を取得する
+
+        Returns:
+            カウンターの辞書
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'newConnections': self.new_connections,
+                'reusedConnections': max(0, self.requests - self.new_connections),
+                'poolExhausted': self.pool_exhausted,
+                'poolWaitSeconds': self.pool_wait_seconds
+            }
+
+
+def _instrument_pool(pool: Any, metrics: ConnectionPoolMetrics) -> None:
+    """urllib3 の接続プールに計測用のラッパーを設定する（1プールにつき1回）"""
+    if getattr(pool, '_pool_metrics_installed', False):
+        return
+
+    original_get_conn = pool._get_conn
+    original_new_conn = pool._new_conn
+
+    def get_conn(*args, **kwargs):
+        exhausted = pool.pool is not None and pool.pool.empty()
+        start = time.monotonic()
+        try:
+            return original_get_conn(*args, **kwargs)
+        finally:
+            metrics.record_get(time.monotonic() - start, exhausted)
+
+    def new_conn(*args, **kwargs):
+        metrics.record_new_connection()
+        return original_new_conn(*args, **kwargs)
+
+    pool._get_conn = get_conn
+    pool._new_conn = new_conn
+    pool._pool_metrics_installed = True
+
+
+def _install_pool_metrics(client: Any, metrics: ConnectionPoolMetrics) -> None:
+    """
+    リクエスト送信前に接続先の接続プールへ計測用のラッパーを設定するイベントを登録する
+
+    botocore の内部構造に依存するため、取得できない場合は計測せずに続行する。
+    """
+    try:
+        manager = client._endpoint.http_session._manager
+    except AttributeError:
+        logger.warning("Connection pool metrics are not available for this botocore version")
+        return
+
+    def before_send(request, **kwargs):
+        try:
+            _instrument_pool(manager.connection_from_url(request.url), metrics)
+        except Exception as e:
+            logger.debug(f"Failed to instrument connection pool: {str(e)}")
+
+    client.meta.events.register('before-send', before_send)
+
+
+def create_client(
+    service_name: str,
+    region_name: Optional[str] = None,
+    max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+    retry_mode: str = 'adaptive',
+    max_attempts: Optional[int] = None,
+    tcp_keepalive: bool = True,
+    connect_timeout: float = 10,
+    read_timeout: float = 60
+) -> Any:
+    """
+    接続プールのサイズ・TCPキープアライブ・リトライモードを設定した boto3 クライアントを作成する
+
+    作成したクライアントの接続プールの利用状況は client.pool_metrics.snapshot() で取得できる。
+
+    Args:
+        service_name: AWSサービス名（'batch', 'ecs' など）
+        region_name: AWSリージョン（Noneの場合は環境の設定を使用）
+        max_pool_connections: 接続プールのサイズ（同時にAPIを呼び出すスレッド数以上にする）
+        retry_mode: botocore のリトライモード（'adaptive' はクライアント側のレート制限を含む）
+        max_attempts: 1回目を含む最大試行回数（Noneの場合はリトライモードのデフォルト）
+        tcp_keepalive: TCPキープアライブを有効にするか
+        connect_timeout: 接続タイムアウト（秒）
+        read_timeout: 読み込みタイムアウト（秒）
+
+    Returns:
+        boto3 クライアント
+    """
+    retries = {'mode': retry_mode}
+    if max_attempts is not None:
+        retries['total_max_attempts'] = max_attempts
+
+    config = Config(
+        max_pool_connections=max(1, max_pool_connections),
+        tcp_keepalive=tcp_keepalive,
+        retries=retries,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout
+    )
+    client = boto3.client(service_name, region_name=region_name, config=config)
+
+    metrics = ConnectionPoolMetrics()
+    _install_pool_metrics(client, metrics)
+    client.pool_metrics = metrics
+
+    return client
@@ -1,16 +1,17 @@
 import json
-import boto3
 import os
 import logging
 from typing import Dict, Any, Optional
 
+from aws_clients import create_client
+
 # ロギング設定
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS クライアント
-ecs_client = boto3.client('ecs')
-logs_client = boto3.client('logs')
+# AWS クライアント（ウォームスタート間で接続を再利用する）
+ecs_client = create_client('ecs')
+logs_client = create_client('logs')
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
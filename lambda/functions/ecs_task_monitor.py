@@ -1,15 +1,16 @@
 import json
-import boto3
 import os
 import logging
 from typing import Dict, Any
 
+from aws_clients import create_client
+
 # ロギング設定
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS クライアント
-ecs_client = boto3.client('ecs')
+# AWS クライアント（ウォームスタート間で接続を再利用する）
+ecs_client = create_client('ecs')
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """